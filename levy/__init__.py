@@ -1,5 +1,30 @@
-from .config import LevyConfig
-from .engine import LevyEngine
-from .models import LevyResult
+"""
+Levy: semantic caching engine for LLM APIs.
+
+Top-level names are resolved lazily (PEP 562), so `import levy` -- and any
+`import levy.<subpackage>` from the dataset/experiment CLIs -- does not pull in
+the engine and its provider SDKs until `levy.LevyEngine` is first touched.
+"""
+
+import importlib
+
+_LAZY_EXPORTS = {
+    "LevyConfig": "levy.config",
+    "LevyEngine": "levy.engine",
+    "LevyResult": "levy.models",
+}
 
 __all__ = ["LevyConfig", "LevyEngine", "LevyResult"]
+
+
+def __getattr__(name):
+    module = _LAZY_EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module 'levy' has no attribute {name!r}")
+    value = getattr(importlib.import_module(module), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -7,19 +7,22 @@ Endpoints (frozen S&D "Intended interface" + known-gap #1):
   GET  /admin/cache/stats    -- aggregated hit rate, index size, per-model breakdown.
   POST /admin/cache/clear    -- empties every pooled engine's caches + metrics.
 
-Design decision (recorded in design.md): endpoints are declared `def` (sync) so
-FastAPI runs them in its threadpool -- the whole call chain (engine, caches, the
-LEV-6 Anthropic client) is synchronous and blocking the event loop would
-serialize all requests. This satisfies the frozen "asynchronous wrapper" intent
-at the HTTP boundary without an AsyncAnthropic migration.
+`POST /v1/chat/completions` is `async def` and awaits `LevyEngine.agenerate`,
+whose blocking stages (embedding, LLM call) are awaited natively (httpx.AsyncClient,
+anthropic.AsyncAnthropic) or offloaded to worker threads (local embedding models),
+so one worker holds many concurrent upstream calls instead of being capped by the
+threadpool size. Engine construction (which may load a model) runs in a thread too.
+The admin endpoints stay sync `def`: they are short and touch no network.
 
 Run with: uvicorn levy.api.app:app
 """
 
+import asyncio
 import json
 import logging
 import time
 import uuid
+from contextlib import asynccontextmanager
 from typing import List, Optional
 
 from fastapi import FastAPI, Request, Response
@@ -80,7 +83,7 @@ def _to_response_body(
 
 def _aggregate_stats(pool: EnginePool) -> StatsResponse:
     total_requests = exact_hits = semantic_hits = misses = tokens_saved = 0
-    index_size = 0
+    index_size = cache_bytes = peak_cache_bytes = 0
     model_breakdown: dict = {}
     latencies: List[float] = []
 
@@ -93,8 +96,13 @@ def _aggregate_stats(pool: EnginePool) -> StatsResponse:
         tokens_saved += snap.tokens_saved
         latencies.extend(engine.metrics.latencies)
 
+    # Cache sizes are counted once per cache universe, since with
+    # share_cache_across_thresholds several engines point at the same store/index.
+    for engine in pool.unique_caches():
         stats = engine.get_cache_stats()
         index_size += stats["index_size"]
+        cache_bytes += stats["cache_bytes"]
+        peak_cache_bytes += stats["peak_cache_bytes"]
         for name, count in stats["model_breakdown"].items():
             model_breakdown[name] = model_breakdown.get(name, 0) + count
 
@@ -111,6 +119,8 @@ def _aggregate_stats(pool: EnginePool) -> StatsResponse:
         avg_latency_ms=avg_latency,
         index_size=index_size,
         model_breakdown=model_breakdown,
+        cache_bytes=cache_bytes,
+        peak_cache_bytes=peak_cache_bytes,
     )
 
 
@@ -120,6 +130,18 @@ def create_app(
     """Build a Levy API app. Tests pass a mock-provider `config` for offline runs."""
     pool = EnginePool(config or LevyConfig(), max_engines=max_engines)
 
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        # Warm start: no-ops unless LevyConfig.semantic_snapshot_dir is set.
+        restored = pool.restore_snapshots()
+        if restored:
+            logger.info(json.dumps({"event": "semantic_snapshots_restored", "entries": restored}))
+        yield
+        saved = pool.save_snapshots()
+        if saved:
+            logger.info(json.dumps({"event": "semantic_snapshots_saved", "entries": saved}))
+        await pool.aclose()
+
     app = FastAPI(
         title="Levy Semantic Caching API",
         description=(
@@ -130,6 +152,7 @@ def create_app(
             "observability and maintenance."
         ),
         version="0.1.0",
+        lifespan=lifespan,
     )
     app.state.pool = pool
 
@@ -178,7 +201,7 @@ def create_app(
             "(1.0 for exact-cache hits)."
         ),
     )
-    def chat_completions(
+    async def chat_completions(
         payload: ChatCompletionRequest, response: Response
     ) -> ChatCompletionResponse:
         request_id = str(uuid.uuid4())
@@ -189,8 +212,8 @@ def create_app(
         embedding_model = cache_config.embedding_model if cache_config else None
         threshold = cache_config.threshold if cache_config else None
 
-        engine = pool.get(embedding_model, threshold)
-        result = engine.generate(prompt)
+        engine = await asyncio.to_thread(pool.get, embedding_model, threshold)
+        result = await engine.agenerate(prompt)
 
         completion = time.time()
         latency_ms = (completion - arrival) * 1000
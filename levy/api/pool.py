@@ -11,9 +11,24 @@ cache decision boundary, and stored entries don't re-partition on the fly).
 
 Embedding managers (and their loaded models) are shared across pool keys that
 share an embedding_model, so switching only the threshold never reloads a model.
+
+With `LevyConfig.share_cache_across_thresholds`, the cache universe is per
+embedding_model instead: every threshold for a model shares one exact store and
+one SemanticCache (and so one paid LLM response per prompt), and each engine
+applies its own threshold at lookup time. Engines keep separate metrics.
+
+Warm start: with `LevyConfig.semantic_snapshot_dir` set, `save_snapshots()` writes
+one SemanticCache snapshot per pool key (plus a `pool_key.json` naming the key and
+the embedding model identity) and `restore_snapshots()` rebuilds those engines from
+disk. Snapshots whose model identity no longer matches are skipped, never loaded
+into an incompatible vector space.
 """
 
 import dataclasses
+import hashlib
+import json
+import logging
+import os
 from typing import Dict, List, Optional, Tuple
 
 from levy.config import LevyConfig
@@ -21,8 +36,20 @@ from levy.embedding_manager import EmbeddingManager
 from levy.engine import LevyEngine
 from levy.metrics import LevyMetrics
 
+logger = logging.getLogger(__name__)
+
 PoolKey = Tuple[str, float]
 
+POOL_KEY_FILE = "pool_key.json"
+
+
+def _snapshot_dirname(key: PoolKey) -> str:
+    """Filesystem-safe, stable directory name for a pool key."""
+    model, thresh = key
+    digest = hashlib.sha256(f"{model}::{thresh!r}".encode("utf-8")).hexdigest()[:12]
+    safe_model = "".join(c if c.isalnum() or c in "-_." else "_" for c in model)
+    return f"{safe_model}__{thresh}__{digest}"
+
 
 class PoolCapExceededError(Exception):
     """Raised when a request's cache_config would create more engines than the cap."""
@@ -41,6 +68,9 @@ class EnginePool:
         self.max_engines = max_engines
         self._engines: Dict[PoolKey, LevyEngine] = {}
         self._managers: Dict[str, EmbeddingManager] = {}
+        # embedding_model -> first engine built for it; its store and semantic cache
+        # are reused by later thresholds when share_cache_across_thresholds is on.
+        self._cache_owners: Dict[str, LevyEngine] = {}
 
     def _resolve_key(
         self, embedding_model: Optional[str], threshold: Optional[float]
@@ -72,10 +102,39 @@ class EnginePool:
             manager = EmbeddingManager.from_config(cfg)
             self._managers[model] = manager
 
-        engine = LevyEngine(cfg, embedding_manager=manager)
+        owner = self._cache_owners.get(model) if cfg.share_cache_across_thresholds else None
+        if owner is not None:
+            engine = LevyEngine(
+                cfg,
+                embedding_manager=manager,
+                store=owner.store,
+                semantic_cache=owner.semantic_cache,
+                inflight=owner.inflight,
+            )
+        else:
+            engine = LevyEngine(cfg, embedding_manager=manager)
+            self._cache_owners[model] = engine
         self._engines[key] = engine
         return engine
 
+    async def aclose(self) -> None:
+        """Close every engine's LLM client and every shared embedding manager
+        (their pooled HTTP connections). Called at API shutdown."""
+        for engine in self._engines.values():
+            await engine.aclose()
+        for manager in self._managers.values():
+            await manager.aclose()
+
+    def unique_caches(self) -> List[LevyEngine]:
+        """One engine per distinct cache universe (deduplicates shared stores/indexes)."""
+        seen = set()
+        owners: List[LevyEngine] = []
+        for engine in self._engines.values():
+            if id(engine.semantic_cache) not in seen:
+                seen.add(id(engine.semantic_cache))
+                owners.append(engine)
+        return owners
+
     def all_engines(self) -> List[LevyEngine]:
         return list(self._engines.values())
 
@@ -86,12 +145,15 @@ class EnginePool:
         the underlying InMemoryStore's own clear() is the real accessor.
         """
         report: Dict[str, Dict[str, int]] = {}
+        cleared = set()
         for key, engine in self._engines.items():
-            exact_count = len(engine.store.entries)
+            exact_count = len(getattr(engine.store, "entries", {}))
             semantic_count = engine.semantic_cache.size()
 
-            engine.store.clear()
-            engine.semantic_cache.clear()
+            if id(engine.semantic_cache) not in cleared:  # shared caches: clear once
+                cleared.add(id(engine.semantic_cache))
+                engine.store.clear()
+                engine.semantic_cache.clear()
             engine.metrics = LevyMetrics()
 
             report[f"{key[0]}::{key[1]}"] = {
@@ -99,3 +161,71 @@ class EnginePool:
                 "semantic_entries": semantic_count,
             }
         return report
+
+    def save_snapshots(self) -> Dict[str, int]:
+        """Write every pooled engine's semantic cache under `semantic_snapshot_dir`.
+
+        Returns entries written per pool key; a no-op when snapshots are disabled.
+        """
+        root = self.base_config.semantic_snapshot_dir
+        report: Dict[str, int] = {}
+        if not root:
+            return report
+        for engine in self.unique_caches():
+            if not engine.semantic_cache.supports_snapshots:  # e.g. persisted in semantic_shared_dir
+                continue
+            key = (engine.config.embedding_model, engine.config.similarity_threshold)
+            directory = os.path.join(root, _snapshot_dirname(key))
+            engine.semantic_cache.save(directory)
+            with open(os.path.join(directory, POOL_KEY_FILE), "w", encoding="utf-8") as fh:
+                json.dump(
+                    {
+                        "embedding_model": key[0],
+                        "threshold": key[1],
+                        "model_identity": engine.embedding_manager.get_model_identity().as_dict(),
+                    },
+                    fh,
+                )
+            report[f"{key[0]}::{key[1]}"] = engine.semantic_cache.size()
+        return report
+
+    def restore_snapshots(self) -> Dict[str, int]:
+        """Startup hook: rebuild pooled engines from `semantic_snapshot_dir`.
+
+        Each snapshot directory creates (or reuses) the engine for its pool key and
+        loads it. Snapshots beyond the pool cap, with a mismatched model identity, or
+        that fail to load are logged and skipped so a bad file never blocks startup.
+        Returns entries restored per pool key.
+        """
+        root = self.base_config.semantic_snapshot_dir
+        report: Dict[str, int] = {}
+        if not root or not os.path.isdir(root):
+            return report
+        for name in sorted(os.listdir(root)):
+            directory = os.path.join(root, name)
+            key_file = os.path.join(directory, POOL_KEY_FILE)
+            if not os.path.isfile(key_file):
+                continue
+            with open(key_file, encoding="utf-8") as fh:
+                meta = json.load(fh)
+            try:
+                engine = self.get(meta["embedding_model"], meta["threshold"])
+            except PoolCapExceededError:
+                logger.warning("Pool cap reached; not restoring snapshot %s", directory)
+                break
+            if not engine.semantic_cache.supports_snapshots:
+                continue
+            identity = engine.embedding_manager.get_model_identity().as_dict()
+            if identity != meta.get("model_identity"):
+                logger.warning(
+                    "Skipping snapshot %s: model identity %s does not match %s",
+                    directory, meta.get("model_identity"), identity,
+                )
+                continue
+            try:
+                restored = engine.semantic_cache.load(directory)
+            except (OSError, ValueError) as e:
+                logger.warning("Skipping snapshot %s: %s", directory, e)
+                continue
+            report[f"{meta['embedding_model']}::{meta['threshold']}"] = restored
+        return report
@@ -74,6 +74,10 @@ class StatsResponse(BaseModel):
     avg_latency_ms: float
     index_size: int
     model_breakdown: Dict[str, int]
+    # Estimated resident bytes of exact stores + semantic caches (levy/cache/sizing.py);
+    # the peak sums per-structure high-water marks, so it is an upper bound.
+    cache_bytes: int = 0
+    peak_cache_bytes: int = 0
 
 
 class ClearResponse(BaseModel):
@@ -1,5 +1,8 @@
 from abc import ABC, abstractmethod
 from typing import Optional, List, Tuple
+
+import numpy as np
+
 from levy.models import CacheEntry, LLMRequest
 
 class CacheInterface(ABC):
@@ -11,7 +14,7 @@ class CacheInterface(ABC):
         pass
 
     @abstractmethod
-    def set(self, request: LLMRequest, response_text: str, embedding: Optional[List[float]] = None) -> None:
+    def set(self, request: LLMRequest, response_text: str, embedding: Optional[np.ndarray] = None) -> None:
         """Store a new entry."""
         pass
     
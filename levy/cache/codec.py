@@ -0,0 +1,160 @@
+"""
+Compact binary encoding of CacheEntry for Redis (and any other byte store).
+
+Layout (little-endian), version 1:
+
+    magic  b"LVC"            3 bytes
+    version, flags           u8, u8
+    created_at, expires_at   f64, f64   (expires_at is NaN when unset)
+    access_count, dim        u32, u32   (dim 0 = no embedding)
+    len(key_hash)            u16
+    len(prompt), len(response), len(metadata)   u32 x 3
+    key_hash | prompt | response | metadata JSON | embedding float32 bytes
+
+Only `metadata` stays JSON (it is small and free-form). The embedding is raw
+float32, 4 bytes per dimension instead of roughly 20 as JSON text, and decodes
+with `np.frombuffer`. `response_text` is compressed with zstd (if
+`zstandard` is installed) or zlib once it is at least `compress_min_bytes` long.
+
+`decode_entry` also accepts the legacy JSON payload (anything starting with `{`),
+so existing Redis data stays readable after an upgrade.
+"""
+
+import json
+import math
+import struct
+import zlib
+from dataclasses import asdict
+from typing import Optional
+
+import numpy as np
+
+from levy.models import CacheEntry
+
+MAGIC = b"LVC"
+VERSION = 1
+
+FLAG_ZLIB = 0x01
+FLAG_ZSTD = 0x02
+
+_HEADER = struct.Struct("<3sBBddIIHIII")
+
+COMPRESSION_CODECS = ("auto", "zstd", "zlib", "none")
+
+
+def _zstd():
+    try:
+        import zstandard
+    except ImportError:
+        return None
+    return zstandard
+
+
+def resolve_compression(name: str) -> str:
+    """Map a configured codec name to the one actually used ("auto" prefers zstd, then zlib)."""
+    if name not in COMPRESSION_CODECS:
+        raise ValueError(f"Unknown compression {name!r}; expected one of {COMPRESSION_CODECS}")
+    if name == "auto":
+        return "zstd" if _zstd() is not None else "zlib"
+    if name == "zstd" and _zstd() is None:
+        raise ImportError("zstd compression needs `pip install zstandard`.")
+    return name
+
+
+def encode_entry(entry: CacheEntry, compression: str = "zlib", compress_min_bytes: int = 512) -> bytes:
+    """Serialise `entry`; `compression` is a resolved codec name ("zstd", "zlib" or "none")."""
+    key_hash = entry.key_hash.encode("utf-8")
+    prompt = entry.prompt.encode("utf-8")
+    response = entry.response_text.encode("utf-8")
+    metadata = json.dumps(entry.metadata, separators=(",", ":")).encode("utf-8") if entry.metadata else b""
+    embedding = b"" if entry.embedding is None else np.ascontiguousarray(entry.embedding, dtype=np.float32).tobytes()
+
+    flags = 0
+    if compression != "none" and len(response) >= compress_min_bytes:
+        if compression == "zstd":
+            response = _zstd().ZstdCompressor().compress(response)
+            flags |= FLAG_ZSTD
+        else:
+            response = zlib.compress(response)
+            flags |= FLAG_ZLIB
+
+    header = _HEADER.pack(
+        MAGIC,
+        VERSION,
+        flags,
+        entry.created_at,
+        math.nan if entry.expires_at is None else entry.expires_at,
+        entry.access_count,
+        len(embedding) // 4,
+        len(key_hash),
+        len(prompt),
+        len(response),
+        len(metadata),
+    )
+    return b"".join((header, key_hash, prompt, response, metadata, embedding))
+
+
+def _decode_legacy_json(data: bytes) -> CacheEntry:
+    fields = json.loads(data)
+    if fields.get("embedding") is not None:
+        fields["embedding"] = np.asarray(fields["embedding"], dtype=np.float32)
+    return CacheEntry(**fields)
+
+
+def decode_entry(data: bytes) -> CacheEntry:
+    """Inverse of encode_entry; also reads legacy JSON payloads. Raises ValueError on garbage."""
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    if data[:1] == b"{":
+        return _decode_legacy_json(data)
+    if data[:3] != MAGIC or len(data) < _HEADER.size:
+        raise ValueError("Not a Levy cache entry payload")
+
+    (_, version, flags, created_at, expires_at, access_count, dim,
+     n_key, n_prompt, n_response, n_metadata) = _HEADER.unpack_from(data)
+    if version != VERSION:
+        raise ValueError(f"Unsupported cache entry version {version}")
+
+    view = memoryview(data)
+    offset = _HEADER.size
+    key_hash = bytes(view[offset:offset + n_key]).decode("utf-8")
+    offset += n_key
+    prompt = bytes(view[offset:offset + n_prompt]).decode("utf-8")
+    offset += n_prompt
+    response = bytes(view[offset:offset + n_response])
+    offset += n_response
+    metadata = bytes(view[offset:offset + n_metadata])
+    offset += n_metadata
+    if offset + dim * 4 != len(data):
+        raise ValueError("Truncated Levy cache entry payload")
+
+    if flags & FLAG_ZSTD:
+        zstandard = _zstd()
+        if zstandard is None:
+            raise ValueError("Entry is zstd-compressed but `zstandard` is not installed")
+        response = zstandard.ZstdDecompressor().decompress(response)
+    elif flags & FLAG_ZLIB:
+        response = zlib.decompress(response)
+
+    embedding: Optional[np.ndarray] = None
+    if dim:
+        embedding = np.frombuffer(data, dtype=np.float32, count=dim, offset=offset)
+
+    return CacheEntry(
+        key_hash=key_hash,
+        prompt=prompt,
+        response_text=response.decode("utf-8"),
+        embedding=embedding,
+        created_at=created_at,
+        access_count=access_count,
+        expires_at=None if math.isnan(expires_at) else expires_at,
+        metadata=json.loads(metadata) if metadata else {},
+    )
+
+
+def encode_entry_json(entry: CacheEntry) -> str:
+    """The legacy JSON encoding (kept for `redis_serialization="json"`)."""
+    data = asdict(entry)
+    if entry.embedding is not None:
+        data["embedding"] = np.asarray(entry.embedding, dtype=np.float32).tolist()
+    return json.dumps(data)
@@ -0,0 +1,298 @@
+"""
+Eviction and admission policies for InMemoryStore.
+
+A policy tracks the keys of one bounded store and decides which of them go when
+a new key arrives. The store calls:
+
+    record_access(key)  on every lookup, hit or miss (a no-op for absent keys,
+                        except for the frequency sketch of W-TinyLFU)
+    admit(key)          for a new key; returns the keys to evict, which may be
+                        `key` itself when an admission filter rejects it
+    remove(key)         on an explicit delete
+    evict_one()         to free space for a byte budget; returns the next victim
+    clear()
+
+Policies:
+
+- "lru": evict the least recently used key.
+- "lfu": evict the least frequently used key, ties broken by recency. Uses O(1)
+  frequency buckets.
+- "w-tinylfu": the Caffeine design (Einziger et al., "TinyLFU: A Highly
+  Efficient Cache Admission Policy").
+  - A 1% LRU window takes new keys. It lets bursts of fresh keys build up
+    frequency.
+  - Keys leaving the window are admitted to a segmented-LRU main region
+    (20% probation, 80% protected) only if a count-min sketch estimates them
+    more frequent than the main region's victim.
+  - One-off prompts therefore cannot push out hot FAQ answers.
+
+Every operation is O(1), apart from the periodic halving of the sketch counters
+(amortised over `10 * width` increments).
+"""
+
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Dict, Hashable, List, Optional
+
+EVICTION_POLICIES = ("lru", "lfu", "w-tinylfu")
+
+_MASK64 = (1 << 64) - 1
+# Odd 64-bit multipliers, one per sketch row (multiplicative hashing).
+_ROW_MULTIPLIERS = (0x9E3779B97F4A7C15, 0xC2B2AE3D27D4EB4F, 0x165667B19E3779F9, 0xD6E8FEB86659FD93)
+
+
+class EvictionPolicy(ABC):
+    """Key bookkeeping for a store bounded at `capacity` keys (None or 0: unbounded)."""
+
+    name = "base"
+
+    def __init__(self, capacity: Optional[int]) -> None:
+        self.capacity = capacity or 0
+        self.rejections = 0  # keys turned away by an admission filter (W-TinyLFU only)
+
+    @abstractmethod
+    def record_access(self, key: Hashable) -> None:
+        """A lookup of `key` (present or not)."""
+
+    @abstractmethod
+    def admit(self, key: Hashable) -> List[Hashable]:
+        """Start tracking a new `key`; return the keys the store must drop."""
+
+    @abstractmethod
+    def remove(self, key: Hashable) -> None:
+        """Stop tracking `key` (explicit delete); a no-op for unknown keys."""
+
+    @abstractmethod
+    def evict_one(self) -> Optional[Hashable]:
+        """Stop tracking and return the key this policy would evict next (None if empty)."""
+
+    @abstractmethod
+    def clear(self) -> None:
+        """Forget every key."""
+
+    @abstractmethod
+    def __len__(self) -> int:
+        """Number of tracked keys."""
+
+
+class LRUPolicy(EvictionPolicy):
+
+    name = "lru"
+
+    def __init__(self, capacity: Optional[int]) -> None:
+        super().__init__(capacity)
+        self._order: "OrderedDict[Hashable, None]" = OrderedDict()
+
+    def record_access(self, key):
+        if key in self._order:
+            self._order.move_to_end(key)
+
+    def admit(self, key):
+        evicted = []
+        if self.capacity and len(self._order) >= self.capacity:
+            evicted.append(self._order.popitem(last=False)[0])
+        self._order[key] = None
+        return evicted
+
+    def remove(self, key):
+        self._order.pop(key, None)
+
+    def evict_one(self):
+        return self._order.popitem(last=False)[0] if self._order else None
+
+    def clear(self):
+        self._order.clear()
+
+    def __len__(self):
+        return len(self._order)
+
+
+class LFUPolicy(EvictionPolicy):
+    """Frequency buckets: count -> keys in LRU order, plus the current minimum count."""
+
+    name = "lfu"
+
+    def __init__(self, capacity: Optional[int]) -> None:
+        super().__init__(capacity)
+        self._counts: Dict[Hashable, int] = {}
+        self._buckets: Dict[int, "OrderedDict[Hashable, None]"] = {}
+        self._min_count = 0
+
+    def _unlink(self, key) -> int:
+        count = self._counts.pop(key)
+        bucket = self._buckets[count]
+        del bucket[key]
+        if not bucket:
+            del self._buckets[count]
+            if self._min_count == count:
+                self._min_count = count + 1
+        return count
+
+    def _link(self, key, count: int) -> None:
+        self._counts[key] = count
+        self._buckets.setdefault(count, OrderedDict())[key] = None
+
+    def record_access(self, key):
+        if key in self._counts:
+            self._link(key, self._unlink(key) + 1)
+
+    def admit(self, key):
+        evicted = []
+        if self.capacity and len(self._counts) >= self.capacity:
+            evicted.append(self.evict_one())
+        self._link(key, 1)
+        self._min_count = 1
+        return evicted
+
+    def evict_one(self):
+        if not self._counts:
+            return None
+        if self._min_count not in self._buckets:  # emptied by remove()
+            self._min_count = min(self._buckets)
+        victim = next(iter(self._buckets[self._min_count]))
+        self._unlink(victim)
+        return victim
+
+    def remove(self, key):
+        if key in self._counts:
+            self._unlink(key)
+
+    def clear(self):
+        self._counts.clear()
+        self._buckets.clear()
+        self._min_count = 0
+
+    def __len__(self):
+        return len(self._counts)
+
+
+class CountMinSketch:
+    """
+    Approximate access frequencies in 4 rows of 4-bit counters (capped at 15).
+
+    Increments are conservative: only the row counters at the current minimum are
+    bumped. After `sample_size` increments every counter is halved, so old
+    popularity fades.
+    """
+
+    MAX_COUNT = 15
+
+    def __init__(self, capacity: int) -> None:
+        width = 16
+        while width < max(capacity, 1):
+            width <<= 1
+        self.width = width
+        self._shift = 64 - (width.bit_length() - 1)
+        self._rows = [bytearray(width) for _ in _ROW_MULTIPLIERS]
+        self.sample_size = 10 * width
+        self._additions = 0
+
+    def _indexes(self, key):
+        h = hash(key) & _MASK64
+        return [((h * multiplier) & _MASK64) >> self._shift for multiplier in _ROW_MULTIPLIERS]
+
+    def frequency(self, key) -> int:
+        return min(row[i] for row, i in zip(self._rows, self._indexes(key)))
+
+    def increment(self, key) -> None:
+        indexes = self._indexes(key)
+        current = min(row[i] for row, i in zip(self._rows, indexes))
+        if current >= self.MAX_COUNT:
+            return
+        for row, i in zip(self._rows, indexes):
+            if row[i] == current:
+                row[i] = current + 1
+        self._additions += 1
+        if self._additions >= self.sample_size:
+            self._age()
+
+    def _age(self) -> None:
+        self._rows = [bytearray(count >> 1 for count in row) for row in self._rows]
+        self._additions //= 2
+
+    def clear(self) -> None:
+        self._rows = [bytearray(self.width) for _ in self._rows]
+        self._additions = 0
+
+
+class WTinyLFUPolicy(EvictionPolicy):
+
+    name = "w-tinylfu"
+
+    def __init__(self, capacity: Optional[int], window_fraction: float = 0.01, protected_fraction: float = 0.8) -> None:
+        super().__init__(capacity)
+        self.sketch = CountMinSketch(self.capacity or 1024)
+        self._window_size = max(1, int(self.capacity * window_fraction)) if self.capacity else 0
+        main_size = self.capacity - self._window_size
+        self._protected_size = int(main_size * protected_fraction)
+        self._main_size = main_size
+        self._window: "OrderedDict[Hashable, None]" = OrderedDict()
+        self._probation: "OrderedDict[Hashable, None]" = OrderedDict()
+        self._protected: "OrderedDict[Hashable, None]" = OrderedDict()
+
+    def record_access(self, key):
+        self.sketch.increment(key)
+        if key in self._window:
+            self._window.move_to_end(key)
+        elif key in self._protected:
+            self._protected.move_to_end(key)
+        elif key in self._probation:
+            del self._probation[key]
+            self._protected[key] = None
+            if len(self._protected) > self._protected_size:
+                demoted = self._protected.popitem(last=False)[0]
+                self._probation[demoted] = None
+
+    def admit(self, key):
+        self.sketch.increment(key)
+        self._window[key] = None
+        if not self.capacity or len(self._window) <= self._window_size:
+            return []
+        candidate = self._window.popitem(last=False)[0]
+        if not self._main_size:
+            return [candidate]
+        if len(self._probation) + len(self._protected) < self._main_size:
+            self._probation[candidate] = None
+            return []
+        if not self._probation:  # every main slot is protected: demote one to compete
+            self._probation[self._protected.popitem(last=False)[0]] = None
+        victim = next(iter(self._probation))
+        if self.sketch.frequency(candidate) > self.sketch.frequency(victim):
+            del self._probation[victim]
+            self._probation[candidate] = None
+            return [victim]
+        self.rejections += 1
+        return [candidate]
+
+    def evict_one(self):
+        # Coldest first: probation (never re-used in main), then window, then protected.
+        for segment in (self._probation, self._window, self._protected):
+            if segment:
+                return segment.popitem(last=False)[0]
+        return None
+
+    def remove(self, key):
+        for segment in (self._window, self._probation, self._protected):
+            if key in segment:
+                del segment[key]
+                return
+
+    def clear(self):
+        self._window.clear()
+        self._probation.clear()
+        self._protected.clear()
+        self.sketch.clear()
+
+    def __len__(self):
+        return len(self._window) + len(self._probation) + len(self._protected)
+
+
+def make_eviction_policy(name: str, capacity: Optional[int]) -> EvictionPolicy:
+    """Build the policy called `name` ("lru", "lfu" or "w-tinylfu") for `capacity` keys."""
+    if name == "lru":
+        return LRUPolicy(capacity)
+    if name == "lfu":
+        return LFUPolicy(capacity)
+    if name == "w-tinylfu":
+        return WTinyLFUPolicy(capacity)
+    raise ValueError(f"Unknown eviction policy {name!r}; expected one of {EVICTION_POLICIES}")
@@ -1,19 +1,24 @@
 from typing import Optional, List
+
+import numpy as np
+
 from levy.cache.base import CacheInterface
+from levy.cache.keys import KeySchema
 from levy.cache.store import InMemoryStore
 from levy.models import LLMRequest, CacheEntry
-import hashlib
 
 class ExactCache(CacheInterface):
-    def __init__(self, store: InMemoryStore):
+    def __init__(self, store: InMemoryStore, key_schema: Optional[KeySchema] = None):
         self.store = store
+        # Canonical prompt + model + generation parameters (levy/cache/keys.py).
+        self.key_schema = key_schema if key_schema is not None else KeySchema()
 
-    def _get_key(self, prompt: str) -> str:
-        # Simple hash of the prompt
-        return hashlib.sha256(prompt.encode('utf-8')).hexdigest()
+    def key_for(self, request: LLMRequest) -> str:
+        """Store key for a request (also the engine's single-flight coalescing key)."""
+        return self.key_schema.key_for(request)
 
     def get(self, request: LLMRequest) -> Optional[CacheEntry]:
-        key = self._get_key(request.prompt)
+        key = self.key_for(request)
         entry = self.store.get(key)
         
         if entry:
@@ -28,10 +33,10 @@ class ExactCache(CacheInterface):
         self,
         request: LLMRequest,
         response_text: str,
-        embedding: Optional[List[float]] = None,
+        embedding: Optional[np.ndarray] = None,
         metadata: Optional[dict] = None,
     ) -> None:
-        key = self._get_key(request.prompt)
+        key = self.key_for(request)
         entry = CacheEntry(
             key_hash=key,
             prompt=request.prompt,
@@ -0,0 +1,94 @@
+"""
+Exact-cache keys: prompt canonicalization plus the generation parameters.
+
+The exact cache used to hash the raw prompt alone. That was wrong in two ways:
+- The same prompt sent with a different model, `max_tokens`, `temperature` or
+  extra parameter shared a key, and so shared a response.
+- Prompts differing only in Unicode form or whitespace missed, falling through
+  to the far more expensive embedding + semantic path.
+
+`canonicalize_prompt` applies, in order and each switchable:
+- Unicode NFKC ("ｆｕｌｌ-ｗｉｄｔｈ", ligatures and the like)
+- whitespace collapse (any run becomes one space, ends trimmed)
+- case folding
+- trailing punctuation stripping
+
+`KeySchema.key_for` hashes the canonical prompt together with the model and the
+effective generation parameters as a sorted-key JSON document. Equal requests
+get equal keys regardless of parameter order. Bumping `KEY_VERSION` orphans old
+keys instead of misreading them.
+"""
+
+import hashlib
+import json
+import re
+import unicodedata
+from dataclasses import dataclass
+from typing import Any, Dict
+
+from levy.models import LLMRequest
+
+KEY_VERSION = 2
+
+_WHITESPACE = re.compile(r"\s+")
+# Sentence-final marks that rarely change what the model is asked ("...?" vs "...").
+_TRAILING_PUNCTUATION = ".?!;:,。？！"
+
+
+def canonicalize_prompt(
+    prompt: str,
+    normalize_unicode: bool = True,
+    collapse_whitespace: bool = True,
+    casefold: bool = False,
+    strip_trailing_punctuation: bool = False,
+) -> str:
+    if normalize_unicode:
+        prompt = unicodedata.normalize("NFKC", prompt)
+    if collapse_whitespace:
+        prompt = _WHITESPACE.sub(" ", prompt).strip()
+    if casefold:
+        prompt = prompt.casefold()
+    if strip_trailing_punctuation:
+        prompt = prompt.rstrip(_TRAILING_PUNCTUATION).rstrip()
+    return prompt
+
+
+@dataclass(frozen=True)
+class KeySchema:
+    """How ExactCache turns a request into a store key.
+
+    `model` namespaces the keys (engines built for different LLMs never share
+    answers). With `include_params` off, only the model and canonical prompt
+    are hashed, for deployments that deliberately serve one answer per prompt.
+    """
+
+    model: str = ""
+    normalize_unicode: bool = True
+    collapse_whitespace: bool = True
+    casefold: bool = False
+    strip_trailing_punctuation: bool = False
+    include_params: bool = True
+
+    def canonical_prompt(self, prompt: str) -> str:
+        return canonicalize_prompt(
+            prompt,
+            normalize_unicode=self.normalize_unicode,
+            collapse_whitespace=self.collapse_whitespace,
+            casefold=self.casefold,
+            strip_trailing_punctuation=self.strip_trailing_punctuation,
+        )
+
+    @staticmethod
+    def generation_params(request: LLMRequest) -> Dict[str, Any]:
+        """The parameters the LLM call actually uses (extra_params override the fields,
+        as in the clients' payloads)."""
+        params: Dict[str, Any] = {"max_tokens": request.max_tokens, "temperature": float(request.temperature)}
+        params.update(request.extra_params)
+        return params
+
+    def key_for(self, request: LLMRequest) -> str:
+        document = {"v": KEY_VERSION, "model": self.model, "prompt": self.canonical_prompt(request.prompt)}
+        if self.include_params:
+            document["params"] = self.generation_params(request)
+        encoded = json.dumps(document, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+        return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
@@ -1,72 +1,171 @@
-import json
-import redis
-from typing import Dict, List, Optional
-from levy.cache.store import InMemoryStore
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional
+
+from levy.cache.codec import decode_entry, encode_entry, encode_entry_json, resolve_compression
 from levy.models import CacheEntry
 
+# Keys per MGET / pipeline round trip in get_many / set_many.
+_BATCH = 500
+
+# Redis set holding the keys of every entry that carries an embedding.
+EMBEDDING_INDEX_KEY = "levy:embedding_keys"
+
+
 class RedisStore:
     """
     Redis-backed storage for cache entries.
     Implements the same interface as InMemoryStore (duck typing).
+
+    Entries are stored in the compact binary format of levy/cache/codec.py (raw
+    float32 embedding, optionally compressed response); `serialization="json"`
+    keeps the legacy JSON payload. Both formats are readable regardless of the
+    setting. Connections come from one pool per store (`max_connections`).
+
+    Keys of entries with an embedding are also added to the set `index_key`, so
+    semantic rebuilds walk that set with SSCAN in bounded chunks instead of
+    running `KEYS *` over the whole keyspace.
     """
-    def __init__(self, redis_url: str = "redis://localhost:6379/0", ttl: int = 3600):
-        self.client = redis.from_url(redis_url)
+    def __init__(
+        self,
+        redis_url: str = "redis://localhost:6379/0",
+        ttl: int = 3600,
+        max_connections: Optional[int] = None,
+        socket_timeout: Optional[float] = None,
+        serialization: str = "binary",
+        compression: str = "auto",
+        compress_min_bytes: int = 512,
+        client: Optional[Any] = None,
+        index_key: str = EMBEDDING_INDEX_KEY,
+    ):
+        if serialization not in ("binary", "json"):
+            raise ValueError(f"Unknown serialization {serialization!r}; expected 'binary' or 'json'")
+        if client is None:
+            import redis  # deferred: redis-py is only imported when a Redis store is configured
+
+            pool = redis.ConnectionPool.from_url(
+                redis_url,
+                max_connections=max_connections,
+                socket_timeout=socket_timeout,
+                socket_connect_timeout=socket_timeout,
+            )
+            client = redis.Redis(connection_pool=pool)
+        self.client = client
         self.ttl = ttl
-        # Note: Generic Redis is not great for vector search iteration without RediSearch.
-        # For this prototype, we will stick to Key-Value storage for Exact Cache,
-        # and maybe suboptimal methods for Semantic if strictly needed,
-        # OR we just implement exact cache persistence here.
-        # For the research scope, let's allow fetching all keys for semantic scan (slow but works for small scale).
+        self.serialization = serialization
+        self.compression = resolve_compression(compression)
+        self.compress_min_bytes = compress_min_bytes
+        self.index_key = index_key
+
+    def _encode(self, entry: CacheEntry):
+        if self.serialization == "json":
+            return encode_entry_json(entry)
+        return encode_entry(entry, self.compression, self.compress_min_bytes)
+
+    @staticmethod
+    def _decode(data) -> Optional[CacheEntry]:
+        if not data:
+            return None
+        try:
+            return decode_entry(data)
+        except Exception:
+            return None
 
     def get(self, key: str) -> CacheEntry | None:
-        data = self.client.get(key)
-        if data:
-            try:
-                # We assume we store as JSON
-                entry_dict = json.loads(data)
-                # Reconstruct CacheEntry (basic fields)
-                # Note: CacheEntry has methods/defaults that might need care, 
-                # but for now we just map the dict back.
-                # A proper serialization schema is better, but this is a prototype.
-                return CacheEntry(**entry_dict)
-            except Exception:
-                return None
-        return None
+        return self._decode(self.client.get(key))
+
+    def _queue_index_update(self, pipe, key: str, entry: CacheEntry) -> None:
+        if entry.embedding is not None:
+            pipe.sadd(self.index_key, key)
+        else:
+            pipe.srem(self.index_key, key)  # an overwrite may have dropped the embedding
 
     def set(self, key: str, entry: CacheEntry):
-        # Serialize to JSON (assuming basics are serializable)
-        # We need to handle 'embedding' which is a list of floats (fine),
-        # but what about 'metadata'? Fine if JSON serializable.
-        
-        # We need to act like a dict for `CacheEntry`, so we convert to dict.
-        # Check if helper method `asdict` exists or use `__dict__`? 
-        # dataclasses.asdict is safer.
-        from dataclasses import asdict
-        data = asdict(entry)
-        
-        self.client.set(key, json.dumps(data), ex=self.ttl)
+        pipe = self.client.pipeline(transaction=False)
+        pipe.set(key, self._encode(entry), ex=self.ttl)
+        self._queue_index_update(pipe, key, entry)
+        pipe.execute()
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, CacheEntry]:
+        """Fetch many keys with one MGET per batch; missing or unreadable keys are omitted."""
+        keys = list(keys)
+        found: Dict[str, CacheEntry] = {}
+        for start in range(0, len(keys), _BATCH):
+            chunk = keys[start:start + _BATCH]
+            for key, data in zip(chunk, self.client.mget(chunk)):
+                entry = self._decode(data)
+                if entry is not None:
+                    found[key] = entry
+        return found
+
+    def set_many(self, entries: Mapping[str, CacheEntry]) -> None:
+        """Write many entries through a non-transactional pipeline, one round trip per batch."""
+        items = list(entries.items())
+        for start in range(0, len(items), _BATCH):
+            pipe = self.client.pipeline(transaction=False)
+            for key, entry in items[start:start + _BATCH]:
+                pipe.set(key, self._encode(entry), ex=self.ttl)
+                self._queue_index_update(pipe, key, entry)
+            pipe.execute()
 
     def delete(self, key: str):
-        self.client.delete(key)
-    
+        pipe = self.client.pipeline(transaction=False)
+        pipe.delete(key)
+        pipe.srem(self.index_key, key)
+        pipe.execute()
+
+    def iter_entries_with_embeddings(self, chunk_size: int = _BATCH) -> Iterator[CacheEntry]:
+        """
+        Stream entries that carry an embedding, `chunk_size` keys at a time.
+
+        Each step is one SSCAN over the index set plus one MGET, so the server is
+        never blocked for long and at most one chunk is held in memory. Keys whose
+        value has expired (TTL) are pruned from the index as they are found.
+
+        SSCAN may return a member in more than one step (e.g. while the set is
+        rehashing). Repeats are dropped within a chunk only; remembering every key
+        would grow with the whole keyspace. A rare repeat across chunks is harmless
+        to `SemanticCache.bulk_load`, which skips prompts it already holds.
+        """
+        cursor = 0
+        while True:
+            cursor, keys = self.client.sscan(self.index_key, cursor=cursor, count=chunk_size)
+            keys = list(dict.fromkeys(keys))
+            if keys:
+                stale = []
+                for key, data in zip(keys, self.client.mget(keys)):
+                    if not data:
+                        stale.append(key)
+                        continue
+                    entry = self._decode(data)
+                    if entry is not None and entry.embedding is not None:
+                        yield entry
+                if stale:
+                    self.client.srem(self.index_key, *stale)
+            if int(cursor) == 0:
+                return
+
     def get_all_with_embeddings(self) -> List[CacheEntry]:
-        # WARNING: SLOW operations - fetch all keys and values.
-        # In a real "Kafka for AI" system, use RediSearch or a VectorDB.
-        keys = self.client.keys("*")
-        entries = []
-        if keys:
-            # Batch get
-            values = self.client.mget(keys)
-            from dataclasses import asdict, is_dataclass
-            
-            for v in values:
-                if v:
-                    try:
-                        d = json.loads(v)
-                        entries.append(CacheEntry(**d))
-                    except:
-                        pass
-        return entries
+        return list(self.iter_entries_with_embeddings())
+
+    def rebuild_embedding_index(self, chunk_size: int = _BATCH) -> int:
+        """
+        Re-create the index set from the keyspace (for data written before it
+        existed). Uses incremental SCAN, never `KEYS *`. Returns the number of
+        keys newly added to the index.
+        """
+        added = 0
+        cursor = 0
+        while True:
+            cursor, keys = self.client.scan(cursor=cursor, count=chunk_size)
+            keys = [k for k in keys if k not in (self.index_key, self.index_key.encode("utf-8"))]
+            if keys:
+                with_embedding = [
+                    key for key, data in zip(keys, self.client.mget(keys))
+                    if (entry := self._decode(data)) is not None and entry.embedding is not None
+                ]
+                if with_embedding:
+                    added += self.client.sadd(self.index_key, *with_embedding)
+            if int(cursor) == 0:
+                return added
 
     def clear(self):
         self.client.flushdb()
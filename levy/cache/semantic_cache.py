@@ -7,16 +7,40 @@ Retrieval follows Algorithm 1 from the frozen S&D Report exactly:
 
 Internal-id→entry mapping (spec: "separate metadata dictionary mapping internal IDs
 to (query_text, response, embedding_model)") is held in self._entries.
+
+Bounding: `max_size` caps the number of entries with LRU eviction (a hit refreshes
+recency) and `ttl_seconds` stamps `expires_at` on every stored entry; expired entries
+are dropped when they surface in a lookup or reach the LRU head, and in bulk by
+`purge_expired()`. Evicted ids are removed from the VectorIndex as well, so memory
+stays flat in a long-running process. `max_bytes` adds a memory budget: every
+entry is charged its estimated size (levy/cache/sizing.py) plus the index's copy
+of its vector, and LRU entries are evicted until a new one fits; `nbytes` and
+`peak_nbytes` report current and high-water usage.
+
+Snapshots: `save(path)` writes the index in its backend's native format (faiss
+`write_index` / `.npy`) next to an `entries.json` sidecar holding the id→entry map
+and an `embeddings.npy` matrix with one row per sidecar entry, and `load(path)`
+restores all three for a warm start. Loaded entries get their vectors back, so they
+are charged exactly what `set` charges.
+
+Rebuild from a store: `bulk_load(entries)` adds already-embedded entries (e.g.
+streamed from RedisStore after a restart) with batched `VectorIndex.add_many`
+calls, without re-embedding anything.
 """
 
 import hashlib
+import json
 import logging
-from typing import Dict, List, Optional
+import os
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, Optional
 
 import numpy as np
 
 from levy.cache.base import CacheInterface
-from levy.cache.vector_index import VectorIndex, _l2_normalize, make_vector_index
+from levy.cache.sizing import embedding_nbytes, entry_nbytes
+from levy.cache.vector_index import VectorIndex, _atomic_npy_save, _l2_normalize, make_vector_index
 from levy.models import CacheEntry, LLMRequest
 
 logger = logging.getLogger(__name__)
@@ -28,15 +52,24 @@ class SemanticCache(CacheInterface):
 
     Parameters
     ----------
-    embedding_client : object with embed(text) -> list[float] and get_dimension() -> int
+    embedding_client : object with embed(text) -> float32 ndarray and get_dimension() -> int
         Typically an EmbeddingManager instance.
     vector_index : VectorIndex, optional
         Pre-constructed index (for tests). If None, built from backend/hnsw params.
     backend, m, ef_construction, ef_search : forwarded to make_vector_index when
         vector_index is None.
     threshold : similarity threshold in 1/(1+L2) space.
+    max_size : maximum number of entries (LRU eviction); None or 0 means unbounded.
+    ttl_seconds : entry lifetime; None or 0 means entries never expire.
+    max_bytes : memory budget in estimated bytes (LRU eviction); None or 0 means unbounded.
     """
 
+    @property
+    def supports_snapshots(self) -> bool:
+        """Whether save/load write and read a snapshot (False: they are no-ops because
+        the index is already persistent, e.g. SharedVectorIndex)."""
+        return getattr(self._index, "supports_snapshots", True)  # duck-typed indexes: assume so
+
     def __init__(
         self,
         embedding_client,
@@ -46,9 +79,18 @@ class SemanticCache(CacheInterface):
         m: int = 32,
         ef_construction: int = 200,
         ef_search: int = 64,
+        max_size: Optional[int] = None,
+        ttl_seconds: Optional[float] = None,
+        max_bytes: Optional[int] = None,
     ) -> None:
         self.embedding_client = embedding_client
         self.threshold = threshold
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.evictions: int = 0
+        self.nbytes: int = 0
+        self.peak_nbytes: int = 0
 
         self._index: VectorIndex = (
             vector_index
@@ -61,34 +103,45 @@ class SemanticCache(CacheInterface):
             )
         )
         # spec "separate metadata dictionary mapping internal IDs to (query_text, response, embedding_model)"
-        self._entries: Dict[int, CacheEntry] = {}
+        # Ordered least- to most-recently used.
+        self._entries: "OrderedDict[int, CacheEntry]" = OrderedDict()
+        self._sizes: Dict[int, int] = {}
         self._next_id: int = 0
 
     # ------------------------------------------------------------------
     # CacheInterface
     # ------------------------------------------------------------------
 
-    def get(self, request: LLMRequest) -> Optional[CacheEntry]:
+    def get(self, request: LLMRequest, threshold: Optional[float] = None) -> Optional[CacheEntry]:
+        """Nearest-neighbour lookup. `threshold` overrides self.threshold for this call
+        only, so one cache can serve callers with different decision boundaries."""
         if self._index.size() == 0:
             return None
 
-        raw = self.embedding_client.embed(request.prompt)
-        q_vec = _l2_normalize(np.array(raw, dtype=np.float32))
+        q_vec = _l2_normalize(self.embedding_client.embed(request.prompt))
+        threshold = self.threshold if threshold is None else threshold
 
-        ids, distances = self._index.search(q_vec.tolist(), k=1)
-        if not ids:
-            return None
+        # An expired nearest neighbour is dropped and the search repeated, so a live
+        # near-duplicate just behind it still hits.
+        while True:
+            ids, distances = self._index.search(q_vec, k=1)
+            if not ids:
+                return None
 
-        distance = distances[0]
-        similarity = 1.0 / (1.0 + distance)
+            distance = distances[0]
+            similarity = 1.0 / (1.0 + distance)
 
-        if similarity < self.threshold:
-            return None
+            if similarity < threshold:
+                return None
 
-        entry = self._entries.get(ids[0])
-        if entry is None:
-            return None
+            entry = self._entries.get(ids[0])
+            if entry is None:
+                return None
+            if not entry.is_expired():
+                break
+            self.delete(ids[0])
 
+        self._entries.move_to_end(ids[0])
         entry.access_count += 1
         entry.metadata["last_similarity_score"] = float(similarity)
         return entry
@@ -97,34 +150,231 @@ class SemanticCache(CacheInterface):
         self,
         request: LLMRequest,
         response_text: str,
-        embedding: Optional[List[float]] = None,
+        embedding: Optional[np.ndarray] = None,
         metadata: Optional[dict] = None,
     ) -> None:
         if embedding is None:
             embedding = self.embedding_client.embed(request.prompt)
 
-        vec = _l2_normalize(np.array(embedding, dtype=np.float32))
-        entry_id = self._next_id
-        self._next_id += 1
-
+        vec = _l2_normalize(embedding)
         key_hash = hashlib.sha256(request.prompt.encode("utf-8")).hexdigest()
         entry = CacheEntry(
             key_hash=key_hash,
             prompt=request.prompt,
             response_text=response_text,
-            embedding=vec.tolist(),
+            embedding=vec,
+            expires_at=time.time() + self.ttl_seconds if self.ttl_seconds else None,
             metadata=metadata or {},
         )
-        self._index.add(vec.tolist(), entry_id)
-        self._entries[entry_id] = entry
+        size = self._cost(entry)
+        if self.max_bytes and size > self.max_bytes:
+            return  # larger than the whole budget: caching it would flush everything
+        self._make_room(size)
+        entry_id = self._next_id
+        self._next_id += 1
+        self._index.add(vec, entry_id)
+        self._track(entry_id, entry, size)
 
     def clear(self) -> None:
         self.reset()
 
+    def delete(self, entry_id: int) -> bool:
+        """Remove one entry from both the id→entry map and the index."""
+        if self._entries.pop(entry_id, None) is None:
+            return False
+        self.nbytes -= self._sizes.pop(entry_id, 0)
+        self._index.remove(entry_id)
+        return True
+
+    def purge_expired(self) -> int:
+        """Drop every expired entry; returns how many were removed."""
+        expired = [entry_id for entry_id, entry in self._entries.items() if entry.is_expired()]
+        for entry_id in expired:
+            self.delete(entry_id)
+        self.evictions += len(expired)
+        return len(expired)
+
+    @staticmethod
+    def _cost(entry: CacheEntry) -> int:
+        # The index keeps its own copy of the vector next to the entry's.
+        return entry_nbytes(entry) + embedding_nbytes(entry.embedding)
+
+    def _track(self, entry_id: int, entry: CacheEntry, size: int) -> None:
+        self._entries[entry_id] = entry
+        self._sizes[entry_id] = size
+        self.nbytes += size
+        self.peak_nbytes = max(self.peak_nbytes, self.nbytes)
+
+    def _over_budget(self, incoming: int = 0) -> bool:
+        return bool(self.max_bytes) and self.nbytes + incoming > self.max_bytes
+
+    def _make_room(self, incoming: int = 0) -> None:
+        """Before an insert: drop expired entries at the LRU head, then evict to fit
+        max_size and max_bytes (with `incoming` more bytes)."""
+        while self._entries:
+            entry_id, entry = next(iter(self._entries.items()))
+            if not (
+                entry.is_expired()
+                or (self.max_size and len(self._entries) >= self.max_size)
+                or self._over_budget(incoming)
+            ):
+                break
+            self.delete(entry_id)
+            self.evictions += 1
+
+    def bulk_load(
+        self,
+        entries: Iterable[CacheEntry],
+        batch_size: int = 1024,
+        on_batch: Optional[Callable[[int], None]] = None,
+    ) -> int:
+        """Add already-embedded entries, `batch_size` vectors per `add_many` call.
+
+        Entries without an embedding, already expired, or whose prompt is already
+        cached are skipped. Loading stops once the cache holds `max_size` entries or
+        `max_bytes`, so it never evicts live ones. Entries without `expires_at` get this cache's TTL,
+        counted from their `created_at`. `on_batch(loaded_so_far)` is called after each
+        batch. Returns the number of entries added.
+        """
+        known = {entry.prompt for entry in self._entries.values()}
+        room = self.max_size - len(self._entries) if self.max_size else None
+        loaded = 0
+        batch = []
+        batch_bytes = 0
+        now = time.time()
+        for entry in entries:
+            if room is not None and loaded + len(batch) >= room:
+                break
+            if entry.embedding is None or entry.prompt in known:
+                continue
+            expires_at = entry.expires_at
+            if expires_at is None and self.ttl_seconds:
+                expires_at = entry.created_at + self.ttl_seconds
+            if expires_at is not None and expires_at <= now:
+                continue
+            loadable = CacheEntry(
+                key_hash=hashlib.sha256(entry.prompt.encode("utf-8")).hexdigest(),
+                prompt=entry.prompt,
+                response_text=entry.response_text,
+                embedding=_l2_normalize(entry.embedding),
+                created_at=entry.created_at,
+                expires_at=expires_at,
+                metadata=dict(entry.metadata),
+            )
+            if self._over_budget(batch_bytes + self._cost(loadable)):
+                break
+            known.add(entry.prompt)
+            batch.append(loadable)
+            batch_bytes += self._cost(loadable)
+            if len(batch) >= batch_size:
+                loaded += self._add_batch(batch)
+                batch = []
+                batch_bytes = 0
+                if on_batch is not None:
+                    on_batch(loaded)
+        if batch:
+            loaded += self._add_batch(batch)
+            if on_batch is not None:
+                on_batch(loaded)
+        return loaded
+
+    def _add_batch(self, batch) -> int:
+        ids = list(range(self._next_id, self._next_id + len(batch)))
+        self._index.add_many(np.stack([entry.embedding for entry in batch]), ids)
+        for entry_id, entry in zip(ids, batch):
+            self._track(entry_id, entry, self._cost(entry))
+        self._next_id += len(batch)
+        return len(batch)
+
     def size(self) -> int:
         """Number of entries currently indexed (public accessor for stats)."""
         return self._index.size()
 
+    # ------------------------------------------------------------------
+    # Snapshots (warm start across process restarts)
+    # ------------------------------------------------------------------
+
+    SNAPSHOT_VERSION = 2
+    ENTRIES_FILE = "entries.json"
+    EMBEDDINGS_FILE = "embeddings.npy"
+
+    def save(self, path: str) -> None:
+        """Write a snapshot of the index and id→entry map into directory `path`.
+        A no-op when the index does not support snapshots."""
+        if not self.supports_snapshots:
+            return
+        os.makedirs(path, exist_ok=True)
+        self._index.save(path)
+        # Row i holds the vector of sidecar entry i; entries.json is written last.
+        vectors = [entry.embedding for entry in self._entries.values()]
+        _atomic_npy_save(
+            os.path.join(path, self.EMBEDDINGS_FILE),
+            np.stack(vectors).astype(np.float32) if vectors else np.empty((0, 0), dtype=np.float32),
+        )
+        sidecar = {
+            "version": self.SNAPSHOT_VERSION,
+            "index_type": type(self._index).__name__,
+            "next_id": self._next_id,
+            # LRU order is preserved: least recently used first.
+            "entries": [
+                {
+                    "id": entry_id,
+                    "key_hash": entry.key_hash,
+                    "prompt": entry.prompt,
+                    "response_text": entry.response_text,
+                    "created_at": entry.created_at,
+                    "access_count": entry.access_count,
+                    "expires_at": entry.expires_at,
+                    "metadata": entry.metadata,
+                }
+                for entry_id, entry in self._entries.items()
+            ],
+        }
+        target = os.path.join(path, self.ENTRIES_FILE)
+        with open(target + ".tmp", "w", encoding="utf-8") as fh:
+            json.dump(sidecar, fh, separators=(",", ":"))
+        os.replace(target + ".tmp", target)
+
+    def load(self, path: str) -> int:
+        """Replace the cache contents with the snapshot in directory `path`.
+
+        Expired entries are dropped on the way in. Returns the number of live entries.
+        Raises ValueError if the snapshot was written by a different index backend, or
+        if its embeddings do not line up with its entries.
+        When the index does not support snapshots this is a no-op returning size().
+        """
+        if not self.supports_snapshots:
+            return self.size()
+        with open(os.path.join(path, self.ENTRIES_FILE), encoding="utf-8") as fh:
+            sidecar = json.load(fh)
+        if sidecar.get("version") != self.SNAPSHOT_VERSION:
+            raise ValueError(f"Unsupported semantic snapshot version {sidecar.get('version')!r} in {path}")
+        index_type = type(self._index).__name__
+        if sidecar["index_type"] != index_type:
+            raise ValueError(
+                f"Snapshot in {path} was written by {sidecar['index_type']}, "
+                f"but this cache uses {index_type}"
+            )
+
+        vectors = np.load(os.path.join(path, self.EMBEDDINGS_FILE))
+        if len(vectors) != len(sidecar["entries"]):
+            raise ValueError(
+                f"Snapshot in {path} has {len(vectors)} embeddings for {len(sidecar['entries'])} entries"
+            )
+
+        self.reset()
+        self._index.load(path)
+        for record, vector in zip(sidecar["entries"], vectors):
+            entry_id = record.pop("id")
+            entry = CacheEntry(**record, embedding=vector)
+            self._track(entry_id, entry, self._cost(entry))
+        self._next_id = sidecar["next_id"]
+        self.purge_expired()
+        while self._entries and ((self.max_size and len(self._entries) > self.max_size) or self._over_budget()):
+            self.delete(next(iter(self._entries)))
+        self.evictions = 0
+        return len(self._entries)
+
     # ------------------------------------------------------------------
     # Per-configuration reset (LEV-4 calls this between experiment runs)
     # ------------------------------------------------------------------
@@ -133,4 +383,7 @@ class SemanticCache(CacheInterface):
         """Empty the index and id→entry map; restart id counter."""
         self._index.reset()
         self._entries.clear()
+        self._sizes.clear()
+        self.nbytes = 0
         self._next_id = 0
+        self.evictions = 0
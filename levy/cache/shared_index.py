@@ -0,0 +1,389 @@
+"""
+SharedVectorIndex: one vector matrix in a memory-mapped segment, searched by
+every worker process and appended to by one writer at a time.
+
+`uvicorn --workers N` otherwise gives each process its own index, so memory
+grows N-fold and each worker only hits on what it has seen itself. With
+this index every process maps the same files from `directory`, and the page
+cache holds a single copy. Put `directory` on tmpfs (e.g. /dev/shm) for pure
+shared memory, or on disk to also survive restarts.
+
+Layout of `directory`:
+
+    header.i64             16 int64 slots: magic, version, seq, generation, dim,
+                           capacity, count (rows used), live (rows not removed),
+                           next_id
+    vectors-<gen>.f32      (capacity, dim) float32 rows
+    ids-<gen>.i64          entry id per row; -1 marks a removed row
+    sqnorms-<gen>.f32      squared row norms (inf for removed rows)
+    writer.lock            fcntl lock serialising writers across processes
+
+Writers take `writer_lock()` (an exclusive `flock`, plus a thread lock because
+flock does not exclude threads sharing one descriptor):
+- An append fills rows past `count`, then publishes them by bumping `count`.
+- A removal tombstones its row in place. Each process finds rows through an
+  id -> row map that it extends incrementally, so removing is O(1) rather
+  than a scan of the ids.
+- When the segment is full, live rows are compacted into a new generation of
+  files. The new generation is published by bumping `generation`, then the
+  old files are unlinked. Readers that still map the old files keep a valid
+  view, because POSIX keeps unlinked mappings alive.
+
+Header updates are wrapped in a seqlock (`seq` is odd while a writer is
+mid-update), so readers take a consistent (generation, count) snapshot without
+any lock. A reader that keeps seeing an odd `seq` stops spinning after
+`_READ_RETRIES` tries and reads under the writer lock instead. Whoever takes the
+lock next and finds `seq` odd knows the previous writer died mid-update, since
+only the lock holder ever changes it. That process repairs the header before
+going on: it recounts `live`, checks that the generation's files match the
+header, and empties the index if they do not.
+
+Search is an exact scan of the live rows, like BruteForceVectorIndex. An HNSW
+graph cannot be appended to in place by one process while others read it.
+
+POSIX only (fcntl). `supports_snapshots` is False and `save` / `load` are
+no-ops: the directory is already the persistent form.
+"""
+
+import fcntl
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterable, Iterator, List, Sequence, Tuple
+
+import numpy as np
+
+from levy.cache.vector_index import VectorIndex
+
+logger = logging.getLogger(__name__)
+
+MAGIC = 0x4C4556595348  # "LEVYSH"
+VERSION = 1
+
+# Header slots
+_MAGIC, _VERSION, _SEQ, _GENERATION, _DIM, _CAPACITY, _COUNT, _LIVE, _NEXT_ID = range(9)
+_HEADER_SLOTS = 16
+
+# Lock-free snapshot attempts before a reader falls back to the writer lock.
+_READ_RETRIES = 1000
+
+
+class SharedVectorIndex(VectorIndex):
+    """Exact L2 search over an mmap'd matrix shared by all processes using `directory`."""
+
+    supports_snapshots = False
+    HEADER_FILE = "header.i64"
+    LOCK_FILE = "writer.lock"
+
+    def __init__(self, directory: str, initial_capacity: int = 1024) -> None:
+        self.directory = directory
+        self.initial_capacity = initial_capacity
+        os.makedirs(directory, exist_ok=True)
+        self._lock_fd = os.open(os.path.join(directory, self.LOCK_FILE), os.O_RDWR | os.O_CREAT, 0o644)
+        self._thread_lock = threading.RLock()
+        self._lock_depth = 0
+
+        header_path = os.path.join(directory, self.HEADER_FILE)
+        with self.writer_lock():
+            if not os.path.exists(header_path):
+                header = np.memmap(header_path + ".tmp", dtype=np.int64, mode="w+", shape=(_HEADER_SLOTS,))
+                header[_MAGIC], header[_VERSION] = MAGIC, VERSION
+                header.flush()
+                del header
+                os.replace(header_path + ".tmp", header_path)
+        self._header = np.memmap(header_path, dtype=np.int64, mode="r+", shape=(_HEADER_SLOTS,))
+        if int(self._header[_MAGIC]) != MAGIC or int(self._header[_VERSION]) != VERSION:
+            raise ValueError(f"{header_path} is not a version-{VERSION} shared Levy index")
+
+        self._mapped_generation = -1
+        self._vectors = np.empty((0, 0), dtype=np.float32)
+        self._ids = np.empty(0, dtype=np.int64)
+        self._sq_norms = np.empty(0, dtype=np.float32)
+        # This process's entry id -> row map for the mapped generation (see _sync_rows).
+        self._row_of: Dict[int, int] = {}
+        self._rows_generation = -1
+        self._rows_synced = 0
+
+    # ------------------------------------------------------------------
+    # Locking and consistent snapshots
+    # ------------------------------------------------------------------
+
+    @contextmanager
+    def writer_lock(self) -> Iterator[None]:
+        """Exclusive, re-entrant write access across threads and processes."""
+        with self._thread_lock:
+            if self._lock_depth == 0:
+                fcntl.flock(self._lock_fd, fcntl.LOCK_EX)
+                header = getattr(self, "_header", None)  # absent while __init__ creates it
+                if header is not None and int(header[_SEQ]) & 1:
+                    self._recover(header)
+            self._lock_depth += 1
+            try:
+                yield
+            finally:
+                self._lock_depth -= 1
+                if self._lock_depth == 0:
+                    fcntl.flock(self._lock_fd, fcntl.LOCK_UN)
+
+    @contextmanager
+    def _publishing(self) -> Iterator[np.memmap]:
+        """Seqlock write section over the header (caller holds writer_lock)."""
+        header = self._header
+        header[_SEQ] += 1
+        try:
+            yield header
+        finally:
+            header[_SEQ] += 1
+
+    def _recover(self, header: np.memmap) -> None:
+        """Repair the header after a writer died mid-update (caller holds the flock)."""
+        logger.warning(f"Shared index {self.directory}: previous writer died mid-update; repairing header")
+        generation, dim, capacity, count = (int(header[slot]) for slot in (_GENERATION, _DIM, _CAPACITY, _COUNT))
+        expected = (capacity * dim * 4, capacity * 8, capacity * 4)
+        try:
+            intact = 0 <= count <= capacity and (
+                capacity == 0
+                or all(os.path.getsize(path) == size for path, size in zip(self._files(generation), expected))
+            )
+        except OSError:
+            intact = False
+        if intact:
+            self._map(generation, dim, capacity)
+            header[_LIVE] = int(np.count_nonzero(self._ids[:count] >= 0))
+            # A removal may have died between its norm and id writes.
+            self._sq_norms[:count][self._ids[:count] < 0] = np.inf
+        else:
+            header[_GENERATION] = generation + 1
+            header[_DIM] = header[_CAPACITY] = header[_COUNT] = header[_LIVE] = 0
+            self._unlink_generation(generation)
+        header[_SEQ] += 1
+
+    def _files(self, generation: int) -> Tuple[str, str, str]:
+        return tuple(
+            os.path.join(self.directory, f"{name}-{generation}.{ext}")
+            for name, ext in (("vectors", "f32"), ("ids", "i64"), ("sqnorms", "f32"))
+        )
+
+    def _snapshot(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray, int]:
+        """(vectors, ids, sq_norms, count) for one consistent header state."""
+        header = self._header
+        for _ in range(_READ_RETRIES):
+            seq = int(header[_SEQ])
+            if seq & 1:
+                time.sleep(0)  # a writer is mid-update
+                continue
+            generation, dim, capacity, count = (int(header[slot]) for slot in (_GENERATION, _DIM, _CAPACITY, _COUNT))
+            if int(header[_SEQ]) != seq:
+                continue
+            if generation != self._mapped_generation:
+                try:
+                    self._map(generation, dim, capacity)
+                except FileNotFoundError:  # compacted away between the read and the open
+                    continue
+            return self._vectors, self._ids, self._sq_norms, count
+        # A long write, or a writer that died mid-update: read under the lock, which
+        # repairs the header in the latter case.
+        with self.writer_lock():
+            generation, dim, capacity, count = (int(header[slot]) for slot in (_GENERATION, _DIM, _CAPACITY, _COUNT))
+            if generation != self._mapped_generation:
+                self._map(generation, dim, capacity)
+            return self._vectors, self._ids, self._sq_norms, count
+
+    def _map(self, generation: int, dim: int, capacity: int) -> None:
+        if capacity == 0:
+            self._vectors = np.empty((0, dim), dtype=np.float32)
+            self._ids = np.empty(0, dtype=np.int64)
+            self._sq_norms = np.empty(0, dtype=np.float32)
+        else:
+            vectors, ids, sq_norms = self._files(generation)
+            self._vectors = np.memmap(vectors, dtype=np.float32, mode="r+", shape=(capacity, dim))
+            self._ids = np.memmap(ids, dtype=np.int64, mode="r+", shape=(capacity,))
+            self._sq_norms = np.memmap(sq_norms, dtype=np.float32, mode="r+", shape=(capacity,))
+        self._mapped_generation = generation
+
+    # ------------------------------------------------------------------
+    # Writes (all under writer_lock)
+    # ------------------------------------------------------------------
+
+    def allocate_ids(self, n: int) -> List[int]:
+        """Reserve `n` entry ids that are unique across every process sharing the index."""
+        with self.writer_lock():
+            start = int(self._header[_NEXT_ID])
+            self._header[_NEXT_ID] = start + n
+            return list(range(start, start + n))
+
+    def add(self, vector: np.ndarray, entry_id: int) -> None:
+        self.add_many(np.asarray(vector, dtype=np.float32).reshape(1, -1), [entry_id])
+
+    def add_many(self, matrix: np.ndarray, ids: Sequence[int]) -> None:
+        rows = np.asarray(matrix, dtype=np.float32)
+        if rows.ndim == 1:
+            rows = rows.reshape(1, -1)
+        if len(rows) != len(ids):
+            raise ValueError(f"add_many got {len(rows)} vectors but {len(ids)} ids")
+        if len(rows) == 0:
+            return
+        with self.writer_lock():
+            dim = int(self._header[_DIM])
+            first_write = dim == 0
+            if first_write:
+                dim = rows.shape[1]
+            elif rows.shape[1] != dim:
+                raise ValueError(f"Shared index holds {dim}-d vectors, got {rows.shape[1]}-d")
+            _, _, _, count = self._snapshot()
+            if first_write or count + len(rows) > int(self._header[_CAPACITY]):
+                # The first write fixes the dimension, which is published together
+                # with the generation that has room for it.
+                self._compact(extra=len(rows), dim=dim)
+                _, _, _, count = self._snapshot()
+            end = count + len(rows)
+            self._vectors[count:end] = rows
+            self._ids[count:end] = ids
+            self._sq_norms[count:end] = np.einsum("ij,ij->i", rows, rows)
+            with self._publishing() as header:
+                header[_COUNT] = end
+                header[_LIVE] += len(rows)
+
+    def _compact(self, extra: int, dim: int) -> None:
+        """Copy live rows into a new generation of `dim`-d rows with room for `extra` more."""
+        vectors, ids, sq_norms, count = self._snapshot()
+        live = np.flatnonzero(ids[:count] >= 0)
+        capacity = max(self.initial_capacity, 2 * (len(live) + extra))
+        old_generation = int(self._header[_GENERATION])
+        generation = old_generation + 1
+        new_files = self._files(generation)
+        for path, dtype, shape, source in zip(
+            new_files,
+            (np.float32, np.int64, np.float32),
+            ((capacity, dim), (capacity,), (capacity,)),
+            (vectors, ids, sq_norms),
+        ):
+            segment = np.memmap(path, dtype=dtype, mode="w+", shape=shape)
+            if len(live):  # nothing to copy on the first write, when the old rows are 0-d
+                segment[: len(live)] = source[live]
+            segment.flush()
+            del segment
+        with self._publishing() as header:
+            header[_GENERATION] = generation
+            header[_DIM] = dim
+            header[_CAPACITY] = capacity
+            header[_COUNT] = len(live)
+        self._unlink_generation(old_generation)
+
+    def _unlink_generation(self, generation: int) -> None:
+        for path in self._files(generation):
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+
+    def _sync_rows(self, ids: np.ndarray, count: int) -> None:
+        """Bring the id -> row map up to date with the mapped generation (caller holds
+        writer_lock). Appends are indexed incrementally and a new generation is indexed
+        once, so this is amortised O(1) per row. Rows another process tombstoned stay in
+        the map until a removal finds their id gone."""
+        if self._rows_generation != self._mapped_generation:
+            self._row_of = {}
+            self._rows_synced = 0
+            self._rows_generation = self._mapped_generation
+        for row in range(self._rows_synced, count):
+            entry_id = int(ids[row])
+            if entry_id >= 0:
+                self._row_of[entry_id] = row
+        self._rows_synced = count
+
+    def remove(self, entry_id: int) -> bool:
+        return self.remove_many([entry_id]) == 1
+
+    def remove_many(self, entry_ids: Iterable[int]) -> int:
+        """Tombstone every listed id in one seqlock section; returns how many were present."""
+        with self.writer_lock():
+            _, ids, _, count = self._snapshot()
+            self._sync_rows(ids, count)
+            rows = []
+            for entry_id in entry_ids:
+                row = self._row_of.pop(int(entry_id), None)
+                if row is not None and int(ids[row]) == int(entry_id):
+                    rows.append(row)
+            if rows:
+                with self._publishing() as header:
+                    self._sq_norms[rows] = np.inf
+                    self._ids[rows] = -1
+                    header[_LIVE] -= len(rows)
+            return len(rows)
+
+    def reset(self) -> None:
+        with self.writer_lock():
+            old_generation = int(self._header[_GENERATION])
+            with self._publishing() as header:
+                header[_GENERATION] = old_generation + 1
+                header[_DIM] = 0
+                header[_CAPACITY] = 0
+                header[_COUNT] = 0
+                header[_LIVE] = 0
+            self._unlink_generation(old_generation)
+
+    # ------------------------------------------------------------------
+    # Reads (lock-free)
+    # ------------------------------------------------------------------
+
+    def search(self, vector: np.ndarray, k: int = 1) -> Tuple[List[int], List[float]]:
+        ids, dists = self.search_many(np.asarray(vector, dtype=np.float32).reshape(1, -1), k=k)
+        return ids[0], dists[0]
+
+    def search_many(self, matrix: np.ndarray, k: int = 1) -> Tuple[List[List[int]], List[List[float]]]:
+        queries = np.asarray(matrix, dtype=np.float32)
+        if queries.ndim == 1:
+            queries = queries.reshape(1, -1)
+        vectors, ids, sq_norms, count = self._snapshot()
+        if count == 0:
+            return [[] for _ in queries], [[] for _ in queries]
+        mat = vectors[:count]
+        row_ids = np.array(ids[:count])  # copy: removals may land mid-search
+        sq_dists = (
+            np.asarray(sq_norms[:count])[None, :]
+            - 2.0 * (queries @ mat.T)
+            + np.einsum("ij,ij->i", queries, queries)[:, None]
+        )
+        k_eff = min(k, count)
+        if k_eff < count:
+            top_idx = np.argpartition(sq_dists, k_eff - 1, axis=1)[:, :k_eff]
+        else:
+            top_idx = np.broadcast_to(np.arange(count), sq_dists.shape)
+        diffs = mat[top_idx] - queries[:, None, :]
+        l2_dists = np.sqrt(np.einsum("qkd,qkd->qk", diffs, diffs))
+        order = np.argsort(l2_dists, axis=1, kind="stable")
+        top_idx = np.take_along_axis(top_idx, order, axis=1)
+        l2_dists = np.take_along_axis(l2_dists, order, axis=1)
+        out_ids: List[List[int]] = []
+        out_dists: List[List[float]] = []
+        for idx_row, dist_row in zip(top_idx, l2_dists):
+            keep = row_ids[idx_row] >= 0  # drop tombstones
+            out_ids.append(row_ids[idx_row][keep].tolist())
+            out_dists.append(dist_row[keep].astype(float).tolist())
+        return out_ids, out_dists
+
+    def size(self) -> int:
+        return int(self._header[_LIVE])
+
+    def nbytes(self) -> int:
+        """Bytes of the mapped segment (shared by every process, counted once)."""
+        capacity, dim = int(self._header[_CAPACITY]), int(self._header[_DIM])
+        return capacity * (dim * 4 + 8 + 4) + _HEADER_SLOTS * 8
+
+    def save(self, directory: str) -> None:
+        """No-op: the index already lives in its own directory (supports_snapshots is False)."""
+
+    def load(self, directory: str) -> None:
+        """No-op: open a SharedVectorIndex on its directory instead (supports_snapshots is False)."""
+
+    def close(self) -> None:
+        self._vectors = np.empty((0, 0), dtype=np.float32)
+        self._ids = np.empty(0, dtype=np.int64)
+        self._sq_norms = np.empty(0, dtype=np.float32)
+        self._mapped_generation = -1
+        if self._lock_fd is not None:
+            os.close(self._lock_fd)
+            self._lock_fd = None
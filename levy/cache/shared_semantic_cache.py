@@ -0,0 +1,406 @@
+"""
+SharedSemanticCache: one semantic cache for every worker process on a host.
+
+Vectors live in a SharedVectorIndex and entries live in a SQLite (WAL) table in
+the same directory. Each uvicorn worker therefore sees every entry any worker
+stored, and the index memory is paid once per host instead of once per worker.
+
+Lookups take no flock: an mmap search followed by a primary-key read. Writes
+(set, delete, purge, bulk_load) hold the index's cross-process writer lock, so
+the index and the table change together. Eviction is LRU over `max_size`, like
+SemanticCache: every hit stamps the row's `last_used` and bumps its
+`access_count` in one small UPDATE, and eviction drops the rows with the oldest
+`last_used`. Expired entries are removed when a lookup surfaces them and in small
+batches on each insert.
+
+This class implements the SemanticCache interface by composition rather than
+inheritance: none of SemanticCache's in-process bookkeeping (the id -> entry
+map, per-entry byte charges) applies to state shared between processes. A byte
+budget (`max_bytes`) is rejected with ValueError: one process cannot charge
+another's entries. `nbytes` reports the on-disk size of the shared segment and
+table. `supports_snapshots` is False and `save` / `load` are no-ops: the
+directory is the persistent form.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Callable, Iterable, List, Optional
+
+import numpy as np
+
+from levy.cache.base import CacheInterface
+from levy.cache.shared_index import SharedVectorIndex
+from levy.cache.vector_index import _l2_normalize
+from levy.models import CacheEntry, LLMRequest
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS entries (
+        id INTEGER PRIMARY KEY,
+        key_hash TEXT NOT NULL,
+        prompt TEXT NOT NULL,
+        response_text TEXT NOT NULL,
+        created_at REAL NOT NULL,
+        expires_at REAL,
+        last_used REAL NOT NULL,
+        access_count INTEGER NOT NULL DEFAULT 0,
+        metadata TEXT NOT NULL
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS entries_key_hash ON entries (key_hash)",
+    "CREATE INDEX IF NOT EXISTS entries_last_used ON entries (last_used)",
+    "CREATE INDEX IF NOT EXISTS entries_expires_at ON entries (expires_at)",
+)
+
+# Expired rows removed per insert; the rest go on later inserts or purge_expired().
+_PURGE_BATCH = 64
+
+# SQLite's default limit on bound parameters is 999 on older builds.
+_LOOKUP_CHUNK = 500
+
+
+class SharedSemanticCache(CacheInterface):
+    """
+    Semantic cache whose index and entries are shared by every process using `directory`.
+
+    Parameters
+    ----------
+    directory : where the shared index files and `entries.sqlite` live (tmpfs such as
+        /dev/shm keeps it in memory; a disk path also survives restarts).
+    embedding_client, threshold, max_size, ttl_seconds : as for SemanticCache.
+    max_bytes : must be None or 0; a shared cache cannot enforce a byte budget.
+    initial_capacity : rows reserved in the shared segment before it first grows.
+    """
+
+    supports_snapshots = False
+    DB_FILE = "entries.sqlite"
+
+    def __init__(
+        self,
+        directory: str,
+        embedding_client,
+        threshold: float = 0.85,
+        max_size: Optional[int] = None,
+        ttl_seconds: Optional[float] = None,
+        max_bytes: Optional[int] = None,
+        initial_capacity: int = 1024,
+        timeout_seconds: float = 30.0,
+    ) -> None:
+        if max_bytes:
+            raise ValueError(
+                "A shared semantic cache cannot enforce max_bytes (cache_max_bytes); "
+                "bound it with max_size (cache_max_size) instead"
+            )
+        self.directory = directory
+        self.embedding_client = embedding_client
+        self.threshold = threshold
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.timeout_seconds = timeout_seconds
+        self.evictions: int = 0
+        self._peak_nbytes: int = 0
+        self._index = SharedVectorIndex(directory, initial_capacity=initial_capacity)
+        self._db_path = os.path.join(directory, self.DB_FILE)
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+        with self._index.writer_lock():
+            conn = self._connection()
+            with conn:
+                for statement in _SCHEMA:
+                    conn.execute(statement)
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self._db_path, timeout=self.timeout_seconds, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            with self._lock:
+                self._connections.append(conn)
+        return conn
+
+    # ------------------------------------------------------------------
+    # CacheInterface
+    # ------------------------------------------------------------------
+
+    def get(self, request: LLMRequest, threshold: Optional[float] = None) -> Optional[CacheEntry]:
+        if self._index.size() == 0:
+            return None
+
+        q_vec = _l2_normalize(self.embedding_client.embed(request.prompt))
+        ids, distances = self._index.search(q_vec, k=1)
+        if not ids:
+            return None
+
+        similarity = 1.0 / (1.0 + distances[0])
+        if similarity < (self.threshold if threshold is None else threshold):
+            return None
+
+        conn = self._connection()
+        row = conn.execute(
+            "SELECT key_hash, prompt, response_text, created_at, expires_at, access_count, metadata "
+            "FROM entries WHERE id = ?",
+            (ids[0],),
+        ).fetchone()
+        if row is None:  # removed by another worker since the search
+            return None
+        entry = self._row_entry(row)
+        if entry.is_expired():
+            self.delete(ids[0])
+            return None
+        with conn:
+            conn.execute(
+                "UPDATE entries SET last_used = ?, access_count = access_count + 1 WHERE id = ?",
+                (time.time(), ids[0]),
+            )
+        entry.access_count += 1
+        entry.metadata["last_similarity_score"] = float(similarity)
+        return entry
+
+    @staticmethod
+    def _row_entry(row) -> CacheEntry:
+        key_hash, prompt, response_text, created_at, expires_at, access_count, metadata = row
+        return CacheEntry(
+            key_hash=key_hash,
+            prompt=prompt,
+            response_text=response_text,
+            created_at=created_at,
+            expires_at=expires_at,
+            access_count=access_count,
+            metadata=json.loads(metadata),
+        )
+
+    def set(
+        self,
+        request: LLMRequest,
+        response_text: str,
+        embedding: Optional[np.ndarray] = None,
+        metadata: Optional[dict] = None,
+    ) -> None:
+        if embedding is None:
+            embedding = self.embedding_client.embed(request.prompt)
+        entry = CacheEntry(
+            key_hash=hashlib.sha256(request.prompt.encode("utf-8")).hexdigest(),
+            prompt=request.prompt,
+            response_text=response_text,
+            embedding=_l2_normalize(embedding),
+            expires_at=time.time() + self.ttl_seconds if self.ttl_seconds else None,
+            metadata=metadata or {},
+        )
+        with self._index.writer_lock():
+            self._make_room()
+            self._add_batch([entry])
+
+    def clear(self) -> None:
+        self.reset()
+
+    def delete(self, entry_id: int) -> bool:
+        """Remove one entry from both the shared index and the entries table."""
+        with self._index.writer_lock():
+            removed = self._index.remove(entry_id)
+            conn = self._connection()
+            with conn:
+                conn.execute("DELETE FROM entries WHERE id = ?", (entry_id,))
+            return removed
+
+    def _delete_ids(self, entry_ids: List[int]) -> None:
+        if not entry_ids:
+            return
+        self._index.remove_many(entry_ids)
+        conn = self._connection()
+        with conn:
+            conn.executemany("DELETE FROM entries WHERE id = ?", [(entry_id,) for entry_id in entry_ids])
+
+    def purge_expired(self) -> int:
+        """Drop every expired entry; returns how many were removed."""
+        with self._index.writer_lock():
+            expired = self._expired_ids(limit=-1)
+            self._delete_ids(expired)
+        self.evictions += len(expired)
+        return len(expired)
+
+    def _expired_ids(self, limit: int) -> List[int]:
+        rows = self._connection().execute(
+            "SELECT id FROM entries WHERE expires_at IS NOT NULL AND expires_at <= ? LIMIT ?",
+            (time.time(), limit),
+        )
+        return [entry_id for (entry_id,) in rows]
+
+    def _make_room(self) -> None:
+        """Before an insert (under the writer lock): drop a batch of expired entries,
+        then the least recently used ones until one more fits in max_size."""
+        doomed = self._expired_ids(limit=_PURGE_BATCH)
+        self._delete_ids(doomed)
+        self.evictions += len(doomed)
+        if not self.max_size:
+            return
+        excess = self._index.size() - self.max_size + 1
+        if excess > 0:
+            oldest = [
+                entry_id
+                for (entry_id,) in self._connection().execute(
+                    "SELECT id FROM entries ORDER BY last_used, id LIMIT ?", (excess,)
+                )
+            ]
+            self._delete_ids(oldest)
+            self.evictions += len(oldest)
+
+    def bulk_load(
+        self,
+        entries: Iterable[CacheEntry],
+        batch_size: int = 1024,
+        on_batch: Optional[Callable[[int], None]] = None,
+    ) -> int:
+        """Add already-embedded entries, `batch_size` per write-locked batch.
+
+        Same skipping rules as SemanticCache.bulk_load. A prompt counts as already
+        cached if any worker has stored it. Returns the number of entries added.
+        """
+        loaded = 0
+        batch: List[CacheEntry] = []
+        seen = set()
+        now = time.time()
+
+        def flush() -> int:
+            with self._index.writer_lock():
+                known = self._known_hashes([entry.key_hash for entry in batch])
+                fresh = [entry for entry in batch if entry.key_hash not in known]
+                if self.max_size:
+                    fresh = fresh[: max(0, self.max_size - self._index.size())]
+                return self._add_batch(fresh) if fresh else 0
+
+        for entry in entries:
+            if self.max_size and self._index.size() + len(batch) >= self.max_size:
+                break
+            if entry.embedding is None:
+                continue
+            expires_at = entry.expires_at
+            if expires_at is None and self.ttl_seconds:
+                expires_at = entry.created_at + self.ttl_seconds
+            if expires_at is not None and expires_at <= now:
+                continue
+            key_hash = hashlib.sha256(entry.prompt.encode("utf-8")).hexdigest()
+            if key_hash in seen:
+                continue
+            seen.add(key_hash)
+            batch.append(
+                CacheEntry(
+                    key_hash=key_hash,
+                    prompt=entry.prompt,
+                    response_text=entry.response_text,
+                    embedding=_l2_normalize(entry.embedding),
+                    created_at=entry.created_at,
+                    expires_at=expires_at,
+                    metadata=dict(entry.metadata),
+                )
+            )
+            if len(batch) >= batch_size:
+                loaded += flush()
+                batch = []
+                if on_batch is not None:
+                    on_batch(loaded)
+        if batch:
+            loaded += flush()
+            if on_batch is not None:
+                on_batch(loaded)
+        return loaded
+
+    def _known_hashes(self, key_hashes: List[str]) -> set:
+        known = set()
+        conn = self._connection()
+        for start in range(0, len(key_hashes), _LOOKUP_CHUNK):
+            chunk = key_hashes[start:start + _LOOKUP_CHUNK]
+            placeholders = ",".join("?" * len(chunk))
+            known.update(
+                key_hash
+                for (key_hash,) in conn.execute(
+                    f"SELECT key_hash FROM entries WHERE key_hash IN ({placeholders})", chunk
+                )
+            )
+        return known
+
+    def _add_batch(self, batch) -> int:
+        """Insert `batch` (caller holds the writer lock). The vectors are published
+        first; a reader that finds one before its row is written sees a miss."""
+        ids = self._index.allocate_ids(len(batch))
+        now = time.time()
+        self._index.add_many(np.stack([entry.embedding for entry in batch]), ids)
+        conn = self._connection()
+        with conn:
+            conn.executemany(
+                "INSERT INTO entries "
+                "(id, key_hash, prompt, response_text, created_at, expires_at, last_used, metadata) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (
+                        entry_id,
+                        entry.key_hash,
+                        entry.prompt,
+                        entry.response_text,
+                        entry.created_at,
+                        entry.expires_at,
+                        now,
+                        json.dumps(entry.metadata, default=str),
+                    )
+                    for entry_id, entry in zip(ids, batch)
+                ],
+            )
+        self._peak_nbytes = max(self._peak_nbytes, self.nbytes)
+        return len(batch)
+
+    def size(self) -> int:
+        return self._index.size()
+
+    @property
+    def nbytes(self) -> int:
+        """Shared segment plus entries table on disk (paid once per host, not per worker)."""
+        total = self._index.nbytes()
+        for suffix in ("", "-wal"):
+            try:
+                total += os.path.getsize(self._db_path + suffix)
+            except OSError:
+                pass
+        return total
+
+    @property
+    def peak_nbytes(self) -> int:
+        self._peak_nbytes = max(self._peak_nbytes, self.nbytes)
+        return self._peak_nbytes
+
+    # ------------------------------------------------------------------
+    # Snapshots do not apply: the shared directory is already persistent.
+    # ------------------------------------------------------------------
+
+    def save(self, path: str) -> None:
+        """No-op: every write is already persisted in `directory`."""
+
+    def load(self, path: str) -> int:
+        """No-op: the cache already holds the shared directory's contents; returns their count."""
+        return self.size()
+
+    def reset(self) -> None:
+        """Empty the shared index and entries table for every worker."""
+        with self._index.writer_lock():
+            self._index.reset()
+            conn = self._connection()
+            with conn:
+                conn.execute("DELETE FROM entries")
+        self.evictions = 0
+
+    def close(self) -> None:
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            conn.close()
+        self._local = threading.local()
+        self._index.close()
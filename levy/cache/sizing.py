@@ -0,0 +1,47 @@
+"""
+Byte accounting for cached entries (`cache_max_bytes` budgets).
+
+`entry_nbytes` estimates what one CacheEntry costs in this process:
+- the CPython size of its strings (prompt, response, key hash)
+- the embedding buffer
+- the JSON length of its metadata
+- a fixed per-entry overhead for the dataclass, dict slots and ndarray header
+
+It is an estimate, not a measurement. It is computed once at insert time and
+tracks RSS closely enough to size containers. The dominant terms are the
+response text and the embedding, and both are counted exactly.
+"""
+
+import json
+import sys
+
+import numpy as np
+
+from levy.models import CacheEntry
+
+# CacheEntry instance + __dict__, the store's dict slots and the ndarray header.
+ENTRY_OVERHEAD_BYTES = 400
+
+# A float in a Python list: the 8-byte pointer plus a 24-byte float object.
+_LIST_FLOAT_BYTES = 32
+
+
+def embedding_nbytes(embedding) -> int:
+    if embedding is None:
+        return 0
+    if isinstance(embedding, np.ndarray):
+        return embedding.nbytes
+    return len(embedding) * _LIST_FLOAT_BYTES
+
+
+def entry_nbytes(entry: CacheEntry) -> int:
+    """Approximate resident bytes of `entry`."""
+    metadata = len(json.dumps(entry.metadata, default=str)) if entry.metadata else 0
+    return (
+        ENTRY_OVERHEAD_BYTES
+        + sys.getsizeof(entry.key_hash)
+        + sys.getsizeof(entry.prompt)
+        + sys.getsizeof(entry.response_text)
+        + embedding_nbytes(entry.embedding)
+        + metadata
+    )
@@ -1,41 +1,129 @@
-from typing import Dict, List
+from typing import Any, Dict, Iterator, List, Optional
+from levy.cache.eviction import make_eviction_policy
+from levy.cache.sizing import entry_nbytes
 from levy.models import CacheEntry
 
 class InMemoryStore:
     """
     Simple in-memory storage for cache entries.
     In a real system, this would be Redis or VectorDB.
+
+    Bounded at `max_size` entries. Which entry goes when the store is full is
+    decided by the eviction `policy` (levy/cache/eviction.py): "lru" (default),
+    "lfu" or "w-tinylfu". W-TinyLFU may also reject a new entry that is less
+    popular than the entry it would displace. Entries carrying an embedding are
+    also held in a key-indexed side map. get, set, delete and eviction are each
+    O(1). `stats()` reports the store's hit rate under its policy.
+
+    `max_bytes` adds a memory budget on top of the entry cap. Each entry is
+    charged its estimated size (levy/cache/sizing.py: prompt, response,
+    embedding, metadata, overhead). The policy's victims are evicted until a
+    new entry fits. An entry larger than the whole budget is not stored.
+    `nbytes` / `peak_nbytes` track current and high-water usage.
     """
-    def __init__(self, max_size: int = 1000):
+    def __init__(self, max_size: int = 1000, policy: str = "lru", max_bytes: Optional[int] = None):
         self.max_size = max_size
+        self.max_bytes = max_bytes
+        self.policy = make_eviction_policy(policy, max_size)
         self.entries: Dict[str, CacheEntry] = {}
-        # Simple list for vector search iteration 
-        # (not efficient for large scale, but fine for prototype)
-        self.vector_index: List[CacheEntry] = []
+        # key -> entry for the subset with embeddings (semantic scans iterate only these).
+        self._embedded: Dict[str, CacheEntry] = {}
+        self._sizes: Dict[str, int] = {}
+        self.nbytes = 0
+        self.peak_nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
 
     def get(self, key: str) -> CacheEntry | None:
-        return self.entries.get(key)
+        self.policy.record_access(key)
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return entry
 
     def set(self, key: str, entry: CacheEntry):
-        if len(self.entries) >= self.max_size:
-            # Simple eviction: remove oldest (FIFO-ish based on iteration order or random)
-            # Python 3.7+ dicts preserve insertion order, so this removes the first inserted
-            first_key = next(iter(self.entries))
-            self.delete(first_key)
-        
+        size = entry_nbytes(entry)
+        if self.max_bytes and size > self.max_bytes:
+            self.delete(key)  # never fits; don't leave a stale older value behind
+            return
+        if key in self.entries:
+            if not self.max_bytes or self.nbytes - self._sizes[key] + size <= self.max_bytes:
+                self.policy.record_access(key)  # overwrite: no eviction needed
+                self._put(key, entry, size)
+                return
+            self.delete(key)  # grew past the budget: re-admit as a new entry
+
+        # Admission first: a candidate the filter rejects must not cost anyone their slot.
+        evicted = self.policy.admit(key)
+        for victim in evicted:
+            if victim != key and victim in self.entries:
+                self._drop(victim)
+                self.evictions += 1
+        if key in evicted:
+            return  # the admission filter kept the incumbents
+        if self._free(size, key):
+            self._put(key, entry, size)
+
+    def _free(self, size: int, key: str) -> bool:
+        """Evict policy victims until `size` more bytes fit in the budget. Returns
+        False if the policy gives up the just-admitted `key` first."""
+        while self.max_bytes and self.entries and self.nbytes + size > self.max_bytes:
+            victim = self.policy.evict_one()
+            if victim is None or victim == key:
+                return False
+            self._drop(victim)
+            self.evictions += 1
+        return True
+
+    def _put(self, key: str, entry: CacheEntry, size: int) -> None:
+        self.nbytes += size - self._sizes.get(key, 0)
+        self.peak_nbytes = max(self.peak_nbytes, self.nbytes)
+        self._sizes[key] = size
         self.entries[key] = entry
         if entry.embedding is not None:
-             self.vector_index.append(entry)
+            self._embedded[key] = entry
+        else:
+            self._embedded.pop(key, None)
+
+    def _drop(self, key: str) -> None:
+        self.entries.pop(key, None)
+        self._embedded.pop(key, None)
+        self.nbytes -= self._sizes.pop(key, 0)
 
     def delete(self, key: str):
         if key in self.entries:
-            entry = self.entries.pop(key)
-            if entry in self.vector_index:
-                self.vector_index.remove(entry)
-    
+            self._drop(key)
+            self.policy.remove(key)
+
     def get_all_with_embeddings(self) -> List[CacheEntry]:
-        return self.vector_index
+        return list(self._embedded.values())
+
+    def iter_entries_with_embeddings(self, chunk_size: int = 500) -> Iterator[CacheEntry]:
+        # Same streaming interface as RedisStore; chunk_size is irrelevant in-process.
+        return iter(list(self._embedded.values()))
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "policy": self.policy.name,
+            "size": len(self.entries),
+            "max_size": self.max_size,
+            "nbytes": self.nbytes,
+            "peak_nbytes": self.peak_nbytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "rejections": self.policy.rejections,
+        }
 
     def clear(self):
         self.entries.clear()
-        self.vector_index.clear()
+        self._embedded.clear()
+        self._sizes.clear()
+        self.nbytes = 0
+        self.policy.clear()
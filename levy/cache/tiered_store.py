@@ -0,0 +1,207 @@
+"""
+TieredStore: a small in-process LRU (L1) in front of a shared RedisStore (L2).
+
+Reads go through: an L1 hit returns without touching the network, and an L2 hit
+is copied into L1. Writes and deletes go to L2 first and then to L1. Each
+write, delete or clear also publishes the affected keys on a Redis pub/sub
+channel. Every other TieredStore on that channel (other uvicorn workers, other
+hosts) drops those keys from its L1. Cache contents therefore stay shared
+across workers while the hottest prompts are served from process memory.
+
+Pub/sub is fire-and-forget: a worker that is reconnecting can miss a message.
+`l1_ttl_seconds` bounds how long an L1 copy is trusted before it is re-read
+from Redis. That bound is the worst-case staleness.
+
+Implements the same interface as InMemoryStore / RedisStore (duck typing).
+Semantic-index scans (`iter_entries_with_embeddings`) go straight to L2.
+"""
+
+import json
+import logging
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Tuple
+
+from levy.models import CacheEntry
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHANNEL = "levy:invalidate"
+
+
+class TieredStore:
+    def __init__(
+        self,
+        l2,
+        l1_max_size: int = 1024,
+        l1_ttl_seconds: Optional[float] = 30.0,
+        channel: str = DEFAULT_CHANNEL,
+        subscribe: bool = True,
+    ):
+        self.l2 = l2
+        self.l1_max_size = l1_max_size
+        self.l1_ttl_seconds = l1_ttl_seconds
+        self.channel = channel
+        # Lets a store ignore its own invalidations (its L1 is already up to date).
+        self.node_id = uuid.uuid4().hex
+        self._l1: "OrderedDict[str, Tuple[CacheEntry, float]]" = OrderedDict()
+        self._lock = threading.Lock()  # the pub/sub thread invalidates concurrently
+        self.l1_hits = 0
+        self.l2_hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self._pubsub = None
+        self._listener = None
+        if subscribe:
+            self._pubsub = l2.client.pubsub(ignore_subscribe_messages=True)
+            self._pubsub.subscribe(**{channel: self._on_message})
+            self._listener = self._pubsub.run_in_thread(sleep_time=0.1, daemon=True)
+
+    # ------------------------------------------------------------------
+    # L1
+    # ------------------------------------------------------------------
+
+    def _l1_get(self, key: str) -> Optional[CacheEntry]:
+        with self._lock:
+            item = self._l1.get(key)
+            if item is None:
+                return None
+            entry, deadline = item
+            if time.monotonic() > deadline:
+                del self._l1[key]
+                return None
+            self._l1.move_to_end(key)
+            return entry
+
+    def _l1_put(self, key: str, entry: CacheEntry) -> None:
+        if not self.l1_max_size:
+            return
+        deadline = time.monotonic() + self.l1_ttl_seconds if self.l1_ttl_seconds else float("inf")
+        with self._lock:
+            self._l1[key] = (entry, deadline)
+            self._l1.move_to_end(key)
+            while len(self._l1) > self.l1_max_size:
+                self._l1.popitem(last=False)
+
+    def _l1_drop(self, keys: Iterable[str]) -> None:
+        with self._lock:
+            for key in keys:
+                self._l1.pop(key, None)
+
+    @property
+    def entries(self) -> Dict[str, CacheEntry]:
+        """Snapshot of this worker's L1 tier (the shared contents live in Redis)."""
+        with self._lock:
+            return {key: entry for key, (entry, _) in self._l1.items()}
+
+    # ------------------------------------------------------------------
+    # Invalidation
+    # ------------------------------------------------------------------
+
+    def _publish(self, keys: Optional[List[str]]) -> None:
+        """Tell other workers to drop `keys` from L1 (None: everything)."""
+        message = {"origin": self.node_id, "keys": keys}
+        try:
+            self.l2.client.publish(self.channel, json.dumps(message))
+        except Exception as e:  # L2 is already updated; stale peers expire via l1_ttl_seconds
+            logger.warning(f"Failed to publish cache invalidation: {e}")
+
+    def _on_message(self, message: Dict[str, Any]) -> None:
+        try:
+            payload = json.loads(message["data"])
+        except (KeyError, TypeError, ValueError):
+            return
+        if payload.get("origin") == self.node_id:
+            return
+        self.invalidations += 1
+        keys = payload.get("keys")
+        if keys is None:
+            with self._lock:
+                self._l1.clear()
+        else:
+            self._l1_drop(keys)
+
+    # ------------------------------------------------------------------
+    # Store interface
+    # ------------------------------------------------------------------
+
+    def get(self, key: str) -> CacheEntry | None:
+        entry = self._l1_get(key)
+        if entry is not None:
+            self.l1_hits += 1
+            return entry
+        entry = self.l2.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.l2_hits += 1
+        self._l1_put(key, entry)
+        return entry
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, CacheEntry]:
+        found: Dict[str, CacheEntry] = {}
+        remote = []
+        for key in keys:
+            entry = self._l1_get(key)
+            if entry is not None:
+                found[key] = entry
+            else:
+                remote.append(key)
+        for key, entry in self.l2.get_many(remote).items():
+            self._l1_put(key, entry)
+            found[key] = entry
+        return found
+
+    def set(self, key: str, entry: CacheEntry):
+        self.l2.set(key, entry)
+        self._l1_put(key, entry)
+        self._publish([key])
+
+    def set_many(self, entries: Mapping[str, CacheEntry]) -> None:
+        self.l2.set_many(entries)
+        for key, entry in entries.items():
+            self._l1_put(key, entry)
+        self._publish(list(entries))
+
+    def delete(self, key: str):
+        self.l2.delete(key)
+        self._l1_drop([key])
+        self._publish([key])
+
+    def iter_entries_with_embeddings(self, chunk_size: int = 500) -> Iterator[CacheEntry]:
+        return self.l2.iter_entries_with_embeddings(chunk_size)
+
+    def get_all_with_embeddings(self) -> List[CacheEntry]:
+        return self.l2.get_all_with_embeddings()
+
+    def clear(self):
+        self.l2.clear()
+        with self._lock:
+            self._l1.clear()
+        self._publish(None)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.l1_hits + self.l2_hits + self.misses
+        return {
+            "policy": "tiered-lru",
+            "size": len(self._l1),
+            "max_size": self.l1_max_size,
+            "l1_hits": self.l1_hits,
+            "l2_hits": self.l2_hits,
+            "misses": self.misses,
+            "hits": self.l1_hits + self.l2_hits,
+            "hit_rate": (self.l1_hits + self.l2_hits) / lookups if lookups else 0.0,
+            "l1_hit_rate": self.l1_hits / lookups if lookups else 0.0,
+            "invalidations": self.invalidations,
+        }
+
+    def close(self) -> None:
+        """Stop the invalidation listener (the Redis connection pool stays with L2)."""
+        if self._listener is not None:
+            self._listener.stop()
+            self._listener = None
+        if self._pubsub is not None:
+            self._pubsub.close()
+            self._pubsub = None
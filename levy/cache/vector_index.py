@@ -14,8 +14,9 @@ Factory: make_vector_index(backend, dim, **hnsw_params) selects the backend per
 
 import logging
 import math
+import os
 from abc import ABC, abstractmethod
-from typing import List, Tuple
+from typing import Dict, List, Sequence, Set, Tuple
 
 import numpy as np
 
@@ -27,13 +28,22 @@ logger = logging.getLogger(__name__)
 # ---------------------------------------------------------------------------
 
 def _l2_normalize(vec: np.ndarray) -> np.ndarray:
-    """Return unit-L2-norm copy of vec. Returns zero vector unchanged if norm == 0."""
+    """Return unit-L2-norm float32 copy of vec. Returns zero vector unchanged if norm == 0."""
+    vec = np.asarray(vec, dtype=np.float32)
     norm = np.linalg.norm(vec)
     if norm == 0.0:
         return vec.copy()
     return vec / norm
 
 
+def _atomic_npy_save(path: str, array: np.ndarray) -> None:
+    """np.save via a temp file + rename, so a crash never leaves a torn snapshot file."""
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as fh:
+        np.save(fh, np.ascontiguousarray(array))
+    os.replace(tmp, path)
+
+
 # ---------------------------------------------------------------------------
 # Abstract base
 # ---------------------------------------------------------------------------
@@ -44,19 +54,41 @@ class VectorIndex(ABC):
 
     Vectors passed to add/search MUST already be unit-L2-normalised by the caller.
     Distances returned are always L2 distances (not similarities).
+
+    `supports_snapshots` is False for backends that are already persistent
+    (SharedVectorIndex), whose save/load are no-ops; callers check it before
+    treating a directory as a snapshot.
     """
 
+    supports_snapshots = True
+
     @abstractmethod
-    def add(self, vector: List[float], entry_id: int) -> None:
+    def add(self, vector: np.ndarray, entry_id: int) -> None:
         """Index a single (already-normalised) embedding with the given external id."""
 
     @abstractmethod
-    def search(self, vector: List[float], k: int = 1) -> Tuple[List[int], List[float]]:
+    def search(self, vector: np.ndarray, k: int = 1) -> Tuple[List[int], List[float]]:
         """
         Return (ids, L2_distances) for the k nearest neighbours.
         Both lists have length min(k, size()). Empty index returns ([], []).
         """
 
+    @abstractmethod
+    def add_many(self, matrix: np.ndarray, ids: Sequence[int]) -> None:
+        """Index every row of an (n, dim) matrix; `ids[i]` is the external id of row i."""
+
+    @abstractmethod
+    def search_many(self, matrix: np.ndarray, k: int = 1) -> Tuple[List[List[int]], List[List[float]]]:
+        """
+        Batched search: one (ids, L2_distances) pair of lists per query row, in row order.
+        Every inner list has length min(k, size()). Empty index returns a pair of
+        empty inner lists per query.
+        """
+
+    @abstractmethod
+    def remove(self, entry_id: int) -> bool:
+        """Drop the vector indexed under `entry_id`. Returns False if the id is unknown."""
+
     @abstractmethod
     def reset(self) -> None:
         """Empty the index entirely, as if freshly constructed."""
@@ -65,6 +97,14 @@ class VectorIndex(ABC):
     def size(self) -> int:
         """Number of indexed vectors."""
 
+    @abstractmethod
+    def save(self, directory: str) -> None:
+        """Write the index into `directory` (which must exist) in this backend's format."""
+
+    @abstractmethod
+    def load(self, directory: str) -> None:
+        """Replace the index contents with a snapshot previously written by save()."""
+
 
 # ---------------------------------------------------------------------------
 # Brute-force implementation (numpy exact k-NN)
@@ -78,43 +118,155 @@ class BruteForceVectorIndex(VectorIndex):
     (a) the offline/fallback backend when Faiss is unavailable, and
     (b) the correctness oracle that FaissHNSWVectorIndex is validated against.
 
+    Storage is one preallocated, contiguous float32 (capacity, dim) matrix grown by
+    amortised doubling, plus a parallel int64 id array and cached squared row norms.
+    A search is then a single `mat @ q` GEMV (a GEMM for `search_many`) over the live
+    rows followed by `argpartition`, with no per-query copy of the index:
+        ||x - q||^2 = ||x||^2 + ||q||^2 - 2 x.q
+    Only the k selected rows are re-measured exactly for the returned distances; when
+    k covers every row, the distances come from the GEMM and only each query's nearest
+    row is re-measured. Removal is O(dim) swap-remove: the last live row moves into
+    the freed slot. Adding an id that is already present replaces its vector.
+
     Lazy dimension init: dimension is inferred from the first added vector.
     """
 
+    _INITIAL_CAPACITY = 64
+
     def __init__(self) -> None:
-        self._vectors: List[np.ndarray] = []
-        self._ids: List[int] = []
         self._dim: int = 0
-
-    def add(self, vector: List[float], entry_id: int) -> None:
-        v = np.array(vector, dtype=np.float32)
+        self._n: int = 0
+        self._mat = np.empty((0, 0), dtype=np.float32)
+        self._ids = np.empty(0, dtype=np.int64)
+        self._sq_norms = np.empty(0, dtype=np.float32)
+        self._row_of: Dict[int, int] = {}  # entry id -> row, for swap-remove
+
+    def _reserve(self, needed: int) -> None:
+        """Grow storage (doubling) so at least `needed` rows fit."""
+        capacity = self._mat.shape[0]
+        if needed <= capacity:
+            return
+        new_capacity = max(self._INITIAL_CAPACITY, capacity)
+        while new_capacity < needed:
+            new_capacity *= 2
+        mat = np.empty((new_capacity, self._dim), dtype=np.float32)
+        ids = np.empty(new_capacity, dtype=np.int64)
+        sq_norms = np.empty(new_capacity, dtype=np.float32)
+        if self._n:
+            mat[: self._n] = self._mat[: self._n]
+            ids[: self._n] = self._ids[: self._n]
+            sq_norms[: self._n] = self._sq_norms[: self._n]
+        self._mat, self._ids, self._sq_norms = mat, ids, sq_norms
+
+    def add(self, vector: np.ndarray, entry_id: int) -> None:
+        self.add_many(np.asarray(vector, dtype=np.float32).reshape(1, -1), [entry_id])
+
+    def add_many(self, matrix: np.ndarray, ids: Sequence[int]) -> None:
+        rows = np.asarray(matrix, dtype=np.float32)
+        if rows.ndim == 1:
+            rows = rows.reshape(1, -1)
+        if len(rows) != len(ids):
+            raise ValueError(f"add_many got {len(rows)} vectors but {len(ids)} ids")
+        if len(rows) == 0:
+            return
+        ids = [int(entry_id) for entry_id in ids]
+        for entry_id in ids:
+            if entry_id in self._row_of:
+                self.remove(entry_id)  # re-adding an id replaces its vector
+        if len(set(ids)) != len(ids):  # repeated within the batch: the last vector wins
+            keep = sorted({entry_id: pos for pos, entry_id in enumerate(ids)}.values())
+            rows, ids = rows[keep], [ids[pos] for pos in keep]
         if self._dim == 0:
-            self._dim = len(v)
-        self._vectors.append(v)
-        self._ids.append(entry_id)
-
-    def search(self, vector: List[float], k: int = 1) -> Tuple[List[int], List[float]]:
-        if not self._vectors:
-            return [], []
-        q = np.array(vector, dtype=np.float32)
-        mat = np.stack(self._vectors)  # (n, dim)
-        diffs = mat - q
-        sq_dists = np.sum(diffs ** 2, axis=1)
-        l2_dists = np.sqrt(sq_dists)
-        k_eff = min(k, len(self._ids))
-        top_idx = np.argsort(l2_dists)[:k_eff]
-        return (
-            [self._ids[i] for i in top_idx],
-            [float(l2_dists[i]) for i in top_idx],
+            self._dim = rows.shape[1]
+        end = self._n + len(rows)
+        self._reserve(end)
+        self._mat[self._n:end] = rows
+        self._ids[self._n:end] = ids
+        self._sq_norms[self._n:end] = np.einsum("ij,ij->i", rows, rows)
+        for row, entry_id in enumerate(ids, start=self._n):
+            self._row_of[entry_id] = row
+        self._n = end
+
+    def remove(self, entry_id: int) -> bool:
+        row = self._row_of.pop(int(entry_id), None)
+        if row is None:
+            return False
+        last = self._n - 1
+        if row != last:
+            self._mat[row] = self._mat[last]
+            self._ids[row] = self._ids[last]
+            self._sq_norms[row] = self._sq_norms[last]
+            self._row_of[int(self._ids[row])] = row
+        self._n = last
+        return True
+
+    def search(self, vector: np.ndarray, k: int = 1) -> Tuple[List[int], List[float]]:
+        ids, dists = self.search_many(np.asarray(vector, dtype=np.float32).reshape(1, -1), k=k)
+        return ids[0], dists[0]
+
+    def search_many(self, matrix: np.ndarray, k: int = 1) -> Tuple[List[List[int]], List[List[float]]]:
+        queries = np.asarray(matrix, dtype=np.float32)
+        if queries.ndim == 1:
+            queries = queries.reshape(1, -1)
+        if self._n == 0:
+            return [[] for _ in queries], [[] for _ in queries]
+        mat = self._mat[: self._n]
+        sq_dists = (
+            self._sq_norms[: self._n][None, :]
+            - 2.0 * (queries @ mat.T)
+            + np.einsum("ij,ij->i", queries, queries)[:, None]
         )
+        k_eff = min(k, self._n)
+        # The expanded form above is fine for ranking but loses precision near 0,
+        # where the threshold decision is made, so winners are re-measured directly.
+        if k_eff < self._n:
+            top_idx = np.argpartition(sq_dists, k_eff - 1, axis=1)[:, :k_eff]
+            diffs = mat[top_idx] - queries[:, None, :]
+            l2_dists = np.sqrt(np.einsum("qkd,qkd->qk", diffs, diffs))
+        else:
+            # Every row is returned: a full re-measure would be a (q, n, d) temporary.
+            # Take the GEMM distances and re-measure only each query's nearest row.
+            top_idx = np.argsort(sq_dists, axis=1, kind="stable")
+            l2_dists = np.sqrt(np.maximum(np.take_along_axis(sq_dists, top_idx, axis=1), 0.0))
+            nearest = mat[top_idx[:, 0]] - queries
+            l2_dists[:, 0] = np.sqrt(np.einsum("qd,qd->q", nearest, nearest))
+        order = np.argsort(l2_dists, axis=1, kind="stable")
+        top_idx = np.take_along_axis(top_idx, order, axis=1)
+        l2_dists = np.take_along_axis(l2_dists, order, axis=1)
+        return self._ids[top_idx].tolist(), l2_dists.astype(float).tolist()
 
     def reset(self) -> None:
-        self._vectors.clear()
-        self._ids.clear()
         self._dim = 0
+        self._n = 0
+        self._mat = np.empty((0, 0), dtype=np.float32)
+        self._ids = np.empty(0, dtype=np.int64)
+        self._sq_norms = np.empty(0, dtype=np.float32)
+        self._row_of = {}
 
     def size(self) -> int:
-        return len(self._vectors)
+        return self._n
+
+    VECTORS_FILE = "vectors.npy"
+    IDS_FILE = "ids.npy"
+
+    def save(self, directory: str) -> None:
+        _atomic_npy_save(os.path.join(directory, self.VECTORS_FILE), self._mat[: self._n])
+        _atomic_npy_save(os.path.join(directory, self.IDS_FILE), self._ids[: self._n])
+
+    def load(self, directory: str) -> None:
+        """Memory-map the saved matrix copy-on-write: pages load lazily, and later
+        adds/removes never write back to the snapshot file."""
+        mat = np.load(os.path.join(directory, self.VECTORS_FILE), mmap_mode="c")
+        ids = np.load(os.path.join(directory, self.IDS_FILE))
+        self.reset()
+        if len(ids) == 0:
+            return
+        self._dim = mat.shape[1]
+        self._n = len(ids)
+        self._mat = mat
+        self._ids = ids.astype(np.int64)
+        self._sq_norms = np.einsum("ij,ij->i", mat, mat).astype(np.float32)
+        self._row_of = {int(entry_id): row for row, entry_id in enumerate(self._ids)}
 
 
 # ---------------------------------------------------------------------------
@@ -127,8 +279,14 @@ class FaissHNSWVectorIndex(VectorIndex):
 
     Lazy dimension init: the Faiss index is created on first add once dim is known.
     HNSW params (M, efConstruction, efSearch) are set at construction time.
+
+    HNSW graphs do not support `remove_ids`, so removal tombstones the id: searches
+    exclude tombstones through an IDSelector, and once they exceed
+    `_COMPACT_RATIO` of the stored vectors the live rows are re-added to a fresh graph.
     """
 
+    _COMPACT_RATIO = 0.25
+
     def __init__(
         self,
         m: int = 32,
@@ -139,42 +297,130 @@ class FaissHNSWVectorIndex(VectorIndex):
         self._ef_construction = ef_construction
         self._ef_search = ef_search
         self._index = None  # created lazily
-        self._size = 0
+        self._live: Set[int] = set()
+        self._tombstones: Set[int] = set()
+        self._search_params = None
 
     def _ensure_index(self, dim: int):
         if self._index is None:
-            import faiss  # guarded: caller must check availability
-            hnsw = faiss.IndexHNSWFlat(dim, self._m)
-            hnsw.hnsw.efConstruction = self._ef_construction
-            hnsw.hnsw.efSearch = self._ef_search
-            self._index = faiss.IndexIDMap(hnsw)
-
-    def add(self, vector: List[float], entry_id: int) -> None:
-        v = np.array(vector, dtype=np.float32).reshape(1, -1)
-        self._ensure_index(v.shape[1])
-        ids = np.array([entry_id], dtype=np.int64)
-        self._index.add_with_ids(v, ids)
-        self._size += 1
-
-    def search(self, vector: List[float], k: int = 1) -> Tuple[List[int], List[float]]:
-        if self._index is None or self._size == 0:
-            return [], []
-        q = np.array(vector, dtype=np.float32).reshape(1, -1)
-        k_eff = min(k, self._size)
-        sq_distances, ids = self._index.search(q, k_eff)
+            self._index = self._new_index(dim)
+
+    def _new_index(self, dim: int):
+        import faiss  # guarded: caller must check availability
+        hnsw = faiss.IndexHNSWFlat(dim, self._m)
+        hnsw.hnsw.efConstruction = self._ef_construction
+        hnsw.hnsw.efSearch = self._ef_search
+        return faiss.IndexIDMap(hnsw)
+
+    def _exclusion_params(self):
+        """Search params filtering out tombstones; cached until the tombstone set changes."""
+        if self._search_params is None:
+            import faiss
+            excluded = faiss.IDSelectorBatch(np.fromiter(self._tombstones, dtype=np.int64))
+            selector = faiss.IDSelectorNot(excluded)
+            params = faiss.SearchParametersHNSW(sel=selector, efSearch=self._ef_search)
+            # The SWIG params hold raw pointers; keep the selectors alive alongside them.
+            self._search_params = (params, selector, excluded)
+        return self._search_params[0]
+
+    def _compact(self) -> None:
+        """Rebuild the graph from live rows only, dropping every tombstoned vector."""
+        import faiss
+        stored_ids = faiss.vector_to_array(self._index.id_map)
+        vectors = self._index.index.reconstruct_n(0, self._index.ntotal)
+        keep = np.fromiter((int(i) not in self._tombstones for i in stored_ids), dtype=bool, count=len(stored_ids))
+        fresh = self._new_index(self._index.d)
+        if keep.any():
+            fresh.add_with_ids(np.ascontiguousarray(vectors[keep]), stored_ids[keep])
+        self._index = fresh
+        self._tombstones.clear()
+        self._search_params = None
+
+    def add(self, vector: np.ndarray, entry_id: int) -> None:
+        self.add_many(np.asarray(vector, dtype=np.float32).reshape(1, -1), [entry_id])
+
+    def add_many(self, matrix: np.ndarray, ids: Sequence[int]) -> None:
+        rows = np.ascontiguousarray(matrix, dtype=np.float32)
+        if rows.ndim == 1:
+            rows = rows.reshape(1, -1)
+        if len(rows) != len(ids):
+            raise ValueError(f"add_many got {len(rows)} vectors but {len(ids)} ids")
+        if len(rows) == 0:
+            return
+        self._ensure_index(rows.shape[1])
+        if self._tombstones.intersection(int(i) for i in ids):
+            self._compact()  # a re-used id must not resurrect its tombstoned vector
+        self._index.add_with_ids(rows, np.asarray(ids, dtype=np.int64))
+        self._live.update(int(i) for i in ids)
+
+    def remove(self, entry_id: int) -> bool:
+        entry_id = int(entry_id)
+        if entry_id not in self._live:
+            return False
+        self._live.discard(entry_id)
+        self._tombstones.add(entry_id)
+        self._search_params = None
+        if len(self._tombstones) > self._COMPACT_RATIO * self._index.ntotal:
+            self._compact()
+        return True
+
+    def search(self, vector: np.ndarray, k: int = 1) -> Tuple[List[int], List[float]]:
+        ids, dists = self.search_many(np.asarray(vector, dtype=np.float32).reshape(1, -1), k=k)
+        return ids[0], dists[0]
+
+    def search_many(self, matrix: np.ndarray, k: int = 1) -> Tuple[List[List[int]], List[List[float]]]:
+        queries = np.ascontiguousarray(matrix, dtype=np.float32)
+        if queries.ndim == 1:
+            queries = queries.reshape(1, -1)
+        if self._index is None or not self._live:
+            return [[] for _ in queries], [[] for _ in queries]
+        k_eff = min(k, len(self._live))
+        if self._tombstones:
+            sq_distances, ids = self._index.search(queries, k_eff, params=self._exclusion_params())
+        else:
+            sq_distances, ids = self._index.search(queries, k_eff)
         # Faiss IndexHNSWFlat returns squared L2 distances; take sqrt for consistency
         # with BruteForceVectorIndex and the spec's "L2 distance" formula.
-        return (
-            [int(i) for i in ids[0] if i >= 0],
-            [float(math.sqrt(max(d, 0.0))) for d, i in zip(sq_distances[0], ids[0]) if i >= 0],
-        )
+        all_ids: List[List[int]] = []
+        all_dists: List[List[float]] = []
+        for row_d, row_i in zip(sq_distances, ids):
+            all_ids.append([int(i) for i in row_i if i >= 0])
+            all_dists.append([float(math.sqrt(max(d, 0.0))) for d, i in zip(row_d, row_i) if i >= 0])
+        return all_ids, all_dists
 
     def reset(self) -> None:
         self._index = None
-        self._size = 0
+        self._live.clear()
+        self._tombstones.clear()
+        self._search_params = None
 
     def size(self) -> int:
-        return self._size
+        return len(self._live)
+
+    INDEX_FILE = "index.faiss"
+
+    def save(self, directory: str) -> None:
+        import faiss
+        path = os.path.join(directory, self.INDEX_FILE)
+        if self._index is None:  # never added to: an absent file is the empty snapshot
+            if os.path.exists(path):
+                os.remove(path)
+            return
+        if self._tombstones:
+            self._compact()  # persist live vectors only
+        faiss.write_index(self._index, path + ".tmp")
+        os.replace(path + ".tmp", path)
+
+    def load(self, directory: str) -> None:
+        import faiss
+        path = os.path.join(directory, self.INDEX_FILE)
+        self.reset()
+        if not os.path.exists(path):
+            return
+        index = faiss.read_index(path)
+        faiss.downcast_index(index.index).hnsw.efSearch = self._ef_search
+        self._index = index
+        self._live = {int(i) for i in faiss.vector_to_array(index.id_map)}
 
 
 # ---------------------------------------------------------------------------
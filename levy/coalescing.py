@@ -0,0 +1,91 @@
+"""
+Single-flight coalescing of concurrent identical cache misses.
+
+When several requests for the same prompt miss the cache at once, only the first
+(the leader) calls the LLM; the rest (followers) wait on the leader's future and are
+served its response as cache hits. Flights are keyed on the exact-cache key and,
+optionally, matched by semantic neighbourhood: a follower whose normalised query
+embedding is within the similarity threshold of an in-flight leader's embedding
+waits on that leader too (same 1/(1+L2) similarity as SemanticCache).
+
+A request can miss the cache just before a leader for the same key stores its
+answer and finishes, and then join after that. It would then start a new
+flight. LevyEngine therefore re-checks the caches whenever it becomes a leader.
+If the answer is there, it hands it to its own followers instead of calling the
+LLM.
+
+Futures are `concurrent.futures.Future`, so followers can block on them from the
+sync threadpool or await them from asyncio via `asyncio.wrap_future`.
+"""
+
+import threading
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+
+@dataclass
+class Flight:
+    """One in-flight LLM call; `future` resolves to the leader's LLMResponse."""
+
+    key: str
+    vector: Optional[np.ndarray] = None
+    future: Future = field(default_factory=Future)
+
+
+class InflightRegistry:
+    """Thread-safe registry of in-flight misses, keyed by exact-cache key."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._flights: Dict[str, Flight] = {}
+
+    def join(
+        self,
+        key: str,
+        vector: Optional[np.ndarray] = None,
+        threshold: Optional[float] = None,
+    ) -> Tuple[Flight, bool, float]:
+        """
+        Attach to a matching in-flight call or start a new one.
+
+        Returns (flight, is_leader, similarity). Exact-key followers report
+        similarity 1.0; semantic-neighbour followers (only when `vector` and
+        `threshold` are given) report the best match's similarity.
+        """
+        with self._lock:
+            flight = self._flights.get(key)
+            if flight is not None:
+                return flight, False, 1.0
+
+            if vector is not None and threshold is not None:
+                best: Optional[Flight] = None
+                best_sim = -1.0
+                for candidate in self._flights.values():
+                    if candidate.vector is None or candidate.vector.shape != vector.shape:
+                        continue
+                    sim = 1.0 / (1.0 + float(np.linalg.norm(candidate.vector - vector)))
+                    if sim >= threshold and sim > best_sim:
+                        best, best_sim = candidate, sim
+                if best is not None:
+                    return best, False, best_sim
+
+            flight = Flight(key=key, vector=vector)
+            self._flights[key] = flight
+            return flight, True, 1.0
+
+    def finish(self, flight: Flight, response=None, error: Optional[BaseException] = None) -> None:
+        """Leader only: unregister the flight, then release its followers."""
+        with self._lock:
+            if self._flights.get(flight.key) is flight:
+                del self._flights[flight.key]
+        if error is not None:
+            flight.future.set_exception(error)
+        else:
+            flight.future.set_result(response)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._flights)
@@ -1,9 +1,21 @@
 import os
 from dataclasses import dataclass, field
 from typing import Optional
-from dotenv import load_dotenv
 
-load_dotenv()
+_dotenv_loaded = False
+
+
+def _env(name: str) -> Optional[str]:
+    """os.getenv, after loading `.env` once. Deferred from import time to the first
+    LevyConfig() so that importing levy stays cheap for CLIs that never build one."""
+    global _dotenv_loaded
+    if not _dotenv_loaded:
+        from dotenv import load_dotenv
+
+        load_dotenv()
+        _dotenv_loaded = True
+    return os.getenv(name)
+
 
 @dataclass
 class LevyConfig:
@@ -13,13 +25,18 @@ class LevyConfig:
     # LLM settings
     llm_provider: str = "mock"  # "mock", "openai", "ollama", "anthropic"
     mock_llm_latency_seconds: float = 0.5  # simulated delay for MockLLMClient; tests inject 0
-    openai_api_key: Optional[str] = field(default_factory=lambda: os.getenv("OPENAI_API_KEY"))
+    openai_api_key: Optional[str] = field(default_factory=lambda: _env("OPENAI_API_KEY"))
     openai_base_url: str = "https://api.openai.com/v1"
     ollama_base_url: str = "http://localhost:11434"
     model_name: str = "qwen3"  # default local model for Ollama; override per deployment
+    # Connection pool shared by each OpenAI/Ollama client across requests (levy/http_pool.py).
+    http_max_connections: int = 100
+    http_max_keepalive_connections: int = 20
+    http_keepalive_expiry_seconds: float = 30.0
+    http2: bool = False  # requires `pip install "httpx[http2]"`
 
     # Anthropic settings (LEV-6)
-    anthropic_api_key: Optional[str] = field(default_factory=lambda: os.getenv("ANTHROPIC_API_KEY"))
+    anthropic_api_key: Optional[str] = field(default_factory=lambda: _env("ANTHROPIC_API_KEY"))
     # S&D Report's example model (claude-3-sonnet-20240229) is retired; defaulting to the
     # current recommended model is intentional frozen-doc drift, not silent resolution.
     anthropic_model: str = "claude-opus-4-8"
@@ -29,12 +46,43 @@ class LevyConfig:
     anthropic_output_price_per_mtok: float = 25.0  # USD per 1M output tokens, claude-opus-4-8
     
     # Embedding settings
-    embedding_provider: str = "sentence-transformers"  # "mock", "sentence-transformers", "ollama"
+    embedding_provider: str = "sentence-transformers"  # "mock", "sentence-transformers", "onnx", "ollama"
+    # "onnx" provider only: int8 dynamic quantization target ("avx512_vnni", "avx512",
+    # "avx2", "arm64") or None for fp32, and where locally quantized exports are kept
+    # (default ~/.cache/levy/onnx).
+    onnx_quantization: Optional[str] = None
+    onnx_export_dir: Optional[str] = None
     embedding_model: str = "all-MiniLM-L6-v2"  # study baseline; use "modernbert" for the other study model
+    # Byte budget for EmbeddingManager's in-process memo (LRU); ~1.8 KB per 384-d vector.
+    # None disables the bound.
+    embedding_memo_max_bytes: Optional[int] = 128 * 1024 * 1024
+    # SQLite file persisting embeddings across processes and runs (behind the memo).
+    # None disables it; ignored for the mock provider.
+    embedding_store_path: Optional[str] = None
+    # Micro-batching: concurrent embedding misses are queued and encoded together, one
+    # encode call per window of up to embedding_batch_max_size texts or
+    # embedding_batch_max_wait_ms. Worth enabling for API traffic on CPU encoders.
+    embedding_micro_batching: bool = False
+    embedding_batch_max_size: int = 32
+    embedding_batch_max_wait_ms: float = 2.0
+    embedding_batch_queue_size: int = 1024
     
     # Storage settings
-    cache_store_type: str = "memory" # "memory", "redis"
+    cache_store_type: str = "memory" # "memory", "redis", "tiered" (in-process LRU over Redis)
     redis_url: str = "redis://localhost:6379/0"
+    redis_max_connections: Optional[int] = 50  # connection-pool size per store; None = unbounded
+    redis_socket_timeout_seconds: Optional[float] = 5.0
+    # "binary" (compact struct + raw float32 embedding, levy/cache/codec.py) or the legacy
+    # "json"; either format is read back. Responses >= redis_compress_min_bytes are
+    # compressed with "auto" (zstd if installed, else zlib), "zstd", "zlib" or "none".
+    redis_serialization: str = "binary"
+    redis_compression: str = "auto"
+    redis_compress_min_bytes: int = 512
+    # cache_store_type="tiered": per-process L1 size, how long an L1 copy is trusted
+    # (bounds staleness if a pub/sub invalidation is missed) and the invalidation channel.
+    tiered_l1_max_size: int = 1024
+    tiered_l1_ttl_seconds: Optional[float] = 30.0
+    tiered_invalidation_channel: str = "levy:invalidate"
     
     # Cache settings
     enable_exact_cache: bool = True
@@ -43,11 +91,47 @@ class LevyConfig:
     # For unit-norm vectors: similarity = 1/(1+sqrt(2-2*cosine)).
     # cosine≈0.95 → sim≈0.76; cosine≈0.99 → sim≈0.88; cosine≈0.90 → sim≈0.69.
     similarity_threshold: float = 0.85
-    cache_ttl_seconds: int = 3600  # 1 hour default
-    cache_max_size: int = 1000  # Max number of entries in memory
+    # API engine pool only: engines that differ only by threshold share one exact store
+    # and semantic index per embedding model; the threshold is applied at lookup time.
+    share_cache_across_thresholds: bool = False
+    # Single-flight: concurrent misses for the same exact-cache key make one LLM call;
+    # the others wait for it and are served as hits. Optionally also coalesce misses
+    # whose embedding is within similarity_threshold of an in-flight prompt.
+    coalesce_inflight_requests: bool = True
+    coalesce_semantic_neighbors: bool = False
+    cache_ttl_seconds: int = 3600  # 1 hour default; also bounds SemanticCache entries
+    cache_max_size: int = 1000  # Max number of entries in memory (exact store and semantic cache each)
+    # Memory budget in estimated bytes (prompt + response + embedding + metadata + overhead),
+    # enforced alongside cache_max_size by the in-memory store and semantic cache each.
+    # None = count-bounded only.
+    cache_max_bytes: Optional[int] = None
+    # Which exact-store entry goes when the in-memory store is full: "lru", "lfu" or
+    # "w-tinylfu" (frequency-sketch admission; keeps hot answers over one-off prompts).
+    cache_eviction_policy: str = "lru"
+    # Exact-cache key (levy/cache/keys.py): the prompt is canonicalized before hashing
+    # (NFKC, whitespace collapse, optionally case fold and trailing-punctuation strip),
+    # and the LLM model plus max_tokens / temperature / extra_params are part of the key.
+    exact_key_normalize_unicode: bool = True
+    exact_key_collapse_whitespace: bool = True
+    exact_key_casefold: bool = False
+    exact_key_strip_trailing_punctuation: bool = False
+    exact_key_include_params: bool = True
 
     # Vector index settings (LEV-2)
     vector_index_backend: str = "auto"  # "auto" | "faiss" | "brute_force"
     hnsw_m: int = 32
     hnsw_ef_construction: int = 200
     hnsw_ef_search: int = 64
+    # Directory for per-(embedding_model, threshold) SemanticCache snapshots; the API
+    # restores them at startup and writes them at shutdown. None disables snapshots.
+    semantic_snapshot_dir: Optional[str] = None
+    # On startup, rebuild a fresh SemanticCache from embeddings persisted in the store
+    # (RedisStore) for this engine's embedding model, `semantic_warm_batch_size` vectors
+    # per index insert.
+    semantic_warm_from_store: bool = True
+    semantic_warm_batch_size: int = 1024
+    # Share one semantic index across all worker processes on a host (levy/cache/
+    # shared_semantic_cache.py): each embedding model gets a subdirectory holding an
+    # mmap'd vector segment and a SQLite entries table. Use tmpfs (e.g. /dev/shm/levy)
+    # to keep it in memory. None keeps a private in-process index per worker.
+    semantic_shared_dir: Optional[str] = None
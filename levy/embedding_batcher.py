@@ -0,0 +1,206 @@
+"""
+Micro-batching of concurrent single-text embedding requests.
+
+API traffic arrives one prompt per request, so each request's embedding would
+otherwise be a batch-of-1 `encode` call. `EmbeddingBatcher` puts every request
+on a bounded queue; one background thread drains it, waiting up to
+`max_wait_ms` after the first item (or until `max_batch_size` items), then runs
+a single `encode_many(texts)` call and resolves each caller's future with its row.
+
+Futures are `concurrent.futures.Future`, so sync callers (the FastAPI threadpool,
+scripts) block on `embed()` and asyncio callers `await aembed()` via
+`asyncio.wrap_future` without holding a worker thread. When the queue is full,
+`submit` blocks: back-pressure instead of unbounded memory growth.
+
+The closed check and the enqueue happen under one lock, so a request is either
+rejected or queued ahead of the stop sentinel, and `close()` never waits on a full
+queue. Capacity is a semaphore that `submit` acquires outside that lock. Any request
+still queued once the worker has stopped fails with RuntimeError instead of
+hanging.
+"""
+
+import asyncio
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+_STOP = object()
+
+
+class EmbeddingBatcher:
+    """
+    Collects single-text embed requests into batched `encode_many` calls.
+
+    Parameters
+    ----------
+    encode_many : callable(list of str) -> (n, dim) array
+        Typically a bound `EmbeddingClient.embed_many`.
+    max_batch_size : flush once this many requests are queued.
+    max_wait_ms : flush this long after the first request of a batch arrived.
+    max_queue_size : pending requests before `submit` blocks; 0 or less means unbounded.
+    """
+
+    def __init__(
+        self,
+        encode_many: Callable[[List[str]], np.ndarray],
+        max_batch_size: int = 32,
+        max_wait_ms: float = 2.0,
+        max_queue_size: int = 1024,
+    ) -> None:
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be >= 1")
+        self.encode_many = encode_many
+        self.max_batch_size = max_batch_size
+        self.max_wait_seconds = max_wait_ms / 1000.0
+        self.batches = 0
+        self.items = 0
+
+        # The queue itself is unbounded so the stop sentinel always fits; `_slots`
+        # bounds the pending requests.
+        self._queue: "queue.Queue" = queue.Queue()
+        self._slots: Optional[threading.Semaphore] = (
+            threading.Semaphore(max_queue_size) if max_queue_size > 0 else None
+        )
+        self._lock = threading.Lock()
+        self._closed = False
+        self._worker = threading.Thread(target=self._run, name="levy-embedding-batcher", daemon=True)
+        self._worker.start()
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def submit(self, text: str) -> Future:
+        """Queue one text; the future resolves to its 1-D float32 vector."""
+        if self._closed:
+            raise RuntimeError("EmbeddingBatcher is closed")
+        if self._slots is not None:
+            self._slots.acquire()
+        return self._enqueue(text)
+
+    def embed(self, text: str) -> np.ndarray:
+        return self.submit(text).result()
+
+    async def aembed(self, text: str) -> np.ndarray:
+        # submit() only blocks when the queue is full; hop to a thread in that case.
+        try:
+            future = self._submit_nowait(text)
+        except queue.Full:
+            future = await asyncio.to_thread(self.submit, text)
+        return await asyncio.wrap_future(future)
+
+    def close(self, timeout: float = 5.0) -> None:
+        """Flush queued requests, then stop the worker thread.
+
+        Requests still queued once the worker has stopped are failed with RuntimeError.
+        """
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._queue.put_nowait(_STOP)
+        if self._slots is not None:
+            # Wake every submit() blocked on a full queue; each one sees _closed and raises.
+            self._slots.release(self._BLOCKED_WAKEUPS)
+        self._worker.join(timeout)
+        if not self._worker.is_alive():
+            self._fail_pending()
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "batches": self.batches,
+            "items": self.items,
+            "mean_batch_size": self.items / self.batches if self.batches else 0.0,
+        }
+
+    # ------------------------------------------------------------------
+    # Worker
+    # ------------------------------------------------------------------
+
+    # Generous upper bound on submit() callers blocked on a full queue at close().
+    _BLOCKED_WAKEUPS = 1 << 16
+
+    def _submit_nowait(self, text: str) -> Future:
+        if self._closed:
+            raise RuntimeError("EmbeddingBatcher is closed")
+        if self._slots is not None and not self._slots.acquire(blocking=False):
+            raise queue.Full
+        return self._enqueue(text)
+
+    def _enqueue(self, text: str) -> Future:
+        """Queue `text` on an already-acquired slot, or give the slot back if closed."""
+        future: Future = Future()
+        with self._lock:
+            if not self._closed:
+                self._queue.put_nowait((text, future))
+                return future
+        self._release_slot()
+        raise RuntimeError("EmbeddingBatcher is closed")
+
+    def _release_slot(self) -> None:
+        if self._slots is not None:
+            self._slots.release()
+
+    def _fail_pending(self) -> None:
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                return
+            if item is _STOP:
+                continue
+            _, future = item
+            if future.set_running_or_notify_cancel():
+                future.set_exception(RuntimeError("EmbeddingBatcher is closed"))
+
+    def _get(self, timeout: Optional[float] = None):
+        """Take one queued item (raising queue.Empty on timeout), freeing its slot."""
+        item = self._queue.get(timeout=timeout) if timeout is None or timeout > 0 else self._queue.get_nowait()
+        if item is not _STOP:
+            self._release_slot()
+        return item
+
+    def _run(self) -> None:
+        while True:
+            item = self._get()
+            if item is _STOP:
+                return
+            batch = [item]
+            stop = False
+            deadline = time.monotonic() + self.max_wait_seconds
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                try:
+                    item = self._get(remaining)
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stop = True
+                    break
+                batch.append(item)
+            self._flush(batch)
+            if stop:
+                return
+
+    def _flush(self, batch: Sequence[Tuple[str, Future]]) -> None:
+        live = [(text, future) for text, future in batch if future.set_running_or_notify_cancel()]
+        if not live:
+            return
+        # Identical texts in one window are encoded once.
+        rows: Dict[str, int] = {}
+        for text, _ in live:
+            rows.setdefault(text, len(rows))
+        try:
+            matrix = self.encode_many(list(rows))
+        except BaseException as exc:  # every waiter must be released, whatever failed
+            for _, future in live:
+                future.set_exception(exc)
+            return
+        self.batches += 1
+        self.items += len(live)
+        for text, future in live:
+            future.set_result(matrix[rows[text]])
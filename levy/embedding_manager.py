@@ -4,16 +4,37 @@ EmbeddingManager: single entry-point for embedding generation in the Levy study.
 Responsibilities:
 - Registry mapping study-model aliases to concrete checkpoints (D4).
 - Lazy construction and caching of one EmbeddingClient per checkpoint (D3).
-- In-memory memoization keyed by (model_key, sha256(text)) (D5).
+- In-memory memoization keyed by (model_key, sha256(text)) (D5), bounded by a byte
+  budget with LRU eviction (levy/embedding_memo.py).
+- Vectors are returned as read-only, contiguous float32 ndarrays; list conversion
+  happens only at serialisation boundaries (JSON, Redis).
 - Symmetric task-prefix handling per model so callers never see prefixes (D2).
+- Optional persistent store shared across processes and runs (levy/embedding_store.py),
+  consulted on memo misses before any model call.
+- Optional micro-batching of concurrent memo misses into one encode call per
+  window (levy/embedding_batcher.py), for API traffic.
 - Mock-provider bypass for offline operation.
 """
 
+import asyncio
 import hashlib
+import threading
 from dataclasses import dataclass
-from typing import Dict, List, Optional, Tuple
+from typing import Callable, Dict, Optional, Sequence, Tuple
 
-from levy.embeddings import EmbeddingClient, MockEmbeddingClient, SentenceTransformerClient, OllamaEmbeddingClient
+import numpy as np
+
+from levy.embedding_batcher import EmbeddingBatcher
+from levy.embedding_memo import DEFAULT_MAX_BYTES, EmbeddingMemo
+from levy.embedding_store import SQLiteEmbeddingStore
+from levy.http_pool import HTTPPoolSettings
+from levy.embeddings import (
+    EmbeddingClient,
+    MockEmbeddingClient,
+    OllamaEmbeddingClient,
+    OnnxEmbeddingClient,
+    SentenceTransformerClient,
+)
 
 
 @dataclass(frozen=True)
@@ -23,6 +44,9 @@ class _ModelSpec:
     checkpoint: str
     prefix: str
     trust_remote_code: bool = False
+    # The checkpoint repo ships sentence-transformers' int8 ONNX exports
+    # (onnx/model_<qint8|quint8>_<target>.onnx), so "onnx" + quantization needs no local export.
+    onnx_prequantized: bool = False
 
 
 # Single authoritative registry of study models (design.md D4).
@@ -33,12 +57,14 @@ _REGISTRY: Dict[str, _ModelSpec] = {
         provider="sentence-transformers",
         checkpoint="sentence-transformers/all-MiniLM-L6-v2",
         prefix="",
+        onnx_prequantized=True,
     ),
     "all-MiniLM-L6-v2": _ModelSpec(
         canonical_name="all-MiniLM-L6-v2",
         provider="sentence-transformers",
         checkpoint="sentence-transformers/all-MiniLM-L6-v2",
         prefix="",
+        onnx_prequantized=True,
     ),
     "modernbert": _ModelSpec(
         canonical_name="modernbert",
@@ -67,6 +93,13 @@ def _memo_key(model_key: str, text: str) -> Tuple[str, str]:
     return (model_key, text_hash)
 
 
+def _freeze(vector) -> np.ndarray:
+    """Contiguous float32 copy marked read-only, since memoized vectors are shared by callers."""
+    arr = np.array(vector, dtype=np.float32).ravel()
+    arr.flags.writeable = False
+    return arr
+
+
 class ModelIdentity:
     """Carries the resolved model information for downstream consumers."""
 
@@ -91,12 +124,18 @@ class EmbeddingManager:
         manager = EmbeddingManager.from_config(config)
         vector = manager.embed("some text")        # uses config.embedding_model
         vector = manager.embed_with("modernbert", "some text")  # runtime switch
+        matrix = manager.embed_many(texts, batch_size=64)  # one batched encode for the misses
 
     Usage (mock / offline):
         config.embedding_provider = "mock"
         manager = EmbeddingManager.from_config(config)
         # All embed calls return deterministic random vectors; no network or disk I/O.
 
+    Usage (CPU inference via ONNX Runtime, same registry, prefixes and model names):
+        config.embedding_provider = "onnx"
+        config.onnx_quantization = "avx512_vnni"   # optional int8 dynamic quantization
+        manager = EmbeddingManager.from_config(config)
+
     Usage (Ollama demo path):
         config.embedding_provider = "ollama"
         manager = EmbeddingManager.from_config(config)
@@ -109,16 +148,40 @@ class EmbeddingManager:
         provider: str = "sentence-transformers",
         mock_dimension: int = 384,
         ollama_base_url: str = "http://localhost:11434",
+        http_settings: Optional[HTTPPoolSettings] = None,
+        micro_batching: bool = False,
+        batch_max_size: int = 32,
+        batch_max_wait_ms: float = 2.0,
+        batch_queue_size: int = 1024,
+        memo_max_bytes: Optional[int] = DEFAULT_MAX_BYTES,
+        store_path: Optional[str] = None,
+        onnx_quantization: Optional[str] = None,
+        onnx_export_dir: Optional[str] = None,
     ) -> None:
         self._default_model_name = model_name
         self._provider = provider
         self._mock_dimension = mock_dimension
         self._ollama_base_url = ollama_base_url
+        self._http_settings = http_settings
+        self._onnx_quantization = onnx_quantization
+        self._onnx_export_dir = onnx_export_dir
+        self._micro_batching = micro_batching
+        self._batch_options = dict(
+            max_batch_size=batch_max_size, max_wait_ms=batch_max_wait_ms, max_queue_size=batch_queue_size
+        )
 
         # Lazy-loaded clients keyed by checkpoint string (or "mock" / "ollama").
         self._clients: Dict[str, EmbeddingClient] = {}
-        # Memoization cache: (model_key, sha256(text)) → vector
-        self._memo: Dict[Tuple[str, str], List[float]] = {}
+        # Memoization cache: (model_key, sha256(text)) → read-only float32 vector, LRU within a byte budget
+        self._memo = EmbeddingMemo(max_bytes=memo_max_bytes)
+        # Persistent second level behind the memo. Mock vectors are free to recompute
+        # (and their key ignores the mock dimension), so they are never persisted.
+        self._store: Optional[SQLiteEmbeddingStore] = (
+            SQLiteEmbeddingStore(store_path) if store_path and provider != "mock" else None
+        )
+        # One micro-batcher per model key, created on the first miss when enabled.
+        self._batchers: Dict[str, EmbeddingBatcher] = {}
+        self._batchers_lock = threading.Lock()
 
     @classmethod
     def from_config(cls, config) -> "EmbeddingManager":
@@ -127,39 +190,103 @@ class EmbeddingManager:
             model_name=config.embedding_model,
             provider=config.embedding_provider,
             ollama_base_url=getattr(config, "ollama_base_url", "http://localhost:11434"),
+            http_settings=HTTPPoolSettings.from_config(config, timeout_seconds=30.0),
+            micro_batching=getattr(config, "embedding_micro_batching", False),
+            batch_max_size=getattr(config, "embedding_batch_max_size", 32),
+            batch_max_wait_ms=getattr(config, "embedding_batch_max_wait_ms", 2.0),
+            batch_queue_size=getattr(config, "embedding_batch_queue_size", 1024),
+            memo_max_bytes=getattr(config, "embedding_memo_max_bytes", DEFAULT_MAX_BYTES),
+            store_path=getattr(config, "embedding_store_path", None),
+            onnx_quantization=getattr(config, "onnx_quantization", None),
+            onnx_export_dir=getattr(config, "onnx_export_dir", None),
         )
 
     # ------------------------------------------------------------------
     # Public API
     # ------------------------------------------------------------------
 
-    def embed(self, text: str) -> List[float]:
+    def embed(self, text: str) -> np.ndarray:
         """Embed text using the configured default model."""
         return self.embed_with(self._default_model_name, text)
 
-    def embed_with(self, model_name: str, text: str) -> List[float]:
+    def embed_with(self, model_name: str, text: str) -> np.ndarray:
         """Embed text using a specific study-model alias (runtime switching)."""
-        if self._provider == "mock":
-            client = self._get_mock_client()
-            key = _memo_key("mock", text)
-            if key not in self._memo:
-                self._memo[key] = client.embed(text)
-            return self._memo[key]
-
-        if self._provider == "ollama":
-            client = self._get_ollama_client()
-            key = _memo_key("ollama:" + model_name, text)
-            if key not in self._memo:
-                self._memo[key] = client.embed(text)
-            return self._memo[key]
-
-        spec = _resolve(model_name)
-        prefixed = spec.prefix + text
-        memo_k = _memo_key(spec.checkpoint, prefixed)
-        if memo_k not in self._memo:
-            client = self._get_st_client(spec)
-            self._memo[memo_k] = client.embed(prefixed)
-        return self._memo[memo_k]
+        key, get_client, payload = self._route(model_name, text)
+        vector = self._memo.get(key)
+        if vector is None:
+            vector = self._store.get(key) if self._store is not None else None
+            if vector is None:
+                if self._micro_batching:
+                    raw = self._get_batcher(key[0], get_client).embed(payload)
+                else:
+                    raw = get_client().embed(payload)
+                vector = self._persist(key, _freeze(raw))
+            self._memo.put(key, vector)
+        return vector
+
+    def embed_many(self, texts: Sequence[str], batch_size: int = 32) -> np.ndarray:
+        """Embed several texts with the default model; see embed_many_with."""
+        return self.embed_many_with(self._default_model_name, texts, batch_size=batch_size)
+
+    def embed_many_with(self, model_name: str, texts: Sequence[str], batch_size: int = 32) -> np.ndarray:
+        """Embed `texts` as a (len(texts), dim) float32 array, in input order.
+
+        Memoized texts are served from the memo, then from the persistent store if
+        configured; the rest (deduplicated, with the model prefix applied) go to the
+        client in one `embed_many` call, which encodes them batch_size at a time, and
+        are backfilled into the memo and store. An empty `texts` gives a (0, 0) array
+        without loading or probing the model.
+        """
+        if batch_size < 1:
+            raise ValueError(f"batch_size must be >= 1, got {batch_size}")
+        if not texts:
+            return np.empty((0, 0), dtype=np.float32)
+        routes = [self._route(model_name, text) for text in texts]
+        found: Dict[Tuple[str, str], np.ndarray] = {}
+        pending: Dict[Tuple[str, str], str] = {}
+        for key, _, payload in routes:
+            vector = self._memo.get(key)
+            if vector is not None:
+                found[key] = vector
+            else:
+                pending.setdefault(key, payload)
+        if pending and self._store is not None:
+            for key, vector in self._store.get_many(list(pending)).items():
+                found[key] = vector
+                self._memo.put(key, vector)
+                del pending[key]
+        if pending:
+            get_client = routes[0][1]
+            vectors = get_client().embed_many(list(pending.values()), batch_size=batch_size)
+            computed = [(key, _freeze(vector)) for key, vector in zip(pending, vectors)]
+            if self._store is not None:
+                self._store.put_many(computed)
+            for key, vector in computed:
+                found[key] = vector
+                self._memo.put(key, vector)
+        return np.vstack([found[key] for key, _, _ in routes])
+
+    async def aembed(self, text: str) -> np.ndarray:
+        """Async embed() for the event loop: memo hits return immediately, misses await
+        the client's `aembed` (native HTTP for Ollama, a worker thread for local models).
+        Persistent-store reads and writes (SQLite) run in a worker thread too."""
+        return await self.aembed_with(self._default_model_name, text)
+
+    async def aembed_with(self, model_name: str, text: str) -> np.ndarray:
+        key, get_client, payload = self._route(model_name, text)
+        vector = self._memo.get(key)
+        if vector is None:
+            vector = await asyncio.to_thread(self._store.get, key) if self._store is not None else None
+            if vector is None:
+                if self._micro_batching:
+                    raw = await self._get_batcher(key[0], get_client).aembed(payload)
+                else:
+                    raw = await get_client().aembed(payload)
+                vector = _freeze(raw)
+                if self._store is not None:
+                    await asyncio.to_thread(self._store.put, key, vector)
+            self._memo.put(key, vector)
+        return vector
 
     def get_dimension(self, model_name: Optional[str] = None) -> int:
         """Return the embedding dimension for the given (or default) model."""
@@ -169,7 +296,7 @@ class EmbeddingManager:
         if self._provider == "ollama":
             return self._get_ollama_client().get_dimension()
         spec = _resolve(name)
-        return self._get_st_client(spec).get_dimension()
+        return self._get_local_client(spec).get_dimension()
 
     def get_model_identity(self, model_name: Optional[str] = None) -> "ModelIdentity":
         """Return canonical name, resolved checkpoint id, and dimension."""
@@ -191,17 +318,95 @@ class EmbeddingManager:
         return ModelIdentity(
             canonical_name=spec.canonical_name,
             checkpoint=spec.checkpoint,
-            dimension=self._get_st_client(spec).get_dimension(),
+            dimension=self._get_local_client(spec).get_dimension(),
         )
 
+    def batcher_stats(self) -> Dict[str, Dict[str, float]]:
+        """Per-model micro-batcher counters (empty unless micro-batching is on)."""
+        return {model_key: batcher.stats() for model_key, batcher in self._batchers.items()}
+
+    def close(self) -> None:
+        """Stop micro-batchers, close every constructed client (releases pooled HTTP
+        connections) and the persistent store."""
+        self._close_batchers()
+        for client in self._clients.values():
+            client.close()
+        if self._store is not None:
+            self._store.close()
+
+    async def aclose(self) -> None:
+        self._close_batchers()
+        for client in self._clients.values():
+            await client.aclose()
+        if self._store is not None:
+            self._store.close()
+
+    def _close_batchers(self) -> None:
+        with self._batchers_lock:
+            batchers, self._batchers = list(self._batchers.values()), {}
+        for batcher in batchers:
+            batcher.close()
+
+    def _persist(self, key: Tuple[str, str], vector: np.ndarray) -> np.ndarray:
+        if self._store is not None:
+            self._store.put(key, vector)
+        return vector
+
+    def store_stats(self) -> Optional[Dict[str, int]]:
+        """Persistent-store entries, hits and misses; None when no store is configured."""
+        return self._store.stats() if self._store is not None else None
+
+    def memo_stats(self) -> Dict[str, float]:
+        """Entries, bytes, hits, misses and evictions of the embedding memo."""
+        return self._memo.stats()
+
     def clear_memoization(self) -> None:
-        """Evict all cached embeddings (for tests or per-configuration resets)."""
+        """Evict all in-process cached embeddings (for tests or per-configuration resets).
+        The persistent store, if any, is left intact."""
         self._memo.clear()
 
     # ------------------------------------------------------------------
     # Internal helpers
     # ------------------------------------------------------------------
 
+    def _route(self, model_name: str, text: str) -> Tuple[Tuple[str, str], Callable[[], EmbeddingClient], str]:
+        """Resolve (memo key, client getter, text actually sent to the model)."""
+        if self._provider == "mock":
+            return _memo_key("mock", text), self._get_mock_client, text
+
+        if self._provider == "ollama":
+            return _memo_key("ollama:" + model_name, text), self._get_ollama_client, text
+
+        spec = _resolve(model_name)
+        prefixed = spec.prefix + text
+        return _memo_key(self._local_model_key(spec), prefixed), lambda: self._get_local_client(spec), prefixed
+
+    def _local_model_key(self, spec: _ModelSpec) -> str:
+        """Memo / client key for a registry model. ONNX (and each quantization) gets its
+        own key: its vectors differ slightly from the PyTorch ones and must not mix."""
+        if self._provider == "onnx":
+            return f"onnx[{self._onnx_quantization or 'fp32'}]:{spec.checkpoint}"
+        return spec.checkpoint
+
+    def _get_local_client(self, spec: _ModelSpec) -> SentenceTransformerClient:
+        if self._provider == "onnx":
+            return self._get_onnx_client(spec)
+        return self._get_st_client(spec)
+
+    def _get_batcher(self, model_key: str, get_client: Callable[[], EmbeddingClient]) -> EmbeddingBatcher:
+        batcher = self._batchers.get(model_key)
+        if batcher is None:
+            with self._batchers_lock:
+                batcher = self._batchers.get(model_key)
+                if batcher is None:
+                    client = get_client()
+                    batcher = EmbeddingBatcher(
+                        lambda texts: client.embed_many(texts, batch_size=len(texts)),
+                        **self._batch_options,
+                    )
+                    self._batchers[model_key] = batcher
+        return batcher
+
     def _get_mock_client(self) -> MockEmbeddingClient:
         if "mock" not in self._clients:
             self._clients["mock"] = MockEmbeddingClient(dimension=self._mock_dimension)
@@ -212,9 +417,22 @@ class EmbeddingManager:
             self._clients["ollama"] = OllamaEmbeddingClient(
                 base_url=self._ollama_base_url,
                 model=self._default_model_name,
+                http_settings=self._http_settings,
             )
         return self._clients["ollama"]  # type: ignore[return-value]
 
+    def _get_onnx_client(self, spec: _ModelSpec) -> OnnxEmbeddingClient:
+        key = self._local_model_key(spec)
+        if key not in self._clients:
+            self._clients[key] = OnnxEmbeddingClient(
+                model_name=spec.checkpoint,
+                trust_remote_code=spec.trust_remote_code,
+                quantization=self._onnx_quantization,
+                prequantized=spec.onnx_prequantized,
+                export_dir=self._onnx_export_dir,
+            )
+        return self._clients[key]  # type: ignore[return-value]
+
     def _get_st_client(self, spec: _ModelSpec) -> SentenceTransformerClient:
         if spec.checkpoint not in self._clients:
             self._clients[spec.checkpoint] = SentenceTransformerClient(
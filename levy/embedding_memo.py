@@ -0,0 +1,99 @@
+"""
+EmbeddingMemo: bounded, byte-accounted LRU for EmbeddingManager's memoization.
+
+Entries are read-only float32 vectors keyed by (model_key, sha256(text)). Each
+entry is charged its `nbytes` plus a fixed per-entry overhead (key strings, tuple,
+dict slot, ndarray header), and least-recently-used entries are evicted once the
+total exceeds `max_bytes`. A 384-d vector costs about 1.8 KB, so the default
+128 MiB budget holds roughly 70k embeddings. `max_bytes=None` (or 0) is unbounded.
+
+Thread-safe: the API's threadpool, the micro-batcher worker and the event loop
+can all hit the memo concurrently.
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Dict, Hashable, Optional
+
+import numpy as np
+
+# Approximate CPython cost of one entry besides the vector data: two short str keys
+# (model key + 64-char hex digest), the tuple, the OrderedDict node and the ndarray header.
+ENTRY_OVERHEAD_BYTES = 320
+
+DEFAULT_MAX_BYTES = 128 * 1024 * 1024
+
+
+class EmbeddingMemo:
+    """LRU mapping key -> float32 vector with a byte budget and hit/miss/eviction counters."""
+
+    def __init__(self, max_bytes: Optional[int] = DEFAULT_MAX_BYTES) -> None:
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: "OrderedDict[Hashable, np.ndarray]" = OrderedDict()
+        self._nbytes = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _cost(vector: np.ndarray) -> int:
+        return int(vector.nbytes) + ENTRY_OVERHEAD_BYTES
+
+    def get(self, key: Hashable) -> Optional[np.ndarray]:
+        """Return the memoized vector (refreshing its recency) or None, counting a hit or miss."""
+        with self._lock:
+            vector = self._entries.get(key)
+            if vector is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return vector
+
+    def put(self, key: Hashable, vector: np.ndarray) -> None:
+        """Insert (or refresh) an entry, then evict LRU entries until within budget.
+        A single vector larger than the whole budget is not stored."""
+        cost = self._cost(vector)
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._nbytes -= self._cost(old)
+            if self.max_bytes and cost > self.max_bytes:
+                return
+            self._entries[key] = vector
+            self._nbytes += cost
+            while self.max_bytes and self._nbytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._nbytes -= self._cost(evicted)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        """Drop every entry; counters are kept (they describe the process lifetime)."""
+        with self._lock:
+            self._entries.clear()
+            self._nbytes = 0
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes currently charged against the budget."""
+        return self._nbytes
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._nbytes,
+                "max_bytes": self.max_bytes or 0,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries
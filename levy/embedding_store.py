@@ -0,0 +1,133 @@
+"""
+SQLiteEmbeddingStore: persistent embedding cache shared across processes and runs.
+
+EmbeddingManager's memo is process-local, so every uvicorn worker, every
+`scripts/run_experiments.py` run and every restart would otherwise re-encode the
+same texts. This store persists vectors keyed exactly like the memo,
+(checkpoint, sha256(prefix + text)), as raw float32 blobs in one SQLite table.
+
+SQLite in WAL mode lets any number of processes read while one writes, with no
+server to run; each thread gets its own connection. Reads return
+`np.frombuffer` views over the fetched blob (no per-float decode or copy) that are
+read-only, like memoized vectors. Writes use INSERT OR IGNORE: a given key always
+maps to the same vector, so concurrent writers racing on a key are harmless.
+"""
+
+import os
+import sqlite3
+import threading
+from typing import Dict, Hashable, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+Key = Tuple[str, str]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS embeddings (
+    model_key TEXT NOT NULL,
+    text_hash TEXT NOT NULL,
+    dim INTEGER NOT NULL,
+    vector BLOB NOT NULL,
+    PRIMARY KEY (model_key, text_hash)
+) WITHOUT ROWID
+"""
+
+# SQLite's default limit on bound parameters is 999 on older builds; two per key.
+_LOOKUP_CHUNK = 400
+
+
+def _decode(dim: int, blob: bytes) -> np.ndarray:
+    vector = np.frombuffer(blob, dtype=np.float32)
+    if vector.shape[0] != dim:
+        raise ValueError(f"Corrupt embedding row: expected {dim} floats, got {vector.shape[0]}")
+    return vector
+
+
+class SQLiteEmbeddingStore:
+    """Persistent (model_key, text_hash) -> float32 vector map backed by SQLite (WAL)."""
+
+    def __init__(self, path: str, timeout_seconds: float = 30.0) -> None:
+        self.path = path
+        self.timeout_seconds = timeout_seconds
+        self.hits = 0
+        self.misses = 0
+        parent = os.path.dirname(os.path.abspath(path))
+        os.makedirs(parent, exist_ok=True)
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+        conn = self._connection()
+        with conn:
+            conn.execute(_SCHEMA)
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=self.timeout_seconds, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            with self._lock:
+                self._connections.append(conn)
+        return conn
+
+    def get(self, key: Key) -> Optional[np.ndarray]:
+        row = self._connection().execute(
+            "SELECT dim, vector FROM embeddings WHERE model_key = ? AND text_hash = ?", key
+        ).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return _decode(*row)
+
+    def get_many(self, keys: Sequence[Key]) -> Dict[Key, np.ndarray]:
+        """Look up many keys in a few queries; absent keys are simply missing from the result."""
+        found: Dict[Key, np.ndarray] = {}
+        conn = self._connection()
+        for start in range(0, len(keys), _LOOKUP_CHUNK):
+            chunk = keys[start:start + _LOOKUP_CHUNK]
+            where = " OR ".join(["(model_key = ? AND text_hash = ?)"] * len(chunk))
+            params = [part for key in chunk for part in key]
+            for model_key, text_hash, dim, blob in conn.execute(
+                f"SELECT model_key, text_hash, dim, vector FROM embeddings WHERE {where}", params
+            ):
+                found[(model_key, text_hash)] = _decode(dim, blob)
+        self.hits += len(found)
+        self.misses += len(keys) - len(found)
+        return found
+
+    def put(self, key: Key, vector: np.ndarray) -> None:
+        self.put_many([(key, vector)])
+
+    def put_many(self, items: Iterable[Tuple[Key, np.ndarray]]) -> None:
+        rows = []
+        for (model_key, text_hash), vector in items:
+            data = np.ascontiguousarray(vector, dtype=np.float32)
+            rows.append((model_key, text_hash, int(data.shape[0]), data.tobytes()))
+        if not rows:
+            return
+        conn = self._connection()
+        with conn:
+            conn.executemany(
+                "INSERT OR IGNORE INTO embeddings (model_key, text_hash, dim, vector) VALUES (?, ?, ?, ?)",
+                rows,
+            )
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self._connection().execute(
+            "SELECT 1 FROM embeddings WHERE model_key = ? AND text_hash = ?", key
+        ).fetchone() is not None
+
+    def __len__(self) -> int:
+        return self._connection().execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+
+    def stats(self) -> Dict[str, int]:
+        return {"entries": len(self), "hits": self.hits, "misses": self.misses}
+
+    def close(self) -> None:
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            conn.close()
+        self._local = threading.local()
@@ -1,36 +1,85 @@
 from abc import ABC, abstractmethod
-from typing import List
+import asyncio
+import hashlib
+import os
+from typing import List, Optional, Sequence
 import numpy as np
-import random
+from levy.http_pool import HTTPPoolSettings, PooledHTTPClient
+
+
+def _as_vector(values) -> np.ndarray:
+    """Coerce a model/provider output into the contiguous 1-D float32 array callers expect."""
+    return np.ascontiguousarray(values, dtype=np.float32).ravel()
+
+
+def _as_matrix(rows) -> np.ndarray:
+    """Stack per-text vectors (or a provider's 2-D output) into a (n, dim) float32 array."""
+    if len(rows) == 0:
+        return np.empty((0, 0), dtype=np.float32)
+    return np.ascontiguousarray(np.vstack(rows), dtype=np.float32)
+
 
 class EmbeddingClient(ABC):
     @abstractmethod
-    def embed(self, text: str) -> List[float]:
-        """Return the embedding vector for the given text."""
+    def embed(self, text: str) -> np.ndarray:
+        """Return the embedding vector for the given text as a 1-D float32 array."""
         pass
+
+    async def aembed(self, text: str) -> np.ndarray:
+        """Async embed. The default runs the blocking `embed` in a worker thread so CPU
+        inference never stalls the event loop; network clients override it natively."""
+        return await asyncio.to_thread(self.embed, text)
+
+    def embed_many(self, texts: Sequence[str], batch_size: int = 32) -> np.ndarray:
+        """Embed several texts; returns a (len(texts), dim) float32 array in input order.
+        The default loops over `embed`; batch-capable clients override it."""
+        return _as_matrix([self.embed(text) for text in texts])
     
     @abstractmethod
     def get_dimension(self) -> int:
         pass
 
+    def close(self) -> None:
+        """Release pooled connections. Clients without resources inherit this no-op."""
+
+    async def aclose(self) -> None:
+        self.close()
+
 class MockEmbeddingClient(EmbeddingClient):
-    """Generates random embeddings for testing infrastructure without models."""
+    """Deterministic pseudo-random unit vectors for testing infrastructure without models.
+
+    Each text seeds its own numpy Generator from a stable hash of the text, so the same
+    text always maps to the same vector (across processes too) and no global RNG state
+    is touched, which keeps concurrent callers thread-safe.
+    """
     def __init__(self, dimension: int = 384):
         self.dimension = dimension
-        # Use a seed to make "random" embeddings consistent for the same text in this simple mock
-        # This is a hacky way to make simple exact replay work somewhat consistently
-        # but for semantic cache to work 'correctly' in mock, we might need something smarter.
-        # Actually, let's just use random. 
-        # For 'semantic' testing with Mock, it won't really work unless we hash the text to a vector.
-        pass
 
-    def embed(self, text: str) -> List[float]:
-        # deterministically generate a vector from string hash for basic consistency
-        random.seed(text)
-        vector = [random.uniform(-1, 1) for _ in range(self.dimension)]
-        # Normalize
-        norm = np.linalg.norm(vector)
-        return (vector / norm).tolist()
+    @staticmethod
+    def _seed(text: str) -> int:
+        return int.from_bytes(hashlib.sha256(text.encode("utf-8")).digest()[:8], "little")
+
+    def _raw(self, text: str, out: np.ndarray) -> None:
+        rng = np.random.default_rng(self._seed(text))
+        rng.random(out=out, dtype=np.float32)
+
+    def embed(self, text: str) -> np.ndarray:
+        return self._generate([text])[0]
+
+    def embed_many(self, texts: Sequence[str], batch_size: int = 32) -> np.ndarray:
+        return self._generate(texts)
+
+    def _generate(self, texts: Sequence[str]) -> np.ndarray:
+        matrix = np.empty((len(texts), self.dimension), dtype=np.float32)
+        for row, text in zip(matrix, texts):
+            self._raw(text, row)
+        matrix *= 2
+        matrix -= 1  # uniform in [-1, 1)
+        matrix /= np.linalg.norm(matrix, axis=1, keepdims=True)
+        return matrix
+
+    async def aembed(self, text: str) -> np.ndarray:
+        return self.embed(text)  # cheap and CPU-only: not worth a thread hop
 
     def get_dimension(self) -> int:
         return self.dimension
@@ -44,40 +93,123 @@ class SentenceTransformerClient(EmbeddingClient):
         except ImportError:  # pragma: no cover -- only triggers when the optional dependency is absent
             raise ImportError("sentence-transformers is not installed. Please install it with `pip install sentence-transformers`.")
 
-    def embed(self, text: str) -> List[float]:  # pragma: no cover -- requires a loaded model
-        embedding = self.model.encode(text)
-        return embedding.tolist()
+    def embed(self, text: str) -> np.ndarray:  # pragma: no cover -- requires a loaded model
+        return _as_vector(self.model.encode(text, convert_to_numpy=True))
+
+    def embed_many(self, texts: Sequence[str], batch_size: int = 32) -> np.ndarray:  # pragma: no cover -- requires a loaded model
+        # One encode call: sentence-transformers pads and runs each batch_size chunk as one tensor.
+        return _as_matrix(self.model.encode(list(texts), batch_size=batch_size, convert_to_numpy=True))
 
     def get_dimension(self) -> int:  # pragma: no cover -- requires a loaded model
         return self.model.get_embedding_dimension()
 
+# ONNX Runtime dynamic-quantization targets, mapped to the int8 weight type
+# sentence-transformers uses for each (and encodes in the exported file name).
+ONNX_QUANTIZATION_CONFIGS = {"arm64": "qint8", "avx2": "quint8", "avx512": "qint8", "avx512_vnni": "qint8"}
+
+
+class OnnxEmbeddingClient(SentenceTransformerClient):
+    """sentence-transformers on the ONNX Runtime backend, optionally int8-quantized.
+
+    `quantization` names an ONNX Runtime dynamic-quantization target (see
+    ONNX_QUANTIZATION_CONFIGS). Checkpoints that ship sentence-transformers'
+    quantized exports (`prequantized=True`) load them directly; otherwise the model
+    is exported and quantized once into `export_dir` and reused from there.
+    Encoding (embed / embed_many) is inherited.
+    """
+    def __init__(
+        self,
+        model_name: str = "all-MiniLM-L6-v2",
+        trust_remote_code: bool = False,
+        quantization: Optional[str] = None,
+        prequantized: bool = False,
+        export_dir: Optional[str] = None,
+    ):
+        if quantization is not None and quantization not in ONNX_QUANTIZATION_CONFIGS:
+            raise ValueError(
+                f"Unknown ONNX quantization {quantization!r}; "
+                f"expected one of {sorted(ONNX_QUANTIZATION_CONFIGS)}"
+            )
+        self.quantization = quantization
+        self.model = self._load(model_name, trust_remote_code, quantization, prequantized, export_dir)
+
+    @staticmethod
+    def _load(model_name, trust_remote_code, quantization, prequantized, export_dir):  # pragma: no cover -- loads a real model checkpoint
+        try:
+            from sentence_transformers import SentenceTransformer, export_dynamic_quantized_onnx_model
+        except ImportError:
+            raise ImportError('ONNX embeddings need `pip install "sentence-transformers[onnx]"`.')
+        if quantization is None:
+            return SentenceTransformer(model_name, backend="onnx", trust_remote_code=trust_remote_code)
+
+        file_name = f"onnx/model_{ONNX_QUANTIZATION_CONFIGS[quantization]}_{quantization}.onnx"
+        source = model_name
+        if not prequantized:
+            root = export_dir or os.path.join(os.path.expanduser("~"), ".cache", "levy", "onnx")
+            source = os.path.join(root, model_name.replace("/", "__"))
+            if not os.path.exists(os.path.join(source, file_name)):
+                fp32 = SentenceTransformer(model_name, backend="onnx", trust_remote_code=trust_remote_code)
+                fp32.save(source)
+                export_dynamic_quantized_onnx_model(fp32, quantization, source)
+        return SentenceTransformer(
+            source, backend="onnx", model_kwargs={"file_name": file_name}, trust_remote_code=trust_remote_code
+        )
+
 class OllamaEmbeddingClient(EmbeddingClient):
-    """Client for local Ollama embeddings."""
-    def __init__(self, base_url: str = "http://localhost:11434", model: str = "nomic-embed-text"):
-        # Local import to avoid circular dependency issues or just standard practice if keeping clean
-        import httpx
-        self.httpx = httpx
+    """Client for local Ollama embeddings, over a long-lived connection pool."""
+    def __init__(
+        self,
+        base_url: str = "http://localhost:11434",
+        model: str = "nomic-embed-text",
+        http_settings: Optional[HTTPPoolSettings] = None,
+    ):
         self.base_url = base_url
         self.model = model
+        self.http = PooledHTTPClient(http_settings or HTTPPoolSettings(timeout_seconds=30.0))
         self._dimension = None
 
-    def embed(self, text: str) -> List[float]:  # pragma: no cover -- requires a running Ollama server
-        url = f"{self.base_url}/api/embeddings"
-        payload = {
-            "model": self.model,
-            "prompt": text
-        }
-        with self.httpx.Client(timeout=30.0) as client:
-            resp = client.post(url, json=payload)
+    def close(self) -> None:
+        self.http.close()
+
+    async def aclose(self) -> None:
+        await self.http.aclose()
+
+    # Single and batched calls both go through `/api/embed`: the legacy
+    # `/api/embeddings` endpoint returns unnormalised vectors, so mixing the two
+    # would give the same text different embeddings depending on the call path.
+    def embed(self, text: str) -> np.ndarray:
+        resp = self.http.sync.post(f"{self.base_url}/api/embed", json={"model": self.model, "input": text})
+        resp.raise_for_status()
+        return self._parse(resp.json())
+
+    async def aembed(self, text: str) -> np.ndarray:  # pragma: no cover -- requires a running Ollama server
+        resp = await self.http.async_.post(f"{self.base_url}/api/embed", json={"model": self.model, "input": text})
+        resp.raise_for_status()
+        return self._parse(resp.json())
+
+    def embed_many(self, texts: Sequence[str], batch_size: int = 32) -> np.ndarray:
+        """Batch through `/api/embed` with an array `input`; one request per batch_size texts."""
+        if batch_size < 1:
+            raise ValueError(f"batch_size must be >= 1, got {batch_size}")
+        rows: List[List[float]] = []
+        for start in range(0, len(texts), batch_size):
+            chunk = list(texts[start:start + batch_size])
+            resp = self.http.sync.post(f"{self.base_url}/api/embed", json={"model": self.model, "input": chunk})
             resp.raise_for_status()
-            data = resp.json()
-            embedding = data["embedding"]
-            if self._dimension is None:
-                self._dimension = len(embedding)
-            return embedding
+            rows.extend(resp.json()["embeddings"])
+        matrix = _as_matrix(rows)
+        if self._dimension is None and len(matrix):
+            self._dimension = matrix.shape[1]
+        return matrix
+
+    def _parse(self, data) -> np.ndarray:
+        embedding = _as_vector(data["embeddings"][0])
+        if self._dimension is None:
+            self._dimension = len(embedding)
+        return embedding
 
     def get_dimension(self) -> int:
         if self._dimension is None:
             # Generate a dummy embedding to know the dimension
-            self.embed("test")  # pragma: no cover -- requires a running Ollama server
+            self.embed("test")
         return self._dimension
@@ -1,27 +1,47 @@
+import asyncio
+import os
 import time
 import logging
-from typing import Optional, Any, Dict
+from typing import Optional, Any, Dict, Tuple
 from levy.config import LevyConfig
 from levy.models import LLMRequest, LevyResult, LLMResponse
 from levy.llm_client import LLMClient, MockLLMClient, OpenAILLMClient, OllamaLLMClient, AnthropicLLMClient
 from levy.embedding_manager import EmbeddingManager
+from levy.http_pool import HTTPPoolSettings
 from levy.cache.store import InMemoryStore
 # Load RedisStore conditionally or just import if available
 try:
     from levy.cache.redis_store import RedisStore
 except ImportError:
     RedisStore = None
+from levy.cache.tiered_store import TieredStore
 
 from levy.cache.exact_cache import ExactCache
+from levy.cache.keys import KeySchema
 from levy.cache.semantic_cache import SemanticCache
+from levy.cache.shared_semantic_cache import SharedSemanticCache
+from levy.cache.vector_index import _l2_normalize
+from levy.coalescing import Flight, InflightRegistry
 from levy.metrics import LevyMetrics
 
 logger = logging.getLogger(__name__)
 
 class LevyEngine:
-    def __init__(self, config: LevyConfig = LevyConfig(), embedding_manager: Optional[EmbeddingManager] = None):
+    def __init__(
+        self,
+        config: Optional[LevyConfig] = None,
+        embedding_manager: Optional[EmbeddingManager] = None,
+        store: Optional[Any] = None,
+        semantic_cache: Optional[SemanticCache] = None,
+        inflight: Optional[InflightRegistry] = None,
+    ):
+        # Built per engine, not as a default argument: that would read the environment
+        # (and .env) at import time and share one mutable config across engines.
+        config = config if config is not None else LevyConfig()
         self.config = config
         self.metrics = LevyMetrics()
+        # Engines sharing a cache should share this too, so their misses coalesce.
+        self.inflight = inflight if inflight is not None else InflightRegistry()
 
         # 1. Initialize LLM Client
         if config.llm_provider == "openai":
@@ -30,12 +50,14 @@ class LevyEngine:
             self.llm_client = OpenAILLMClient(
                 api_key=config.openai_api_key,
                 base_url=config.openai_base_url,
-                model=config.model_name
+                model=config.model_name,
+                http_settings=HTTPPoolSettings.from_config(config, timeout_seconds=30.0),
             )
         elif config.llm_provider == "ollama":
             self.llm_client = OllamaLLMClient(
                 base_url=config.ollama_base_url,
-                model=config.model_name
+                model=config.model_name,
+                http_settings=HTTPPoolSettings.from_config(config, timeout_seconds=60.0),
             )
         elif config.llm_provider == "anthropic":
             self.llm_client = AnthropicLLMClient(
@@ -53,35 +75,279 @@ class LevyEngine:
         # Callers (e.g. the experiment harness sweeping many configs per model) may inject
         # a shared manager so memoization survives across engine instances.
         self.embedding_manager = embedding_manager if embedding_manager is not None else EmbeddingManager.from_config(config)
+        # An injected manager belongs to the caller, who closes it.
+        self._owns_embedding_manager = embedding_manager is None
 
-        # 3. Initialize Store and Caches
-        if config.cache_store_type == "redis":
+        # 3. Initialize Store and Caches. An injected store / semantic cache (the API pool
+        # sharing one per embedding model across thresholds) is used as-is.
+        # An injected store belongs to the caller, who closes it.
+        self._owns_store = store is None
+        if store is not None:
+            self.store = store
+        elif config.cache_store_type in ("redis", "tiered"):
             if RedisStore is None:
                 logger.warning("Redis dependencies not found. Falling back to Memory.")
-                self.store = InMemoryStore(max_size=self.config.cache_max_size)
+                self.store = self._memory_store()
             else:
                  try:
-                    self.store = RedisStore(redis_url=config.redis_url, ttl=config.cache_ttl_seconds)
+                    self.store = RedisStore(
+                        redis_url=config.redis_url,
+                        ttl=config.cache_ttl_seconds,
+                        max_connections=config.redis_max_connections,
+                        socket_timeout=config.redis_socket_timeout_seconds,
+                        serialization=config.redis_serialization,
+                        compression=config.redis_compression,
+                        compress_min_bytes=config.redis_compress_min_bytes,
+                    )
+                    if config.cache_store_type == "tiered":
+                        self.store = TieredStore(
+                            self.store,
+                            l1_max_size=config.tiered_l1_max_size,
+                            l1_ttl_seconds=config.tiered_l1_ttl_seconds,
+                            channel=config.tiered_invalidation_channel,
+                        )
                  except Exception as e:
                     logger.error(f"Failed to connect to Redis: {e}. Falling back to Memory.")
-                    self.store = InMemoryStore(max_size=self.config.cache_max_size)
+                    self.store = self._memory_store()
         else:
-            self.store = InMemoryStore(max_size=self.config.cache_max_size)
+            self.store = self._memory_store()
 
-        self.exact_cache = ExactCache(self.store)
-        self.semantic_cache = SemanticCache(
+        self.exact_cache = ExactCache(self.store, key_schema=self._key_schema())
+        self._owns_semantic_cache = semantic_cache is None
+        if semantic_cache is not None:
+            self.semantic_cache = semantic_cache
+        elif config.semantic_shared_dir:
+            self.semantic_cache = self._shared_semantic_cache()
+        else:
+            self.semantic_cache = SemanticCache(
+                embedding_client=self.embedding_manager,
+                threshold=self.config.similarity_threshold,
+                backend=self.config.vector_index_backend,
+                m=self.config.hnsw_m,
+                ef_construction=self.config.hnsw_ef_construction,
+                ef_search=self.config.hnsw_ef_search,
+                max_size=self.config.cache_max_size,
+                ttl_seconds=self.config.cache_ttl_seconds,
+                max_bytes=self.config.cache_max_bytes,
+            )
+        # agenerate() runs cache lookups and writes in a worker thread when they do network
+        # or disk I/O (Redis, the shared SQLite table) so they never block the event loop.
+        # In-process caches stay on the loop: they are fast and not thread-safe.
+        self._offload_cache_io = not isinstance(self.store, InMemoryStore) or isinstance(
+            self.semantic_cache, SharedSemanticCache
+        )
+        # A semantic cache built here starts empty (a shared one may already be filled by
+        # another worker); refill it from a persistent store.
+        if (
+            semantic_cache is None
+            and config.enable_semantic_cache
+            and config.semantic_warm_from_store
+            and self.semantic_cache.size() == 0
+        ):
+            self.warm_semantic_cache()
+
+    def _shared_semantic_cache(self) -> SharedSemanticCache:
+        """One shared directory per (provider, embedding model): vectors from different
+        models never share an index."""
+        name = f"{self.config.embedding_provider}__{self.config.embedding_model}"
+        safe_name = "".join(c if c.isalnum() or c in "-_." else "_" for c in name)
+        if self.config.cache_max_bytes:
+            logger.warning(
+                "cache_max_bytes bounds the exact store only; the shared semantic cache "
+                "cannot enforce a byte budget across workers (bound it with cache_max_size)"
+            )
+        return SharedSemanticCache(
+            os.path.join(self.config.semantic_shared_dir, safe_name),
             embedding_client=self.embedding_manager,
             threshold=self.config.similarity_threshold,
-            backend=self.config.vector_index_backend,
-            m=self.config.hnsw_m,
-            ef_construction=self.config.hnsw_ef_construction,
-            ef_search=self.config.hnsw_ef_search,
+            max_size=self.config.cache_max_size,
+            ttl_seconds=self.config.cache_ttl_seconds,
+        )
+
+    def _key_schema(self) -> KeySchema:
+        model = self.config.anthropic_model if self.config.llm_provider == "anthropic" else self.config.model_name
+        return KeySchema(
+            model=f"{self.config.llm_provider}:{model}",
+            normalize_unicode=self.config.exact_key_normalize_unicode,
+            collapse_whitespace=self.config.exact_key_collapse_whitespace,
+            casefold=self.config.exact_key_casefold,
+            strip_trailing_punctuation=self.config.exact_key_strip_trailing_punctuation,
+            include_params=self.config.exact_key_include_params,
+        )
+
+    def _memory_store(self) -> InMemoryStore:
+        return InMemoryStore(
+            max_size=self.config.cache_max_size,
+            policy=self.config.cache_eviction_policy,
+            max_bytes=self.config.cache_max_bytes,
         )
 
+    def warm_semantic_cache(self) -> Dict[str, Any]:
+        """Bulk-load the semantic cache from embeddings persisted in the store.
+
+        Streams `iter_entries_with_embeddings()` (RedisStore: chunked SSCAN + MGET),
+        keeps entries written under this engine's embedding model identity (canonical
+        name, checkpoint, dimension) and adds them in batches. Logs progress per batch
+        and the time to warm. A store failure is logged and leaves the cache as it was
+        loaded so far, so it never blocks startup.
+        """
+        report = {"scanned": 0, "loaded": 0, "skipped_model": 0, "seconds": 0.0}
+        stream = getattr(self.store, "iter_entries_with_embeddings", None)
+        if stream is None:
+            return report
+        identity: Dict[str, Any] = {}
+        start = time.perf_counter()
+
+        def matching():
+            for entry in stream():
+                if not identity:  # resolved on the first entry: an empty store loads no model
+                    identity.update(self.embedding_manager.get_model_identity().as_dict())
+                report["scanned"] += 1
+                meta = entry.metadata
+                if any(meta.get(field) != value for field, value in identity.items()):
+                    report["skipped_model"] += 1
+                    continue
+                yield entry
+
+        def progress(loaded: int) -> None:
+            report["loaded"] = loaded
+            logger.info(
+                f"Warming semantic cache: {loaded} loaded / {report['scanned']} scanned "
+                f"({time.perf_counter() - start:.1f}s)"
+            )
+
+        try:
+            self.semantic_cache.bulk_load(
+                matching(), batch_size=self.config.semantic_warm_batch_size, on_batch=progress
+            )
+        except Exception as e:
+            logger.error(f"Semantic cache warm from store failed: {e}")
+        report["seconds"] = time.perf_counter() - start
+        if report["scanned"]:
+            logger.info(
+                f"Semantic cache warmed with {report['loaded']} entries for "
+                f"{identity['canonical_name']} in {report['seconds']:.2f}s "
+                f"({report['skipped_model']} from other models skipped)"
+            )
+        return report
+
+    def close(self) -> None:
+        """Release the LLM client's pooled connections (and the embedding manager's and
+        store's, if owned)."""
+        close = getattr(self.llm_client, "close", None)
+        if close is not None:
+            close()
+        if self._owns_embedding_manager:
+            self.embedding_manager.close()
+        self._close_store()
+
+    async def aclose(self) -> None:
+        """close() for the event loop; also closes async clients opened by agenerate()."""
+        aclose = getattr(self.llm_client, "aclose", None)
+        if aclose is not None:
+            await aclose()
+        if self._owns_embedding_manager:
+            await self.embedding_manager.aclose()
+        self._close_store()
+
+    def _close_store(self) -> None:
+        close = getattr(self.store, "close", None)  # TieredStore: stops its pub/sub listener
+        if self._owns_store and close is not None:
+            close()
+        close = getattr(self.semantic_cache, "close", None)  # SharedSemanticCache: unmaps, closes SQLite
+        if self._owns_semantic_cache and close is not None:
+            close()
+
     def generate(self, prompt: str, **kwargs) -> LevyResult:
         start_time = time.time()
         request = LLMRequest(prompt=prompt, extra_params=kwargs)
-        
+
+        # 1-2. Exact cache, then semantic cache
+        cached = self._lookup_exact(request, start_time) or self._lookup_semantic(request, start_time)
+        if cached is not None:
+            return cached
+
+        # 3. Miss: join an identical in-flight call if there is one
+        flight, is_leader, similarity = self._join_inflight(request)
+        if flight is not None and not is_leader:
+            return self._follow(flight.future.result(), request, similarity, start_time)
+        if flight is not None:
+            # A previous leader may have stored the answer between our miss and our join.
+            cached = self._lookup_exact(request, start_time) or self._lookup_semantic(request, start_time)
+            if cached is not None:
+                self.inflight.finish(flight, self._cached_response(cached))
+                return cached
+
+        # 4. LLM Call (leader, or coalescing disabled)
+        logger.info(f"Cache miss. Calling LLM for: {prompt[:30]}...")
+        try:
+            llm_response = self.llm_client.generate(request)
+            self._store(request, llm_response)
+        except BaseException as e:  # followers must be released even on interrupts
+            logger.error(f"LLM call failed: {e}")
+            if flight is not None:
+                self.inflight.finish(flight, error=e)
+            raise e
+        if flight is not None:
+            self.inflight.finish(flight, llm_response)
+
+        return self._miss_result(llm_response, start_time)
+
+    async def agenerate(self, prompt: str, **kwargs) -> LevyResult:
+        """Async generate() for event-loop callers (the API).
+
+        Same stages and cache semantics as generate(); the blocking parts are awaited
+        instead: the query embedding (`EmbeddingManager.aembed`, which memoizes, so the
+        semantic lookup and store that follow are dict hits), the follower wait on an
+        in-flight leader, and the LLM call (`LLMClient.agenerate`). Cache lookups and
+        the final store run in a worker thread when the store or semantic cache does
+        I/O (see `_offload_cache_io`).
+        """
+        start_time = time.time()
+        request = LLMRequest(prompt=prompt, extra_params=kwargs)
+
+        cached = await self._cache_io(self._lookup_exact, request, start_time)
+        if cached is not None:
+            return cached
+        if self.config.enable_semantic_cache:
+            await self.embedding_manager.aembed(prompt)
+            cached = await self._cache_io(self._lookup_semantic, request, start_time)
+            if cached is not None:
+                return cached
+
+        flight, is_leader, similarity = self._join_inflight(request)
+        if flight is not None and not is_leader:
+            llm_response = await asyncio.wrap_future(flight.future)
+            return self._follow(llm_response, request, similarity, start_time)
+        if flight is not None:
+            # A previous leader may have stored the answer between our miss and our join.
+            cached = await self._cache_io(self._lookup_exact, request, start_time) or await self._cache_io(
+                self._lookup_semantic, request, start_time
+            )
+            if cached is not None:
+                self.inflight.finish(flight, self._cached_response(cached))
+                return cached
+
+        logger.info(f"Cache miss. Calling LLM for: {prompt[:30]}...")
+        try:
+            llm_response = await self._call_llm_async(request)
+            await self._cache_io(self._store, request, llm_response)
+        except BaseException as e:  # includes CancelledError: followers must be released
+            logger.error(f"LLM call failed: {e!r}")
+            if flight is not None:
+                self.inflight.finish(flight, error=e)
+            raise e
+        if flight is not None:
+            self.inflight.finish(flight, llm_response)
+
+        return self._miss_result(llm_response, start_time)
+
+    # ------------------------------------------------------------------
+    # generate() stages
+    # ------------------------------------------------------------------
+
+    def _lookup_exact(self, request: LLMRequest, start_time: float) -> Optional[LevyResult]:
+        prompt = request.prompt
         # 1. Check Exact Cache
         if self.config.enable_exact_cache:
             entry = self.exact_cache.get(request)
@@ -97,12 +363,15 @@ class LevyEngine:
                     similarity_score=1.0,
                     metadata=entry.metadata
                 )
+        return None
 
+    def _lookup_semantic(self, request: LLMRequest, start_time: float) -> Optional[LevyResult]:
+        prompt = request.prompt
         # 2. Check Semantic Cache
         if self.config.enable_semantic_cache:
             # Note: exact cache get doesn't compute embedding usually, 
             # but semantic needs it. Semantic cache 'get' computes it internaly if needed.
-            entry = self.semantic_cache.get(request)
+            entry = self.semantic_cache.get(request, threshold=self.config.similarity_threshold)
             if entry:
                 latency = (time.time() - start_time) * 1000
                 score = entry.metadata.get('last_similarity_score', 0.0)
@@ -116,25 +385,65 @@ class LevyEngine:
                     similarity_score=score,
                     metadata=entry.metadata
                 )
+        return None
 
-        # 3. LLM Call
-        logger.info(f"Cache miss. Calling LLM for: {prompt[:30]}...")
-        try:
-            llm_response = self.llm_client.generate(request)
-        except Exception as e:
-            logger.error(f"LLM call failed: {e}")
-            raise e
+    async def _cache_io(self, stage, *args):
+        """Run a cache stage for agenerate(): in a worker thread if it does I/O."""
+        if self._offload_cache_io:
+            return await asyncio.to_thread(stage, *args)
+        return stage(*args)
+
+    async def _call_llm_async(self, request: LLMRequest) -> LLMResponse:
+        agenerate = getattr(self.llm_client, "agenerate", None)
+        if agenerate is None:  # duck-typed client without an async path
+            return await asyncio.to_thread(self.llm_client.generate, request)
+        return await agenerate(request)
+
+    def _join_inflight(self, request: LLMRequest) -> Tuple[Optional[Flight], bool, float]:
+        """Single-flight registration; (None, True, 1.0) when coalescing is disabled."""
+        if not self.config.coalesce_inflight_requests:
+            return None, True, 1.0
+        vector = None
+        threshold = None
+        if self.config.coalesce_semantic_neighbors and self.config.enable_semantic_cache:
+            # Memoized by the semantic lookup that just missed, so this is a dict hit.
+            vector = _l2_normalize(self.embedding_manager.embed(request.prompt))
+            threshold = self.config.similarity_threshold
+        return self.inflight.join(self.exact_cache.key_for(request), vector, threshold)
+
+    @staticmethod
+    def _cached_response(cached: LevyResult) -> LLMResponse:
+        """A leader that found the answer cached on its re-check hands it to its followers."""
+        return LLMResponse(text=cached.answer, model="cache", metadata=dict(cached.metadata))
+
+    def _follow(self, llm_response: LLMResponse, request: LLMRequest, similarity: float, start_time: float) -> LevyResult:
+        """Serve a follower the leader's response as a cache hit."""
+        exact = similarity >= 1.0
+        latency = (time.time() - start_time) * 1000
+        self.metrics.record_hit("exact" if exact else "semantic", saved_tokens=len(llm_response.text.split()))
+        self.metrics.record_coalesced()
+        self.metrics.record_request(latency)
+        logger.info(f"Coalesced onto in-flight request ({similarity:.4f}) for: {request.prompt[:30]}...")
+        metadata = dict(self.embedding_manager.get_model_identity().as_dict(), coalesced=True)
+        return LevyResult(
+            answer=llm_response.text,
+            source="exact_cache" if exact else "semantic_cache",
+            latency_ms=latency,
+            similarity_score=similarity,
+            metadata=metadata,
+        )
 
-        # 4. Store in Cache
+    def _store(self, request: LLMRequest, llm_response: LLMResponse) -> None:
         embedding = None
         if self.config.enable_semantic_cache:
-            embedding = self.embedding_manager.embed(prompt)
+            embedding = self.embedding_manager.embed(request.prompt)
 
         model_meta = self.embedding_manager.get_model_identity().as_dict()
         self.exact_cache.set(request, llm_response.text, embedding=embedding, metadata=model_meta)
         if self.config.enable_semantic_cache and embedding is not None:
             self.semantic_cache.set(request, llm_response.text, embedding=embedding, metadata=model_meta)
 
+    def _miss_result(self, llm_response: LLMResponse, start_time: float) -> LevyResult:
         latency = (time.time() - start_time) * 1000
         self.metrics.record_miss()
         self.metrics.record_request(latency)
@@ -153,10 +462,22 @@ class LevyEngine:
         """Additive accessor (LEV-7): semantic-index size + per-model cached-entry
         counts, read from CacheEntry.metadata written by the exact-cache store."""
         model_breakdown: Dict[str, int] = {}
-        for entry in self.store.entries.values():
+        # TieredStore reports its L1 tier; RedisStore has no cheap full listing.
+        for entry in getattr(self.store, "entries", {}).values():
             name = entry.metadata.get("canonical_name", "unknown")
             model_breakdown[name] = model_breakdown.get(name, 0) + 1
-        return {
+        store_bytes = getattr(self.store, "nbytes", 0)
+        stats = {
             "index_size": self.semantic_cache.size(),
             "model_breakdown": model_breakdown,
+            # Estimated resident bytes (levy/cache/sizing.py). The peak sums each
+            # structure's own high-water mark, so it is an upper bound.
+            "store_bytes": store_bytes,
+            "semantic_bytes": self.semantic_cache.nbytes,
+            "cache_bytes": store_bytes + self.semantic_cache.nbytes,
+            "peak_cache_bytes": getattr(self.store, "peak_nbytes", 0) + self.semantic_cache.peak_nbytes,
         }
+        store_stats = getattr(self.store, "stats", None)
+        if store_stats is not None:
+            stats["store"] = store_stats()  # eviction policy + exact-store hit rate
+        return stats
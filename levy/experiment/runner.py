@@ -59,6 +59,7 @@ def run_sweep(
     configs: Optional[List[ExperimentConfig]] = None,
     embedding_provider: str = "mock",
     llm_latency_seconds: float = 0.5,
+    embedding_store_path: Optional[str] = None,
 ) -> Tuple[List[EvaluationResult], Dict[str, dict]]:
     """
     Run every configuration in `configs` (the full frozen grid by default),
@@ -68,6 +69,10 @@ def run_sweep(
     maps each model alias to its resolved checkpoint/dimension (for the
     run-metadata sidecar).
 
+    `embedding_store_path` points every manager at one persistent embedding
+    store, so a re-run of the sweep over the same dataset needs no model
+    forward passes.
+
     `llm_latency_seconds` forwards to each configuration's `MockLLMClient`
     (default 0.5, matching a real run); tests pass 0 to keep the suite fast.
     """
@@ -80,7 +85,11 @@ def run_sweep(
     for config in configs:
         manager = managers.get(config.model)
         if manager is None:
-            manager = EmbeddingManager(model_name=config.model, provider=embedding_provider)
+            manager = EmbeddingManager(
+                model_name=config.model,
+                provider=embedding_provider,
+                store_path=embedding_store_path,
+            )
             managers[config.model] = manager
         results.append(
             run_experiment(
@@ -92,6 +101,8 @@ def run_sweep(
         )
 
     model_identities = {model: manager.get_model_identity().as_dict() for model, manager in managers.items()}
+    for manager in managers.values():
+        manager.close()
     return results, model_identities
 
 
@@ -0,0 +1,112 @@
+"""
+Long-lived, pooled HTTP connections shared by the httpx-based provider clients
+(OpenAI and Ollama LLM clients, Ollama embeddings).
+
+Opening an `httpx.Client` per call pays TCP (and TLS) setup on every request and
+never reuses a connection. `PooledHTTPClient` instead builds one sync and one async
+client lazily, on first use, with keep-alive limits and optional HTTP/2, and keeps
+them until `close()` / `aclose()`. The async client is created inside the event loop
+that first uses it, since its connection pool is bound to that loop. Creation is
+guarded by a lock, so threads racing on first use still share a single client.
+
+HTTP/2 needs the optional `h2` package (`pip install "httpx[http2]"`).
+"""
+
+import threading
+from dataclasses import dataclass
+from typing import Any, Optional
+
+
+@dataclass(frozen=True)
+class HTTPPoolSettings:
+    """Connection-pool settings; `from_config` reads the `http_*` fields of LevyConfig."""
+
+    timeout_seconds: float = 30.0
+    max_connections: int = 100
+    max_keepalive_connections: int = 20
+    keepalive_expiry_seconds: float = 30.0
+    http2: bool = False
+
+    @classmethod
+    def from_config(cls, config, timeout_seconds: float = 30.0) -> "HTTPPoolSettings":
+        return cls(
+            timeout_seconds=timeout_seconds,
+            max_connections=getattr(config, "http_max_connections", cls.max_connections),
+            max_keepalive_connections=getattr(
+                config, "http_max_keepalive_connections", cls.max_keepalive_connections
+            ),
+            keepalive_expiry_seconds=getattr(
+                config, "http_keepalive_expiry_seconds", cls.keepalive_expiry_seconds
+            ),
+            http2=getattr(config, "http2", cls.http2),
+        )
+
+
+class PooledHTTPClient:
+    """Lazily-built, reusable sync + async httpx clients sharing one set of settings."""
+
+    def __init__(self, settings: Optional[HTTPPoolSettings] = None, transport: Optional[Any] = None) -> None:
+        self.settings = settings or HTTPPoolSettings()
+        # Optional httpx transport (e.g. httpx.MockTransport in tests) used by both clients.
+        self.transport = transport
+        self._sync: Optional[Any] = None
+        self._async: Optional[Any] = None
+        self._lock = threading.Lock()
+
+    def _client_kwargs(self) -> dict:
+        import httpx
+
+        s = self.settings
+        kwargs = {
+            "timeout": s.timeout_seconds,
+            "limits": httpx.Limits(
+                max_connections=s.max_connections,
+                max_keepalive_connections=s.max_keepalive_connections,
+                keepalive_expiry=s.keepalive_expiry_seconds,
+            ),
+            "http2": s.http2,
+        }
+        if self.transport is not None:
+            kwargs["transport"] = self.transport
+        return kwargs
+
+    @property
+    def sync(self):
+        """The shared `httpx.Client`, built on first access."""
+        client = self._sync
+        if client is None:
+            import httpx
+
+            with self._lock:
+                if self._sync is None:
+                    self._sync = httpx.Client(**self._client_kwargs())
+                client = self._sync
+        return client
+
+    @property
+    def async_(self):
+        """The shared `httpx.AsyncClient`, built on first access (inside the running loop)."""
+        client = self._async
+        if client is None:
+            import httpx
+
+            with self._lock:
+                if self._async is None:
+                    self._async = httpx.AsyncClient(**self._client_kwargs())
+                client = self._async
+        return client
+
+    def close(self) -> None:
+        """Close the sync client. An open async client must be closed with `aclose()`."""
+        with self._lock:
+            client, self._sync = self._sync, None
+        if client is not None:
+            client.close()
+
+    async def aclose(self) -> None:
+        """Close both clients."""
+        self.close()
+        with self._lock:
+            client, self._async = self._async, None
+        if client is not None:
+            await client.aclose()
@@ -1,8 +1,8 @@
 from abc import ABC, abstractmethod
 from typing import Any, Dict, Optional
+import asyncio
 import time
-import httpx
-import anthropic
+from levy.http_pool import HTTPPoolSettings, PooledHTTPClient
 from levy.models import LLMRequest, LLMResponse
 
 class LLMClient(ABC):
@@ -10,6 +10,30 @@ class LLMClient(ABC):
     def generate(self, request: LLMRequest) -> LLMResponse:
         pass
 
+    async def agenerate(self, request: LLMRequest) -> LLMResponse:
+        """Async generate. Providers override with a native async client; the default
+        runs the blocking `generate` in a worker thread so any client works."""
+        return await asyncio.to_thread(self.generate, request)
+
+    def close(self) -> None:
+        """Release pooled connections. Clients without resources inherit this no-op."""
+
+    async def aclose(self) -> None:
+        """Async close(): also releases connections opened by `agenerate`."""
+        self.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
+
 class MockLLMClient(LLMClient):
     """A mock client that echoes the prompt (reversed) for testing."""
     def __init__(self, latency_seconds: float = 0.5):
@@ -19,6 +43,14 @@ class MockLLMClient(LLMClient):
         # Simulate network latency
         if self.latency_seconds:
             time.sleep(self.latency_seconds)
+        return self._respond(request)
+
+    async def agenerate(self, request: LLMRequest) -> LLMResponse:
+        if self.latency_seconds:
+            await asyncio.sleep(self.latency_seconds)
+        return self._respond(request)
+
+    def _respond(self, request: LLMRequest) -> LLMResponse:
         response_text = f"Computed response for: {request.prompt[::-1]}" # Reverse string as 'computation'
         # Simple token estimation
         tokens = len(response_text.split())
@@ -29,41 +61,61 @@ class MockLLMClient(LLMClient):
         )
 
 class OpenAILLMClient(LLMClient):
-    """Minimal OpenAI client using httpx."""
-    def __init__(self, api_key: str, base_url: str = "https://api.openai.com/v1", model: str = "gpt-3.5-turbo"):
+    """Minimal OpenAI client using httpx over a long-lived connection pool."""
+    def __init__(
+        self,
+        api_key: str,
+        base_url: str = "https://api.openai.com/v1",
+        model: str = "gpt-3.5-turbo",
+        http_settings: Optional[HTTPPoolSettings] = None,
+    ):
         self.api_key = api_key
         self.base_url = base_url
         self.model = model
+        self.http = PooledHTTPClient(http_settings or HTTPPoolSettings(timeout_seconds=30.0))
 
-    def generate(self, request: LLMRequest) -> LLMResponse:  # pragma: no cover -- requires the real OpenAI API
-        headers = {
+    def close(self) -> None:
+        self.http.close()
+
+    async def aclose(self) -> None:
+        await self.http.aclose()
+
+    def _headers(self) -> Dict[str, str]:
+        return {
             "Authorization": f"Bearer {self.api_key}",
             "Content-Type": "application/json"
         }
+
+    def _payload(self, request: LLMRequest) -> Dict[str, Any]:
         payload = {
             "model": self.model,
             "messages": [{"role": "user", "content": request.prompt}],
             "max_tokens": request.max_tokens,
             "temperature": request.temperature,
         }
-        
         # Merge extra params
         payload.update(request.extra_params)
+        return payload
 
-        with httpx.Client(timeout=30.0) as client:
-            resp = client.post(f"{self.base_url}/chat/completions", json=payload, headers=headers)
-            resp.raise_for_status()
-            data = resp.json()
-            
-            content = data["choices"][0]["message"]["content"]
-            tokens = data.get("usage", {}).get("total_tokens", 0)
-            
-            return LLMResponse(
-                text=content,
-                token_usage=tokens,
-                model=self.model,
-                metadata=data
-            )
+    def _parse(self, data: Dict[str, Any]) -> LLMResponse:
+        content = data["choices"][0]["message"]["content"]
+        tokens = data.get("usage", {}).get("total_tokens", 0)
+        return LLMResponse(
+            text=content,
+            token_usage=tokens,
+            model=self.model,
+            metadata=data
+        )
+
+    def generate(self, request: LLMRequest) -> LLMResponse:  # pragma: no cover -- requires the real OpenAI API
+        resp = self.http.sync.post(f"{self.base_url}/chat/completions", json=self._payload(request), headers=self._headers())
+        resp.raise_for_status()
+        return self._parse(resp.json())
+
+    async def agenerate(self, request: LLMRequest) -> LLMResponse:  # pragma: no cover -- requires the real OpenAI API
+        resp = await self.http.async_.post(f"{self.base_url}/chat/completions", json=self._payload(request), headers=self._headers())
+        resp.raise_for_status()
+        return self._parse(resp.json())
 
 class BudgetExceededError(Exception):
     """Raised when accumulated estimated Anthropic spend has reached the configured cap."""
@@ -108,6 +160,10 @@ class AnthropicLLMClient(LLMClient):
     Retry (connection errors, 408/409/429/5xx) is the SDK's own exponential backoff,
     configured via `max_retries` rather than reimplemented. A per-instance budget guard
     halts further requests once estimated spend reaches `budget_cap_usd`.
+
+    `agenerate` uses `anthropic.AsyncAnthropic`, built on first use. An injected sync
+    `http_client` (tests, proxies) without an `async_http_client` is honoured by
+    running the sync client in a worker thread instead.
     """
     def __init__(
         self,
@@ -118,16 +174,23 @@ class AnthropicLLMClient(LLMClient):
         input_price_per_mtok: float = 5.0,
         output_price_per_mtok: float = 25.0,
         http_client: Optional[Any] = None,
+        async_http_client: Optional[Any] = None,
     ):
         if not api_key:
             raise ValueError("ANTHROPIC_API_KEY is required for the 'anthropic' provider")
         self.model = model
         self.budget = _BudgetGuard(budget_cap_usd, input_price_per_mtok, output_price_per_mtok)
 
-        client_kwargs: Dict[str, Any] = {"api_key": api_key, "max_retries": max_retries}
+        self._client_kwargs: Dict[str, Any] = {"api_key": api_key, "max_retries": max_retries}
+        client_kwargs = dict(self._client_kwargs)
         if http_client is not None:
             client_kwargs["http_client"] = http_client
+        import anthropic  # deferred: the SDK is only imported when this provider is used
+
         self._client = anthropic.Anthropic(**client_kwargs)
+        self._sync_transport_injected = http_client is not None and async_http_client is None
+        self._async_http_client = async_http_client
+        self._async_client: Optional[Any] = None
 
     @property
     def request_count(self) -> int:
@@ -139,13 +202,43 @@ class AnthropicLLMClient(LLMClient):
 
     def generate(self, request: LLMRequest) -> LLMResponse:
         self.budget.check()
+        response = self._client.messages.create(**self._create_kwargs(request))
+        return self._to_llm_response(response)
 
-        response = self._client.messages.create(
-            model=self.model,
-            max_tokens=request.max_tokens,
-            messages=[{"role": "user", "content": request.prompt}],
-        )
+    async def agenerate(self, request: LLMRequest) -> LLMResponse:
+        if self._sync_transport_injected:
+            return await super().agenerate(request)
+        self.budget.check()
+        response = await self._get_async_client().messages.create(**self._create_kwargs(request))
+        return self._to_llm_response(response)
+
+    def close(self) -> None:
+        self._client.close()
+
+    async def aclose(self) -> None:
+        self.close()
+        if self._async_client is not None:
+            await self._async_client.close()
+            self._async_client = None
+
+    def _get_async_client(self):
+        if self._async_client is None:
+            client_kwargs = dict(self._client_kwargs)
+            if self._async_http_client is not None:
+                client_kwargs["http_client"] = self._async_http_client
+            import anthropic
+
+            self._async_client = anthropic.AsyncAnthropic(**client_kwargs)
+        return self._async_client
 
+    def _create_kwargs(self, request: LLMRequest) -> Dict[str, Any]:
+        return {
+            "model": self.model,
+            "max_tokens": request.max_tokens,
+            "messages": [{"role": "user", "content": request.prompt}],
+        }
+
+    def _to_llm_response(self, response) -> LLMResponse:
         input_tokens = response.usage.input_tokens
         output_tokens = response.usage.output_tokens
         self.budget.record(input_tokens, output_tokens)
@@ -168,13 +261,24 @@ class AnthropicLLMClient(LLMClient):
         )
 
 class OllamaLLMClient(LLMClient):
-    """Client for local Ollama instances."""
-    def __init__(self, base_url: str = "http://localhost:11434", model: str = "qwen3"):
+    """Client for local Ollama instances, over a long-lived connection pool."""
+    def __init__(
+        self,
+        base_url: str = "http://localhost:11434",
+        model: str = "qwen3",
+        http_settings: Optional[HTTPPoolSettings] = None,
+    ):
         self.base_url = base_url
         self.model = model
+        self.http = PooledHTTPClient(http_settings or HTTPPoolSettings(timeout_seconds=60.0))
+
+    def close(self) -> None:
+        self.http.close()
+
+    async def aclose(self) -> None:
+        await self.http.aclose()
 
-    def generate(self, request: LLMRequest) -> LLMResponse:  # pragma: no cover -- requires a running Ollama server
-        url = f"{self.base_url}/api/chat"
+    def _payload(self, request: LLMRequest) -> Dict[str, Any]:
         payload = {
             "model": self.model,
             "messages": [{"role": "user", "content": request.prompt}],
@@ -187,19 +291,26 @@ class OllamaLLMClient(LLMClient):
         # Merge extra params if needed
         if "max_tokens" in request.extra_params:
              payload["options"]["num_predict"] = request.extra_params["max_tokens"]
-        
-        with httpx.Client(timeout=60.0) as client:
-            resp = client.post(url, json=payload)
-            resp.raise_for_status()
-            data = resp.json()
-            
-            content = data["message"]["content"]
-            # Ollama returns explicit token counts in 'eval_count' (output) + 'prompt_eval_count' (input)
-            tokens = data.get("eval_count", 0) + data.get("prompt_eval_count", 0)
-            
-            return LLMResponse(
-                text=content,
-                token_usage=tokens,
-                model=self.model,
-                metadata=data
-            )
+        return payload
+
+    def _parse(self, data: Dict[str, Any]) -> LLMResponse:
+        content = data["message"]["content"]
+        # Ollama returns explicit token counts in 'eval_count' (output) + 'prompt_eval_count' (input)
+        tokens = data.get("eval_count", 0) + data.get("prompt_eval_count", 0)
+
+        return LLMResponse(
+            text=content,
+            token_usage=tokens,
+            model=self.model,
+            metadata=data
+        )
+
+    def generate(self, request: LLMRequest) -> LLMResponse:
+        resp = self.http.sync.post(f"{self.base_url}/api/chat", json=self._payload(request))
+        resp.raise_for_status()
+        return self._parse(resp.json())
+
+    async def agenerate(self, request: LLMRequest) -> LLMResponse:
+        resp = await self.http.async_.post(f"{self.base_url}/api/chat", json=self._payload(request))
+        resp.raise_for_status()
+        return self._parse(resp.json())
@@ -11,6 +11,7 @@ class LevyMetrics:
     semantic_hits: int = 0
     misses: int = 0
     tokens_saved: int = 0
+    coalesced: int = 0  # hits served by waiting on an identical in-flight miss
     latencies: List[float] = field(default_factory=list)
     start_time: float = field(default_factory=time.time)
 
@@ -21,6 +22,9 @@ class LevyMetrics:
             self.semantic_hits += 1
         self.tokens_saved += saved_tokens
 
+    def record_coalesced(self):
+        self.coalesced += 1
+
     def record_miss(self):
         self.misses += 1
 
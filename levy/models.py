@@ -3,6 +3,8 @@ import uuid
 from dataclasses import dataclass, field
 from typing import List, Optional, Dict, Any, Literal
 
+import numpy as np
+
 @dataclass
 class LLMRequest:
     """Standardized request object."""
@@ -26,7 +28,7 @@ class CacheEntry:
     key_hash: str  # Hash of the prompt for exact matching or ID
     prompt: str
     response_text: str
-    embedding: Optional[List[float]] = None
+    embedding: Optional[np.ndarray] = None  # float32; lists only at JSON/Redis boundaries
     created_at: float = field(default_factory=time.time)
     access_count: int = 0
     expires_at: Optional[float] = None
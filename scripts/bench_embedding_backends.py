@@ -0,0 +1,75 @@
+#!/usr/bin/env python
+"""
+Benchmark: per-query embedding latency of the PyTorch (sentence-transformers),
+ONNX Runtime fp32 and ONNX Runtime int8 backends on CPU.
+
+Each backend embeds the same distinct prompts one at a time (the API's access
+pattern, memo bypassed by unique texts) after a warm-up. The script prints mean
+and p99 latency and the speedup over PyTorch, plus the min cosine agreement with
+the PyTorch vectors so a speedup is never read without its accuracy cost.
+
+Needs `pip install "sentence-transformers[onnx]"` and the model checkpoints.
+
+Example:
+    python scripts/bench_embedding_backends.py --model all-MiniLM-L6-v2 --quantization avx512_vnni
+    python scripts/bench_embedding_backends.py --model modernbert --queries 100 --quantization avx2
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from levy.embedding_manager import EmbeddingManager
+
+
+def build_arg_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default="all-MiniLM-L6-v2", help="Study-model alias (default: all-MiniLM-L6-v2)")
+    parser.add_argument("--queries", type=int, default=200, help="Queries timed per backend (default: 200)")
+    parser.add_argument("--quantization", default="avx2", help="int8 target for the quantized run: avx512_vnni | avx512 | avx2 | arm64 (default: avx2)")
+    return parser
+
+
+def _time_backend(manager: EmbeddingManager, prompts):
+    manager.embed("warm-up query")
+    timings = np.empty(len(prompts))
+    vectors = []
+    for i, prompt in enumerate(prompts):
+        start = time.perf_counter()
+        vectors.append(manager.embed(prompt))
+        timings[i] = (time.perf_counter() - start) * 1000
+    return timings, np.vstack(vectors)
+
+
+def main(argv=None) -> int:
+    args = build_arg_parser().parse_args(argv)
+    prompts = [f"Benchmark question {i}: how does semantic caching reduce LLM cost?" for i in range(args.queries)]
+    backends = [
+        ("pytorch", dict(provider="sentence-transformers")),
+        ("onnx-fp32", dict(provider="onnx")),
+        (f"onnx-int8-{args.quantization}", dict(provider="onnx", onnx_quantization=args.quantization)),
+    ]
+
+    print(f"{'backend':>22}  {'mean ms':>8}  {'p99 ms':>8}  {'speedup':>8}  {'min cos':>8}")
+    baseline_ms = baseline_vectors = None
+    for name, options in backends:
+        timings, vectors = _time_backend(EmbeddingManager(args.model, **options), prompts)
+        if baseline_vectors is None:
+            baseline_ms, baseline_vectors = timings.mean(), vectors
+        cosine = np.sum(vectors * baseline_vectors, axis=1) / (
+            np.linalg.norm(vectors, axis=1) * np.linalg.norm(baseline_vectors, axis=1)
+        )
+        print(
+            f"{name:>22}  {timings.mean():>8.2f}  {np.percentile(timings, 99):>8.2f}  "
+            f"{baseline_ms / timings.mean():>7.1f}x  {cosine.min():>8.4f}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,70 @@
+#!/usr/bin/env python
+"""
+Benchmark: embedding throughput under concurrent single-prompt traffic, with
+and without EmbeddingManager micro-batching.
+
+`--concurrency` threads each embed distinct prompts one at a time (as API
+request handlers do). Without batching every miss is its own encode call; with
+`--batch` settings, concurrent misses share one encode per window. Prints
+embeddings/second and the mean batch size for each mode.
+
+Use the real encoder to see the batching win (`pip install sentence-transformers`);
+the mock provider only measures scheduling overhead.
+
+Example:
+    python scripts/bench_embedding_batcher.py --provider sentence-transformers --model all-MiniLM-L6-v2
+    python scripts/bench_embedding_batcher.py --provider mock --prompts 5000 --concurrency 64
+"""
+
+import argparse
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from levy.embedding_manager import EmbeddingManager
+
+
+def build_arg_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--provider", default="mock", help="Embedding provider: mock | sentence-transformers (default: mock)")
+    parser.add_argument("--model", default="all-MiniLM-L6-v2", help="Study-model alias (default: all-MiniLM-L6-v2)")
+    parser.add_argument("--prompts", type=int, default=1000, help="Distinct prompts embedded per mode (default: 1000)")
+    parser.add_argument("--concurrency", type=int, default=32, help="Concurrent caller threads (default: 32)")
+    parser.add_argument("--batch-size", type=int, default=32, help="Micro-batch max size (default: 32)")
+    parser.add_argument("--wait-ms", type=float, default=2.0, help="Micro-batch window in ms (default: 2.0)")
+    return parser
+
+
+def _run(manager: EmbeddingManager, prompts, concurrency: int) -> float:
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(manager.embed, prompts))
+    return len(prompts) / (time.perf_counter() - start)
+
+
+def main(argv=None) -> int:
+    args = build_arg_parser().parse_args(argv)
+    modes = {
+        "unbatched": dict(micro_batching=False),
+        "micro-batched": dict(
+            micro_batching=True, batch_max_size=args.batch_size, batch_max_wait_ms=args.wait_ms
+        ),
+    }
+    print(f"{'mode':>14}  {'embeds/s':>10}  {'mean batch':>10}")
+    for mode, options in modes.items():
+        manager = EmbeddingManager(args.model, provider=args.provider, **options)
+        manager.embed("warm-up")  # load the model outside the timed region
+        prompts = [f"{mode} benchmark prompt number {i}" for i in range(args.prompts)]
+        rate = _run(manager, prompts, args.concurrency)
+        stats = manager.batcher_stats()
+        mean_batch = sum(s["mean_batch_size"] for s in stats.values()) / len(stats) if stats else 1.0
+        print(f"{mode:>14}  {rate:>10.1f}  {mean_batch:>10.1f}")
+        manager.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
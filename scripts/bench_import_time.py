@@ -0,0 +1,86 @@
+#!/usr/bin/env python
+"""
+Import-time regression benchmark for `levy` entry points, via `python -X importtime`.
+
+Each target module is imported in a fresh interpreter `--repeat` times. The
+script prints the median cumulative import time, the heaviest modules pulled in,
+and whether any of the `--forbid` modules (provider SDKs, Faiss,
+sentence-transformers by default) were imported. The exit status is 1 if a
+forbidden module shows up or a median exceeds `--budget-ms`, so the script can
+gate CI.
+
+Examples:
+    python scripts/bench_import_time.py
+    python scripts/bench_import_time.py --modules levy,levy.engine --budget-ms 400 --top 15
+"""
+
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+DEFAULT_MODULES = "levy,levy.engine,levy.dataset.io,levy.experiment.runner"
+DEFAULT_FORBID = "anthropic,httpx,redis,faiss,sentence_transformers,torch,fastapi"
+
+_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)$")
+
+
+def build_arg_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--modules", type=str, default=DEFAULT_MODULES, help=f"Comma-separated modules to import (default: {DEFAULT_MODULES})")
+    parser.add_argument("--forbid", type=str, default=DEFAULT_FORBID, help=f"Comma-separated top-level packages that must not be imported (default: {DEFAULT_FORBID})")
+    parser.add_argument("--repeat", type=int, default=5, help="Fresh-interpreter runs per module (default: 5)")
+    parser.add_argument("--top", type=int, default=10, help="Heaviest modules listed per target (default: 10)")
+    parser.add_argument("--budget-ms", type=float, default=None, help="Fail if a module's median cumulative import time exceeds this")
+    return parser
+
+
+def import_profile(module: str) -> Dict[str, Tuple[int, int]]:
+    """Run one `-X importtime` import; returns {module: (self_us, cumulative_us)}."""
+    env = dict(os.environ, PYTHONPATH=str(REPO_ROOT) + os.pathsep + os.environ.get("PYTHONPATH", ""))
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, cwd=REPO_ROOT, env=env, check=True,
+    )
+    profile: Dict[str, Tuple[int, int]] = {}
+    for line in proc.stderr.splitlines():
+        match = _LINE.match(line)
+        if match:
+            profile[match.group(4)] = (int(match.group(1)), int(match.group(2)))
+    return profile
+
+
+def main(argv=None) -> int:
+    args = build_arg_parser().parse_args(argv)
+    modules = [m for m in args.modules.split(",") if m]
+    forbidden = [m for m in args.forbid.split(",") if m]
+    failed = False
+
+    for module in modules:
+        runs: List[Dict[str, Tuple[int, int]]] = [import_profile(module) for _ in range(args.repeat)]
+        median_ms = statistics.median(run[module][1] for run in runs) / 1000
+        print(f"{module}: median cumulative import {median_ms:.1f} ms over {args.repeat} run(s)")
+
+        last = runs[-1]
+        heaviest = sorted(last.items(), key=lambda item: item[1][0], reverse=True)[: args.top]
+        for name, (self_us, _) in heaviest:
+            print(f"    {self_us / 1000:>8.2f} ms self  {name}")
+
+        leaked = sorted({name.split(".")[0] for name in last} & set(forbidden))
+        if leaked:
+            print(f"    FAIL: imports {', '.join(leaked)}")
+            failed = True
+        if args.budget_ms is not None and median_ms > args.budget_ms:
+            print(f"    FAIL: over the {args.budget_ms:.0f} ms budget")
+            failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
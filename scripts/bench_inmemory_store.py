@@ -0,0 +1,114 @@
+#!/usr/bin/env python
+"""
+Microbenchmark: InMemoryStore get / set / delete / evict cost vs. the previous
+implementation, which kept embedding-bearing entries in a Python list and
+rebuilt that list on every delete (including each eviction).
+
+Both stores are filled to `--size` entries with 384-d float32 embeddings.
+The script then times, per operation:
+  - get: hits on random keys
+  - set+evict: inserts of new keys into the full store, each evicting one entry
+  - delete: deletes of random live keys
+The previous store is O(n) per delete and eviction, so it is only timed for
+`--old-ops` operations. Fully offline -- numpy only.
+
+Example:
+    python scripts/bench_inmemory_store.py
+    python scripts/bench_inmemory_store.py --size 100000 --ops 20000 --old-ops 200
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from levy.cache.store import InMemoryStore
+from levy.models import CacheEntry
+
+
+class _ListIndexedStore:
+    """The pre-change InMemoryStore: FIFO dict plus a list of embedded entries."""
+
+    def __init__(self, max_size: int = 1000):
+        self.max_size = max_size
+        self.entries: Dict[str, CacheEntry] = {}
+        self.vector_index: List[CacheEntry] = []
+
+    def get(self, key: str):
+        return self.entries.get(key)
+
+    def set(self, key: str, entry: CacheEntry):
+        if len(self.entries) >= self.max_size:
+            self.delete(next(iter(self.entries)))
+        self.entries[key] = entry
+        if entry.embedding is not None:
+            self.vector_index.append(entry)
+
+    def delete(self, key: str):
+        if key in self.entries:
+            entry = self.entries.pop(key)
+            self.vector_index = [e for e in self.vector_index if e is not entry]
+
+
+def build_arg_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=100_000, help="Entries in the full store (default: 100000)")
+    parser.add_argument("--dim", type=int, default=384, help="Embedding dimension (default: 384)")
+    parser.add_argument("--ops", type=int, default=20_000, help="Timed operations per kind for the new store (default: 20000)")
+    parser.add_argument("--old-ops", type=int, default=200, help="Timed operations per kind for the old store (default: 200)")
+    parser.add_argument("--seed", type=int, default=0, help="RNG seed (default: 0)")
+    return parser
+
+
+def _entry(key: str, embedding: np.ndarray) -> CacheEntry:
+    return CacheEntry(key_hash=key, prompt=key, response_text="response", embedding=embedding)
+
+
+def _fill(store, n: int, embeddings: np.ndarray) -> None:
+    for i in range(n):
+        store.set(f"k{i}", _entry(f"k{i}", embeddings[i % len(embeddings)]))
+
+
+def _per_op_us(fn, args) -> float:
+    start = time.perf_counter()
+    for arg in args:
+        fn(arg)
+    return (time.perf_counter() - start) / max(len(args), 1) * 1e6
+
+
+def measure(store, size: int, ops: int, embeddings: np.ndarray, rng: np.random.Generator) -> Dict[str, float]:
+    _fill(store, size, embeddings)
+    hits = [f"k{i}" for i in rng.integers(0, size, ops)]
+    new = [(f"new{i}", _entry(f"new{i}", embeddings[i % len(embeddings)])) for i in range(ops)]
+    results = {
+        "get": _per_op_us(store.get, hits),
+        "set+evict": _per_op_us(lambda item: store.set(*item), new),
+    }
+    live = list(store.entries)
+    doomed = [live[i] for i in rng.choice(len(live), size=min(ops, len(live)), replace=False)]
+    results["delete"] = _per_op_us(store.delete, doomed)
+    return results
+
+
+def main(argv=None) -> int:
+    args = build_arg_parser().parse_args(argv)
+    rng = np.random.default_rng(args.seed)
+    embeddings = rng.standard_normal((1024, args.dim)).astype(np.float32)
+
+    old = measure(_ListIndexedStore(max_size=args.size), args.size, args.old_ops, embeddings, rng)
+    new = measure(InMemoryStore(max_size=args.size), args.size, args.ops, embeddings, rng)
+
+    print(f"n={args.size}, dim={args.dim}")
+    print(f"{'op':>10}  {'old us/op':>11}  {'new us/op':>11}  {'speedup':>8}")
+    for op in ("get", "set+evict", "delete"):
+        print(f"{op:>10}  {old[op]:>11.2f}  {new[op]:>11.2f}  {old[op] / new[op]:>7.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,101 @@
+#!/usr/bin/env python
+"""
+Microbenchmark: BruteForceVectorIndex search latency vs. the previous
+list-of-vectors implementation that ran `np.stack` on every query.
+
+Both indexes are filled with the same random unit vectors (384-d, the
+all-MiniLM-L6-v2 dimension) and queried with the same k=1 queries; the
+script prints mean and p99 per-query latency for each size and the speedup.
+Fully offline -- numpy only.
+
+Example:
+    python scripts/bench_vector_index.py
+    python scripts/bench_vector_index.py --sizes 1000,10000 --dim 768 --queries 200
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+from typing import List, Tuple
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from levy.cache.vector_index import BruteForceVectorIndex
+
+
+class _StackingBruteForceIndex:
+    """The pre-change BruteForceVectorIndex: one np.stack copy per search."""
+
+    def __init__(self) -> None:
+        self._vectors: List[np.ndarray] = []
+        self._ids: List[int] = []
+
+    def add(self, vector, entry_id: int) -> None:
+        self._vectors.append(np.array(vector, dtype=np.float32))
+        self._ids.append(entry_id)
+
+    def search(self, vector, k: int = 1) -> Tuple[List[int], List[float]]:
+        q = np.array(vector, dtype=np.float32)
+        mat = np.stack(self._vectors)
+        l2_dists = np.sqrt(np.sum((mat - q) ** 2, axis=1))
+        top_idx = np.argsort(l2_dists)[: min(k, len(self._ids))]
+        return [self._ids[i] for i in top_idx], [float(l2_dists[i]) for i in top_idx]
+
+
+def build_arg_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=str, default="1000,10000,100000", help="Comma-separated index sizes (default: 1000,10000,100000)")
+    parser.add_argument("--dim", type=int, default=384, help="Vector dimension (default: 384)")
+    parser.add_argument("--queries", type=int, default=100, help="Queries timed per size (default: 100)")
+    parser.add_argument("--seed", type=int, default=0, help="RNG seed (default: 0)")
+    return parser
+
+
+def _unit_rows(rng: np.random.Generator, n: int, dim: int) -> np.ndarray:
+    mat = rng.standard_normal((n, dim)).astype(np.float32)
+    return mat / np.linalg.norm(mat, axis=1, keepdims=True)
+
+
+def _time_queries(index, queries: np.ndarray) -> np.ndarray:
+    timings = np.empty(len(queries))
+    for i, q in enumerate(queries):
+        start = time.perf_counter()
+        index.search(q, k=1)
+        timings[i] = (time.perf_counter() - start) * 1000
+    return timings
+
+
+def main(argv=None) -> int:
+    args = build_arg_parser().parse_args(argv)
+    rng = np.random.default_rng(args.seed)
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+
+    print(f"{'n':>8}  {'old mean ms':>12}  {'old p99 ms':>11}  {'new mean ms':>12}  {'new p99 ms':>11}  {'speedup':>8}")
+    for n in sizes:
+        vectors = _unit_rows(rng, n, args.dim)
+        queries = _unit_rows(rng, args.queries, args.dim)
+
+        old, new = _StackingBruteForceIndex(), BruteForceVectorIndex()
+        for i, v in enumerate(vectors):
+            old.add(v, i)
+            new.add(v, i)
+
+        for q in queries[:5]:
+            if old.search(q)[0] != new.search(q)[0]:
+                print(f"n={n}: implementations disagree on nearest id", file=sys.stderr)
+                return 1
+
+        old_ms = _time_queries(old, queries)
+        new_ms = _time_queries(new, queries)
+        print(
+            f"{n:>8}  {old_ms.mean():>12.3f}  {np.percentile(old_ms, 99):>11.3f}  "
+            f"{new_ms.mean():>12.3f}  {np.percentile(new_ms, 99):>11.3f}  {old_ms.mean() / new_ms.mean():>7.1f}x"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
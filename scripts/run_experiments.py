@@ -22,6 +22,10 @@ Examples:
     # Real study run once the real dataset + sentence-transformers models are available:
     python scripts/run_experiments.py --dataset data/ground_truth.csv \\
         --embedding-provider sentence-transformers --out-dir results/run-001
+
+    # Persist embeddings so later runs over the same dataset skip every forward pass:
+    python scripts/run_experiments.py --embedding-provider sentence-transformers \
+        --embedding-store results/embeddings.sqlite --out-dir results/run-002
 """
 
 import argparse
@@ -45,7 +49,8 @@ def build_arg_parser() -> argparse.ArgumentParser:
     parser.add_argument("--models", type=str, default=None, help="Comma-separated model subset (default: full frozen grid, e.g. all-MiniLM-L6-v2,modernbert)")
     parser.add_argument("--workloads", type=str, default=None, help="Comma-separated workload subset (default: faq,code,chat)")
     parser.add_argument("--thresholds", type=str, default=None, help="Comma-separated threshold subset (default: 0.70,0.75,0.80,0.85,0.90)")
-    parser.add_argument("--embedding-provider", type=str, default="mock", choices=["mock", "sentence-transformers", "ollama"], help="Embedding provider for the sweep (default: mock, fully offline)")
+    parser.add_argument("--embedding-provider", type=str, default="mock", choices=["mock", "sentence-transformers", "onnx", "ollama"], help="Embedding provider for the sweep (default: mock, fully offline)")
+    parser.add_argument("--embedding-store", type=str, default=None, help="SQLite file caching embeddings across runs (default: none; ignored for mock)")
     return parser
 
 
@@ -82,7 +87,12 @@ def main(argv=None) -> int:
 
     start = time.perf_counter()
     try:
-        results, model_identities = run_sweep(pairs, configs=configs, embedding_provider=args.embedding_provider)
+        results, model_identities = run_sweep(
+            pairs,
+            configs=configs,
+            embedding_provider=args.embedding_provider,
+            embedding_store_path=args.embedding_store,
+        )
     except ExperimentSanityError as exc:
         print(f"[run_experiments] sanity check failed: {exc}", file=sys.stderr)
         return 1
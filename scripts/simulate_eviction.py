@@ -0,0 +1,112 @@
+#!/usr/bin/env python
+"""
+Trace-driven simulator: replay a prompt log against each InMemoryStore eviction
+policy and compare exact-cache hit rates at the same `cache_max_size`.
+
+Each prompt is keyed exactly as the engine keys it (`ExactCache.key_for`).
+A lookup miss stores the prompt, just as an LLM call would, so a trace replays
+the real get/set sequence. Every extra hit is one LLM call saved.
+
+The trace is either:
+  - a text file with one prompt per line
+  - a JSONL file whose records carry a "prompt" field
+Without `--trace`, a synthetic workload is generated: Zipf-distributed
+repeats over `--unique` prompts, mixed with `--one-off-fraction` never-repeated
+prompts (the pattern that flushes hot FAQ answers out of an LRU).
+
+Examples:
+    python scripts/simulate_eviction.py
+    python scripts/simulate_eviction.py --trace logs/prompts.jsonl --sizes 1000,5000
+    python scripts/simulate_eviction.py --requests 200000 --unique 20000 --zipf-s 0.9
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+from typing import List
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from levy.cache.eviction import EVICTION_POLICIES
+from levy.cache.exact_cache import ExactCache
+from levy.cache.store import InMemoryStore
+from levy.models import LLMRequest
+
+
+def build_arg_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--trace", type=str, default=None, help="Prompt log (.txt: one per line; .jsonl: {\"prompt\": ...})")
+    parser.add_argument("--sizes", type=str, default="100,1000", help="Comma-separated cache_max_size values (default: 100,1000)")
+    parser.add_argument("--policies", type=str, default=",".join(EVICTION_POLICIES), help=f"Comma-separated policies (default: {','.join(EVICTION_POLICIES)})")
+    parser.add_argument("--requests", type=int, default=50_000, help="Synthetic trace length (default: 50000)")
+    parser.add_argument("--unique", type=int, default=5_000, help="Distinct repeating prompts in the synthetic trace (default: 5000)")
+    parser.add_argument("--zipf-s", type=float, default=1.0, help="Zipf exponent of the repeating prompts (default: 1.0)")
+    parser.add_argument("--one-off-fraction", type=float, default=0.3, help="Share of never-repeated prompts (default: 0.3)")
+    parser.add_argument("--seed", type=int, default=0, help="RNG seed for the synthetic trace (default: 0)")
+    return parser
+
+
+def load_trace(path: str) -> List[str]:
+    prompts = []
+    with open(path, encoding="utf-8") as fh:
+        for line in fh:
+            line = line.rstrip("\n")
+            if not line.strip():
+                continue
+            prompts.append(json.loads(line)["prompt"] if path.endswith(".jsonl") else line)
+    return prompts
+
+
+def synthetic_trace(requests: int, unique: int, zipf_s: float, one_off_fraction: float, seed: int) -> List[str]:
+    rng = np.random.default_rng(seed)
+    weights = 1.0 / np.arange(1, unique + 1) ** zipf_s
+    ranks = rng.choice(unique, size=requests, p=weights / weights.sum())
+    one_off = rng.random(requests) < one_off_fraction
+    return [f"one-off prompt {i}" if one_off[i] else f"faq prompt {ranks[i]}" for i in range(requests)]
+
+
+def replay(prompts: List[str], max_size: int, policy: str) -> dict:
+    store = InMemoryStore(max_size=max_size, policy=policy)
+    cache = ExactCache(store)
+    for prompt in prompts:
+        request = LLMRequest(prompt=prompt)
+        if cache.get(request) is None:
+            cache.set(request, "response")
+    return store.stats()
+
+
+def main(argv=None) -> int:
+    args = build_arg_parser().parse_args(argv)
+    if args.trace:
+        prompts = load_trace(args.trace)
+        source = args.trace
+    else:
+        prompts = synthetic_trace(args.requests, args.unique, args.zipf_s, args.one_off_fraction, args.seed)
+        source = f"synthetic zipf(s={args.zipf_s}) over {args.unique} prompts, {args.one_off_fraction:.0%} one-offs"
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+    policies = [p for p in args.policies.split(",") if p]
+
+    print(f"trace: {source} ({len(prompts)} requests, {len(set(prompts))} distinct)")
+    print(f"{'size':>8}  {'policy':>10}  {'hit rate':>9}  {'vs lru':>8}  {'evictions':>10}  {'rejected':>9}  {'replay s':>9}")
+    for size in sizes:
+        baseline = None
+        for policy in policies:
+            start = time.perf_counter()
+            stats = replay(prompts, size, policy)
+            elapsed = time.perf_counter() - start
+            if policy == "lru":
+                baseline = stats["hit_rate"]
+            delta = f"{(stats['hit_rate'] - baseline) * 100:+.2f}pp" if baseline is not None else "-"
+            print(
+                f"{size:>8}  {policy:>10}  {stats['hit_rate']:>9.2%}  {delta:>8}  "
+                f"{stats['evictions']:>10}  {stats['rejections']:>9}  {elapsed:>9.2f}"
+            )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
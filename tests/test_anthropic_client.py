@@ -8,6 +8,7 @@ inside the coverage denominator -- see CLAUDE.md's LEV-6 design decision on
 offline testability via injectable transport (no `# pragma: no cover`).
 """
 
+import asyncio
 import unittest
 
 import anthropic
@@ -239,5 +240,38 @@ class TestEngineEndToEnd(unittest.TestCase):
         self.assertEqual(result.answer, "engine says hi")
 
 
+class TestAsyncGeneration(unittest.TestCase):
+
+    def test_agenerate_uses_async_sdk_with_injected_async_transport(self):
+        seen = []
+
+        async def handler(request: httpx.Request) -> httpx.Response:
+            seen.append(request.url.path)
+            return httpx.Response(200, json=_message_response(text="async hi", input_tokens=3, output_tokens=2))
+
+        async_http = anthropic.DefaultAsyncHttpxClient(transport=httpx.MockTransport(handler))
+        client = AnthropicLLMClient(api_key="sk-test", async_http_client=async_http, max_retries=0)
+        response = asyncio.run(client.agenerate(LLMRequest(prompt="hello")))
+
+        self.assertEqual(response.text, "async hi")
+        self.assertEqual(response.token_usage, 5)
+        self.assertEqual(seen, ["/v1/messages"])
+        self.assertEqual(client.request_count, 1)
+
+    def test_agenerate_honours_injected_sync_transport(self):
+        client = _make_client(lambda request: httpx.Response(200, json=_message_response(text="via thread")), max_retries=0)
+        response = asyncio.run(client.agenerate(LLMRequest(prompt="hello")))
+        self.assertEqual(response.text, "via thread")
+
+    def test_agenerate_budget_cap_halts_before_sending(self):
+        async def handler(request):  # pragma: no cover -- must never be reached
+            raise AssertionError("request sent despite exhausted budget")
+
+        async_http = anthropic.DefaultAsyncHttpxClient(transport=httpx.MockTransport(handler))
+        client = AnthropicLLMClient(api_key="sk-test", async_http_client=async_http, budget_cap_usd=0.0)
+        with self.assertRaises(BudgetExceededError):
+            asyncio.run(client.agenerate(LLMRequest(prompt="hello")))
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -6,6 +6,8 @@ No network access, no real Anthropic/OpenAI/Ollama calls.
 """
 
 import json
+import os
+import tempfile
 import unittest
 
 import anthropic
@@ -156,6 +158,8 @@ class TestAdmin(unittest.TestCase):
         self.assertAlmostEqual(stats["hit_rate"], 0.5)
         self.assertGreaterEqual(stats["index_size"], 1)
         self.assertIn("mock", stats["model_breakdown"])
+        self.assertGreater(stats["cache_bytes"], 0)
+        self.assertGreaterEqual(stats["peak_cache_bytes"], stats["cache_bytes"])
 
     def test_clear_empties_caches_and_resets_counters(self):
         client = _client()
@@ -174,6 +178,114 @@ class TestAdmin(unittest.TestCase):
         self.assertEqual(r.headers["x-cache-status"], "MISS")
 
 
+class TestSharedCacheAcrossThresholds(unittest.TestCase):
+
+    def _config(self, **overrides):
+        return _mock_config(share_cache_across_thresholds=True, vector_index_backend="brute_force", **overrides)
+
+    def test_thresholds_share_one_store_and_index_per_model(self):
+        from levy.api.pool import EnginePool
+
+        pool = EnginePool(self._config())
+        low, high = pool.get(threshold=0.1), pool.get(threshold=0.9)
+        self.assertIsNot(low, high)
+        self.assertIs(low.store, high.store)
+        self.assertIs(low.semantic_cache, high.semantic_cache)
+
+        self.assertEqual(low.generate("same prompt").source, "llm")
+        self.assertEqual(high.generate("same prompt").source, "exact_cache")  # no second LLM call
+
+    def test_threshold_is_applied_per_engine_at_lookup(self):
+        from levy.api.pool import EnginePool
+
+        pool = EnginePool(self._config(enable_exact_cache=False))
+        low, high = pool.get(threshold=0.0), pool.get(threshold=0.99)
+        low.generate("stored prompt")
+        # Unrelated mock embeddings sit far apart: only the permissive engine accepts.
+        self.assertEqual(low.generate("a different prompt").source, "semantic_cache")
+        self.assertEqual(high.generate("yet another prompt").source, "llm")
+
+    def test_stats_and_clear_count_shared_caches_once(self):
+        client = _client(config=self._config())
+        for threshold in (0.5, 0.6, 0.7):
+            client.post("/v1/chat/completions", json=_chat_body("p", {"threshold": threshold}))
+        stats = client.get("/admin/cache/stats").json()
+        self.assertEqual(stats["index_size"], 1)
+        self.assertEqual(stats["exact_hits"], 2)
+        self.assertEqual(sum(stats["model_breakdown"].values()), 1)
+
+        client.post("/admin/cache/clear")
+        self.assertEqual(client.get("/admin/cache/stats").json()["index_size"], 0)
+
+    def test_sharing_is_off_by_default(self):
+        from levy.api.pool import EnginePool
+
+        pool = EnginePool(_mock_config())
+        self.assertIsNot(pool.get(threshold=0.1).store, pool.get(threshold=0.9).store)
+
+
+class TestSnapshots(unittest.TestCase):
+
+    def _config(self, snapshot_dir, **overrides):
+        return _mock_config(
+            enable_exact_cache=False,
+            vector_index_backend="brute_force",
+            semantic_snapshot_dir=snapshot_dir,
+            **overrides,
+        )
+
+    def test_pool_save_then_restore_warm_starts_each_key(self):
+        from levy.api.pool import EnginePool
+
+        with tempfile.TemporaryDirectory() as tmp:
+            pool = EnginePool(self._config(tmp))
+            pool.get(threshold=0.5).generate("alpha")
+            pool.get(threshold=0.7).generate("beta")
+            saved = pool.save_snapshots()
+            self.assertEqual(len(saved), 2)
+
+            fresh = EnginePool(self._config(tmp))
+            restored = fresh.restore_snapshots()
+            self.assertEqual(sorted(restored.values()), [1, 1])
+            self.assertEqual(fresh.get(threshold=0.5).generate("alpha").source, "semantic_cache")
+            self.assertEqual(fresh.get(threshold=0.7).generate("beta").source, "semantic_cache")
+
+    def test_restore_skips_snapshot_with_different_model_identity(self):
+        from levy.api.pool import POOL_KEY_FILE, EnginePool
+
+        with tempfile.TemporaryDirectory() as tmp:
+            pool = EnginePool(self._config(tmp))
+            pool.get().generate("alpha")
+            pool.save_snapshots()
+            (name,) = os.listdir(tmp)
+            key_file = os.path.join(tmp, name, POOL_KEY_FILE)
+            with open(key_file) as fh:
+                meta = json.load(fh)
+            meta["model_identity"]["checkpoint"] = "some/other-model"
+            with open(key_file, "w") as fh:
+                json.dump(meta, fh)
+
+            fresh = EnginePool(self._config(tmp))
+            self.assertEqual(fresh.restore_snapshots(), {})
+            self.assertEqual(fresh.get().semantic_cache.size(), 0)
+
+    def test_app_lifespan_saves_on_shutdown_and_restores_on_startup(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            with TestClient(create_app(config=self._config(tmp))) as client:
+                client.post("/v1/chat/completions", json=_chat_body("warm me"))
+            with TestClient(create_app(config=self._config(tmp))) as client:
+                r = client.post("/v1/chat/completions", json=_chat_body("warm me"))
+            self.assertEqual(r.headers["x-cache-status"], "HIT")
+
+    def test_snapshots_disabled_by_default(self):
+        from levy.api.pool import EnginePool
+
+        pool = EnginePool(_mock_config())
+        pool.get().generate("x")
+        self.assertEqual(pool.save_snapshots(), {})
+        self.assertEqual(pool.restore_snapshots(), {})
+
+
 class TestErrors(unittest.TestCase):
 
     def test_missing_messages_returns_422_with_field_detail(self):
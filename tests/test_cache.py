@@ -1,17 +1,24 @@
 """
-Tests for levy.cache.base, exact_cache, store, and redis_store.
+Tests for levy.cache.base, exact_cache, keys, store, codec, redis_store and tiered_store.
 
 All offline: RedisStore is exercised against a small in-memory fake client
-(no real Redis server), matching the duck-typed interface it implements.
+(no real Redis server), matching the duck-typed interface it implements. Two
+TieredStores over one fake client stand in for two workers sharing a Redis.
 """
 
 import time
 import unittest
 
+import numpy as np
+
+from levy.cache import codec
 from levy.cache.base import CacheInterface
 from levy.cache.exact_cache import ExactCache
+from levy.cache.keys import KeySchema, canonicalize_prompt
 from levy.cache.redis_store import RedisStore
+from levy.cache.semantic_cache import SemanticCache
 from levy.cache.store import InMemoryStore
+from levy.cache.tiered_store import TieredStore
 from levy.models import CacheEntry, LLMRequest
 
 
@@ -53,7 +60,7 @@ class TestExactCache(unittest.TestCase):
         request = LLMRequest(prompt="hello")
         cache.set(request, "world")
 
-        key = cache._get_key("hello")
+        key = cache.key_for(request)
         store.entries[key].expires_at = time.time() - 1  # force expiry
 
         self.assertIsNone(cache.get(request))
@@ -64,6 +71,55 @@ class TestExactCache(unittest.TestCase):
         cache = ExactCache(InMemoryStore())
         self.assertIsNone(cache.clear())
 
+    def test_whitespace_and_unicode_variants_hit_the_same_entry(self):
+        cache = ExactCache(InMemoryStore())
+        cache.set(LLMRequest(prompt="What is  Levy?\n"), "a cache")
+        self.assertEqual(cache.get(LLMRequest(prompt=" What is Levy?")).response_text, "a cache")
+        self.assertEqual(cache.get(LLMRequest(prompt="Ｗhat is Levy?")).response_text, "a cache")  # full-width W
+        self.assertIsNone(cache.get(LLMRequest(prompt="what is levy?")))  # case folding is opt-in
+
+    def test_generation_parameters_are_part_of_the_key(self):
+        cache = ExactCache(InMemoryStore())
+        cache.set(LLMRequest(prompt="hi", temperature=0.0), "deterministic")
+        self.assertIsNone(cache.get(LLMRequest(prompt="hi", temperature=0.9)))
+        self.assertIsNone(cache.get(LLMRequest(prompt="hi", temperature=0.0, max_tokens=16)))
+        self.assertIsNone(cache.get(LLMRequest(prompt="hi", temperature=0.0, extra_params={"top_p": 0.5})))
+        self.assertIsNotNone(cache.get(LLMRequest(prompt="hi", temperature=0)))
+
+
+class TestKeySchema(unittest.TestCase):
+
+    def test_canonicalize_prompt_steps_are_switchable(self):
+        prompt = "  Ｈello\t\tWORLD?! "
+        self.assertEqual(canonicalize_prompt(prompt), "Hello WORLD?!")
+        self.assertEqual(
+            canonicalize_prompt(prompt, casefold=True, strip_trailing_punctuation=True), "hello world"
+        )
+        self.assertEqual(
+            canonicalize_prompt(prompt, normalize_unicode=False, collapse_whitespace=False), prompt
+        )
+
+    def test_param_order_does_not_matter_and_model_namespaces_keys(self):
+        schema = KeySchema(model="openai:gpt")
+        a = LLMRequest(prompt="p", extra_params={"top_p": 0.5, "stop": ["\n"]})
+        b = LLMRequest(prompt="p", extra_params={"stop": ["\n"], "top_p": 0.5})
+        self.assertEqual(schema.key_for(a), schema.key_for(b))
+        self.assertNotEqual(schema.key_for(a), KeySchema(model="ollama:qwen3").key_for(a))
+
+    def test_extra_params_override_request_fields(self):
+        schema = KeySchema()
+        self.assertEqual(
+            schema.key_for(LLMRequest(prompt="p", extra_params={"max_tokens": 64})),
+            schema.key_for(LLMRequest(prompt="p", max_tokens=64)),
+        )
+
+    def test_include_params_off_keys_on_prompt_only(self):
+        schema = KeySchema(include_params=False)
+        self.assertEqual(
+            schema.key_for(LLMRequest(prompt="p", temperature=0.0)),
+            schema.key_for(LLMRequest(prompt="p", temperature=1.0)),
+        )
+
 
 # ---------------------------------------------------------------------------
 # InMemoryStore
@@ -71,7 +127,7 @@ class TestExactCache(unittest.TestCase):
 
 class TestInMemoryStore(unittest.TestCase):
 
-    def test_fifo_eviction_when_max_size_reached(self):
+    def test_oldest_evicted_when_max_size_reached(self):
         store = InMemoryStore(max_size=1)
         store.set("a", CacheEntry(key_hash="a", prompt="a", response_text="A"))
         store.set("b", CacheEntry(key_hash="b", prompt="b", response_text="B"))
@@ -96,6 +152,55 @@ class TestInMemoryStore(unittest.TestCase):
         self.assertEqual(store.entries, {})
         self.assertEqual(store.get_all_with_embeddings(), [])
 
+    def test_get_refreshes_recency_so_eviction_is_lru(self):
+        store = InMemoryStore(max_size=2)
+        store.set("a", CacheEntry(key_hash="a", prompt="a", response_text="A"))
+        store.set("b", CacheEntry(key_hash="b", prompt="b", response_text="B"))
+        store.get("a")
+        store.set("c", CacheEntry(key_hash="c", prompt="c", response_text="C"))
+        self.assertEqual(sorted(store.entries), ["a", "c"])
+
+    def test_overwrite_at_capacity_does_not_evict_and_tracks_embedding(self):
+        store = InMemoryStore(max_size=2)
+        store.set("a", CacheEntry(key_hash="a", prompt="a", response_text="A", embedding=[0.1]))
+        store.set("b", CacheEntry(key_hash="b", prompt="b", response_text="B"))
+        store.set("a", CacheEntry(key_hash="a", prompt="a", response_text="A2"))
+        self.assertEqual(sorted(store.entries), ["a", "b"])
+        self.assertEqual(store.get_all_with_embeddings(), [])
+
+    def test_eviction_drops_evicted_embedding(self):
+        store = InMemoryStore(max_size=1)
+        store.set("a", CacheEntry(key_hash="a", prompt="a", response_text="A", embedding=[0.1]))
+        store.set("b", CacheEntry(key_hash="b", prompt="b", response_text="B", embedding=[0.2]))
+        self.assertEqual([e.prompt for e in store.get_all_with_embeddings()], ["b"])
+
+    def test_max_bytes_evicts_until_the_new_entry_fits(self):
+        big = "x" * 4000
+        store = InMemoryStore(max_size=100, max_bytes=10_000)
+        for key in "abc":
+            store.set(key, CacheEntry(key_hash=key, prompt=key, response_text=big))
+        self.assertEqual(sorted(store.entries), ["b", "c"])  # two ~4.5 KB entries fit, three don't
+        self.assertLessEqual(store.nbytes, 10_000)
+        self.assertEqual(store.stats()["evictions"], 1)
+        store.set("d", CacheEntry(key_hash="d", prompt="d", response_text="tiny"))
+        self.assertEqual(len(store.entries), 3)
+
+    def test_byte_accounting_tracks_overwrite_delete_and_peak(self):
+        store = InMemoryStore()
+        store.set("a", CacheEntry(key_hash="a", prompt="a", response_text="x" * 1000, embedding=np.zeros(384, dtype=np.float32)))
+        first = store.nbytes
+        self.assertGreater(first, 1000 + 384 * 4)
+        store.set("a", CacheEntry(key_hash="a", prompt="a", response_text="short"))
+        self.assertLess(store.nbytes, first)
+        store.delete("a")
+        self.assertEqual((store.nbytes, store.peak_nbytes), (0, first))
+
+    def test_entry_larger_than_budget_is_not_stored(self):
+        store = InMemoryStore(max_bytes=1000)
+        store.set("a", CacheEntry(key_hash="a", prompt="a", response_text="small"))
+        store.set("a", CacheEntry(key_hash="a", prompt="a", response_text="x" * 5000))
+        self.assertEqual((store.entries, store.nbytes), ({}, 0))
+
     def test_delete_missing_key_is_a_no_op(self):
         store = InMemoryStore()
         store.delete("does-not-exist")  # must not raise
@@ -107,10 +212,13 @@ class TestInMemoryStore(unittest.TestCase):
 # ---------------------------------------------------------------------------
 
 class _FakeRedisClient:
-    """Implements just enough of the redis-py surface for RedisStore."""
+    """Implements just enough of the redis-py surface for RedisStore (no KEYS on purpose)."""
 
     def __init__(self):
         self._data = {}
+        self._sets = {}
+        self._subscribers = []
+        self.round_trips = 0
 
     def get(self, key):
         return self._data.get(key)
@@ -121,21 +229,93 @@ class _FakeRedisClient:
     def delete(self, key):
         self._data.pop(key, None)
 
-    def keys(self, pattern="*"):
-        return list(self._data.keys())
-
     def mget(self, keys):
+        self.round_trips += 1
         return [self._data.get(k) for k in keys]
 
+    def sadd(self, name, *values):
+        members = self._sets.setdefault(name, set())
+        added = len(set(values) - members)
+        members.update(values)
+        return added
+
+    def srem(self, name, *values):
+        self._sets.get(name, set()).difference_update(values)
+
+    def smembers(self, name):
+        return set(self._sets.get(name, set()))
+
+    @staticmethod
+    def _page(items, cursor, count):
+        cursor = int(cursor)
+        page = items[cursor:cursor + count]
+        next_cursor = cursor + count if cursor + count < len(items) else 0
+        return next_cursor, page
+
+    def sscan(self, name, cursor=0, count=10):
+        self.round_trips += 1
+        return self._page(sorted(self._sets.get(name, set())), cursor, count)
+
+    def scan(self, cursor=0, count=10):
+        return self._page(sorted(self._data), cursor, count)
+
+    def pipeline(self, transaction=True):
+        return _FakePipeline(self)
+
     def flushdb(self):
         self._data.clear()
+        self._sets.clear()
+
+    def pubsub(self, ignore_subscribe_messages=False):
+        return _FakePubSub(self)
+
+    def publish(self, channel, data):
+        listeners = [handler for name, handler in self._subscribers if name == channel]
+        for handler in listeners:  # delivered synchronously, like an instant network
+            handler({"type": "message", "channel": channel.encode(), "data": data.encode()})
+        return len(listeners)
 
 
-def _redis_store_with_fake_client():
-    store = RedisStore.__new__(RedisStore)  # bypass __init__'s real redis.from_url()
-    store.client = _FakeRedisClient()
-    store.ttl = 3600
-    return store
+class _FakePubSub:
+    def __init__(self, client):
+        self._client = client
+        self._handlers = []
+        self.stopped = False
+
+    def subscribe(self, **handlers):
+        self._handlers = list(handlers.items())
+        self._client._subscribers.extend(self._handlers)
+
+    def run_in_thread(self, sleep_time=0.0, daemon=False):
+        return self
+
+    def stop(self):
+        self.stopped = True
+
+    def close(self):
+        for item in self._handlers:
+            self._client._subscribers.remove(item)
+
+
+class _FakePipeline:
+    def __init__(self, client):
+        self._client = client
+        self._commands = []
+
+    def __getattr__(self, name):
+        def queue(*args, **kwargs):
+            self._commands.append((name, args, kwargs))
+        return queue
+
+    def execute(self):
+        self._client.round_trips += 1
+        for name, args, kwargs in self._commands:
+            getattr(self._client, name)(*args, **kwargs)
+        self._commands = []
+
+
+def _redis_store_with_fake_client(**kwargs):
+    return RedisStore(client=_FakeRedisClient(), **kwargs)  # injected client: no redis-py connection
 
 
 class TestRedisStore(unittest.TestCase):
@@ -148,6 +328,16 @@ class TestRedisStore(unittest.TestCase):
         self.assertEqual(restored.prompt, "hello")
         self.assertEqual(restored.response_text, "world")
 
+    def test_embedding_roundtrips_as_float32_array(self):
+        """Lists exist only in the JSON payload; the restored entry carries an ndarray."""
+        store = _redis_store_with_fake_client()
+        vec = np.array([0.25, -0.5, 1.0], dtype=np.float32)
+        store.set("k1", CacheEntry(key_hash="k1", prompt="p", response_text="r", embedding=vec))
+        restored = store.get("k1")
+        self.assertIsInstance(restored.embedding, np.ndarray)
+        self.assertEqual(restored.embedding.dtype, np.float32)
+        np.testing.assert_array_equal(restored.embedding, vec)
+
     def test_get_missing_key_returns_none(self):
         store = _redis_store_with_fake_client()
         self.assertIsNone(store.get("missing"))
@@ -168,6 +358,7 @@ class TestRedisStore(unittest.TestCase):
         store = _redis_store_with_fake_client()
         entry = CacheEntry(key_hash="k1", prompt="hello", response_text="world", embedding=[0.1, 0.2])
         store.set("k1", entry)
+        store.set("k2", CacheEntry(key_hash="k2", prompt="exact only", response_text="r"))
         entries = store.get_all_with_embeddings()
         self.assertEqual(len(entries), 1)
         self.assertEqual(entries[0].prompt, "hello")
@@ -179,18 +370,63 @@ class TestRedisStore(unittest.TestCase):
     def test_get_all_with_embeddings_skips_malformed_entries(self):
         store = _redis_store_with_fake_client()
         store.client.set("bad", "not valid json {{{")
+        store.client.sadd(store.index_key, "bad")
         self.assertEqual(store.get_all_with_embeddings(), [])
 
-    def test_get_all_with_embeddings_skips_falsy_values(self):
-        """mget can return None for a key that expired between KEYS and MGET."""
+    def test_expired_keys_are_pruned_from_the_index(self):
+        """The value TTL-expired but the index member survived; the scan drops it."""
         store = _redis_store_with_fake_client()
-        entry = CacheEntry(key_hash="k1", prompt="hello", response_text="world")
-        store.set("k1", entry)
-        store.client._data["expired-key"] = None  # simulates a raced-out key
-        store.client.keys = lambda pattern="*": ["k1", "expired-key"]
+        store.set("k1", CacheEntry(key_hash="k1", prompt="hello", response_text="world", embedding=[0.1]))
+        store.client.sadd(store.index_key, "expired-key")
         entries = store.get_all_with_embeddings()
-        self.assertEqual(len(entries), 1)
-        self.assertEqual(entries[0].prompt, "hello")
+        self.assertEqual([e.prompt for e in entries], ["hello"])
+        self.assertEqual(store.client.smembers(store.index_key), {"k1"})
+
+    def test_index_tracks_set_many_overwrite_and_delete(self):
+        store = _redis_store_with_fake_client()
+        vec = np.ones(2, dtype=np.float32)
+        store.set_many({
+            "a": CacheEntry(key_hash="a", prompt="a", response_text="A", embedding=vec),
+            "b": CacheEntry(key_hash="b", prompt="b", response_text="B", embedding=vec),
+        })
+        store.set("b", CacheEntry(key_hash="b", prompt="b", response_text="B"))  # embedding dropped
+        self.assertEqual(store.client.smembers(store.index_key), {"a"})
+        store.delete("a")
+        self.assertEqual(store.client.smembers(store.index_key), set())
+
+    def test_iter_entries_streams_in_bounded_chunks(self):
+        store = _redis_store_with_fake_client()
+        vec = np.ones(4, dtype=np.float32)
+        store.set_many({f"k{i}": CacheEntry(key_hash=f"k{i}", prompt=f"p{i}", response_text="r", embedding=vec) for i in range(25)})
+        store.client.round_trips = 0
+        stream = store.iter_entries_with_embeddings(chunk_size=10)
+        first = next(stream)
+        self.assertEqual(store.client.round_trips, 2)  # one SSCAN + one MGET, not the whole set
+        rest = list(stream)
+        self.assertEqual(len(rest) + 1, 25)
+        self.assertEqual({e.prompt for e in rest} | {first.prompt}, {f"p{i}" for i in range(25)})
+        self.assertEqual(store.client.round_trips, 6)
+
+    def test_iter_entries_dedups_within_a_chunk_without_tracking_every_key(self):
+        store = _redis_store_with_fake_client()
+        vec = np.ones(4, dtype=np.float32)
+        store.set_many({f"k{i}": CacheEntry(key_hash=f"k{i}", prompt=f"p{i}", response_text="r", embedding=vec) for i in range(3)})
+        pages = iter([(1, ["k0", "k1", "k1"]), (0, ["k1", "k2"])])  # SSCAN repeating members
+        store.client.sscan = lambda name, cursor=0, count=10: next(pages)
+        entries = list(store.iter_entries_with_embeddings(chunk_size=3))
+        self.assertEqual([e.prompt for e in entries], ["p0", "p1", "p1", "p2"])
+        semantic = SemanticCache(embedding_client=None, backend="brute_force")
+        self.assertEqual(semantic.bulk_load(entries), 3)
+
+    def test_rebuild_embedding_index_indexes_preexisting_entries(self):
+        store = _redis_store_with_fake_client()
+        legacy = {"old1": [0.5], "old2": None}
+        for key, embedding in legacy.items():
+            store.client.set(key, codec.encode_entry(CacheEntry(key_hash=key, prompt=key, response_text="r", embedding=embedding)))
+        self.assertEqual(store.get_all_with_embeddings(), [])
+        self.assertEqual(store.rebuild_embedding_index(chunk_size=1), 1)
+        self.assertEqual([e.prompt for e in store.get_all_with_embeddings()], ["old1"])
+        self.assertEqual(store.rebuild_embedding_index(), 0)
 
     def test_clear_flushes_db(self):
         store = _redis_store_with_fake_client()
@@ -198,6 +434,140 @@ class TestRedisStore(unittest.TestCase):
         store.clear()
         self.assertIsNone(store.get("k1"))
 
+    def test_binary_is_default_and_legacy_json_still_reads(self):
+        store = _redis_store_with_fake_client()
+        store.set("new", CacheEntry(key_hash="new", prompt="p", response_text="r"))
+        self.assertTrue(store.client._data["new"].startswith(codec.MAGIC))
+        legacy = _redis_store_with_fake_client(serialization="json")
+        legacy.set("old", CacheEntry(key_hash="old", prompt="p", response_text="r", embedding=np.ones(2)))
+        store.client._data["old"] = legacy.client._data["old"]
+        np.testing.assert_array_equal(store.get("old").embedding, [1, 1])
+
+    def test_get_many_and_set_many_batch_round_trips(self):
+        store = _redis_store_with_fake_client()
+        entries = {f"k{i}": CacheEntry(key_hash=f"k{i}", prompt=f"p{i}", response_text="r") for i in range(1200)}
+        store.set_many(entries)
+        self.assertEqual(store.client.round_trips, 3)  # 500 + 500 + 200
+        found = store.get_many(list(entries) + ["missing"])
+        self.assertEqual(len(found), 1200)
+        self.assertEqual(found["k7"].prompt, "p7")
+        self.assertEqual(store.client.round_trips, 6)
+
+    def test_rejects_unknown_serialization(self):
+        with self.assertRaises(ValueError):
+            _redis_store_with_fake_client(serialization="pickle")
+
+
+class TestTieredStore(unittest.TestCase):
+
+    def _workers(self, n=2, **kwargs):
+        shared = _FakeRedisClient()
+        return [TieredStore(RedisStore(client=shared), **kwargs) for _ in range(n)]
+
+    def test_read_through_fills_l1_and_serves_without_redis(self):
+        writer, reader = self._workers()
+        writer.set("k", CacheEntry(key_hash="k", prompt="p", response_text="r"))
+        self.assertEqual(reader.get("k").response_text, "r")  # L2 hit, copied into L1
+        reader.l2.client._data.clear()  # Redis no longer consulted for this key
+        self.assertEqual(reader.get("k").response_text, "r")
+        stats = reader.stats()
+        self.assertEqual((stats["l1_hits"], stats["l2_hits"], stats["misses"]), (1, 1, 0))
+        self.assertIsNone(reader.get("missing"))
+
+    def test_writes_and_deletes_invalidate_other_workers_l1(self):
+        a, b = self._workers()
+        a.set("k", CacheEntry(key_hash="k", prompt="p", response_text="v1"))
+        self.assertEqual(b.get("k").response_text, "v1")
+        a.set("k", CacheEntry(key_hash="k", prompt="p", response_text="v2"))
+        self.assertEqual(b.get("k").response_text, "v2")
+        self.assertEqual((a.invalidations, b.invalidations), (0, 2))  # own messages ignored
+        a.delete("k")
+        self.assertIsNone(b.get("k"))
+        b.set("x", CacheEntry(key_hash="x", prompt="x", response_text="X"))
+        self.assertEqual(a.get("x").response_text, "X")
+        b.clear()
+        self.assertEqual(a.entries, {})
+
+    def test_l1_is_a_bounded_lru_with_ttl(self):
+        (store,) = self._workers(n=1, l1_max_size=2, l1_ttl_seconds=60)
+        for key in "abc":
+            store.set(key, CacheEntry(key_hash=key, prompt=key, response_text=key))
+        self.assertEqual(sorted(store.entries), ["b", "c"])
+        store._l1["b"] = (store._l1["b"][0], 0.0)  # force the L1 copy past its TTL
+        self.assertEqual(store.get("b").response_text, "b")  # re-read from Redis
+        self.assertEqual(store.stats()["l2_hits"], 1)
+
+    def test_get_many_set_many_and_embedding_scan_use_l2(self):
+        a, b = self._workers()
+        vec = np.ones(2, dtype=np.float32)
+        a.set_many({k: CacheEntry(key_hash=k, prompt=k, response_text=k, embedding=vec) for k in ("x", "y")})
+        self.assertEqual(sorted(b.get_many(["x", "y", "z"])), ["x", "y"])
+        self.assertEqual(sorted(e.prompt for e in b.iter_entries_with_embeddings()), ["x", "y"])
+        self.assertEqual(len(b.get_all_with_embeddings()), 2)
+
+    def test_close_unsubscribes(self):
+        a, b = self._workers()
+        b.get("k")
+        b.close()
+        a.set("k", CacheEntry(key_hash="k", prompt="p", response_text="r"))
+        self.assertEqual(b.invalidations, 0)
+        b.close()  # idempotent
+
+
+class TestCacheEntryCodec(unittest.TestCase):
+
+    def _entry(self, **overrides):
+        fields = dict(
+            key_hash="abc",
+            prompt="What is a semantic cache? ünïcode",
+            response_text="A cache keyed by meaning.",
+            embedding=np.linspace(-1, 1, 384, dtype=np.float32),
+            created_at=1700000000.5,
+            access_count=3,
+            expires_at=1700003600.25,
+            metadata={"canonical_name": "all-MiniLM-L6-v2", "dimension": 384},
+        )
+        fields.update(overrides)
+        return CacheEntry(**fields)
+
+    def test_roundtrip_preserves_every_field(self):
+        entry = self._entry()
+        restored = codec.decode_entry(codec.encode_entry(entry))
+        for name in ("key_hash", "prompt", "response_text", "created_at", "access_count", "expires_at", "metadata"):
+            self.assertEqual(getattr(restored, name), getattr(entry, name))
+        np.testing.assert_array_equal(restored.embedding, entry.embedding)
+        self.assertEqual(restored.embedding.dtype, np.float32)
+
+    def test_optional_fields_absent(self):
+        restored = codec.decode_entry(codec.encode_entry(self._entry(embedding=None, expires_at=None, metadata={})))
+        self.assertIsNone(restored.embedding)
+        self.assertIsNone(restored.expires_at)
+        self.assertEqual(restored.metadata, {})
+
+    def test_long_responses_are_compressed(self):
+        entry = self._entry(response_text="semantic caching " * 200)
+        compressed = codec.encode_entry(entry, compression="zlib", compress_min_bytes=512)
+        plain = codec.encode_entry(entry, compression="none")
+        self.assertLess(len(compressed), len(plain) - 2000)
+        self.assertEqual(codec.decode_entry(compressed).response_text, entry.response_text)
+
+    def test_binary_payload_is_several_times_smaller_than_json(self):
+        entry = self._entry(embedding=np.random.default_rng(0).standard_normal(384).astype(np.float32))
+        ratio = len(codec.encode_entry_json(entry)) / len(codec.encode_entry(entry))
+        self.assertGreater(ratio, 4.0)
+
+    def test_garbage_and_truncated_payloads_raise(self):
+        with self.assertRaises(ValueError):
+            codec.decode_entry(b"garbage")
+        with self.assertRaises(ValueError):
+            codec.decode_entry(codec.encode_entry(self._entry())[:-4])
+
+    def test_resolve_compression(self):
+        self.assertIn(codec.resolve_compression("auto"), ("zstd", "zlib"))
+        self.assertEqual(codec.resolve_compression("none"), "none")
+        with self.assertRaises(ValueError):
+            codec.resolve_compression("lz4")
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,207 @@
+"""
+Tests for EmbeddingBatcher (levy/embedding_batcher.py) and EmbeddingManager's
+micro-batching mode. Offline: encoders are mock clients or recording lambdas.
+"""
+
+import asyncio
+import threading
+import unittest
+
+import numpy as np
+
+from levy.config import LevyConfig
+from levy.embedding_batcher import EmbeddingBatcher
+from levy.embedding_manager import EmbeddingManager
+from levy.embeddings import MockEmbeddingClient
+
+
+class _RecordingEncoder:
+    """encode_many stand-in: records each batch, returns row i = [len(text), i]."""
+
+    def __init__(self):
+        self.batches = []
+        self.lock = threading.Lock()
+
+    def __call__(self, texts):
+        with self.lock:
+            self.batches.append(list(texts))
+        return np.array([[len(t), i] for i, t in enumerate(texts)], dtype=np.float32)
+
+
+class TestEmbeddingBatcher(unittest.TestCase):
+
+    def setUp(self):
+        self.encoder = _RecordingEncoder()
+
+    def _batcher(self, **kwargs):
+        batcher = EmbeddingBatcher(self.encoder, **kwargs)
+        self.addCleanup(batcher.close)
+        return batcher
+
+    def test_requests_within_window_share_one_encode(self):
+        batcher = self._batcher(max_batch_size=32, max_wait_ms=200)
+        futures = [batcher.submit("x" * n) for n in range(1, 6)]
+        results = [f.result(timeout=5) for f in futures]
+        self.assertEqual(self.encoder.batches, [["x", "xx", "xxx", "xxxx", "xxxxx"]])
+        self.assertEqual([r[0] for r in results], [1, 2, 3, 4, 5])
+        self.assertEqual(batcher.stats()["mean_batch_size"], 5.0)
+
+    def test_full_batch_flushes_before_window(self):
+        batcher = self._batcher(max_batch_size=2, max_wait_ms=10_000)
+        futures = [batcher.submit(t) for t in ("a", "b", "c", "d")]
+        for f in futures:
+            f.result(timeout=5)
+        self.assertEqual(self.encoder.batches, [["a", "b"], ["c", "d"]])
+
+    def test_duplicate_texts_encoded_once(self):
+        batcher = self._batcher(max_wait_ms=200)
+        first, second = batcher.submit("same"), batcher.submit("same")
+        np.testing.assert_array_equal(first.result(timeout=5), second.result(timeout=5))
+        self.assertEqual(self.encoder.batches, [["same"]])
+        self.assertEqual(batcher.stats()["items"], 2)
+
+    def test_encode_error_reaches_every_waiter(self):
+        def boom(texts):
+            raise RuntimeError("encoder down")
+
+        batcher = EmbeddingBatcher(boom, max_wait_ms=100)
+        self.addCleanup(batcher.close)
+        futures = [batcher.submit("a"), batcher.submit("b")]
+        for f in futures:
+            with self.assertRaises(RuntimeError):
+                f.result(timeout=5)
+
+    def test_threads_and_asyncio_callers_are_batched_together(self):
+        batcher = self._batcher(max_wait_ms=300)
+        results = {}
+
+        def sync_caller(text):
+            results[text] = batcher.embed(text)
+
+        async def async_callers():
+            return await asyncio.gather(batcher.aembed("async-1"), batcher.aembed("async-2"))
+
+        threads = [threading.Thread(target=sync_caller, args=(f"sync-{i}",)) for i in range(3)]
+        for t in threads:
+            t.start()
+        async_rows = asyncio.run(async_callers())
+        for t in threads:
+            t.join(5)
+        self.assertEqual(len(results), 3)
+        self.assertEqual([row[0] for row in async_rows], [7.0, 7.0])
+        self.assertLessEqual(len(self.encoder.batches), 2)
+        self.assertEqual(sum(len(b) for b in self.encoder.batches), 5)
+
+    def test_close_flushes_pending_and_rejects_new_work(self):
+        batcher = EmbeddingBatcher(self.encoder, max_wait_ms=10_000)
+        future = batcher.submit("pending")
+        batcher.close()
+        self.assertEqual(future.result(timeout=5)[0], 7.0)
+        with self.assertRaises(RuntimeError):
+            batcher.submit("late")
+
+    def test_submit_racing_close_never_hangs(self):
+        for _ in range(20):
+            batcher = EmbeddingBatcher(self.encoder, max_wait_ms=1, max_queue_size=4)
+            futures = []
+            start = threading.Barrier(5)
+
+            def submitter():
+                start.wait()
+                for i in range(50):
+                    try:
+                        futures.append(batcher.submit(f"t{i}"))
+                    except RuntimeError:
+                        return
+
+            threads = [threading.Thread(target=submitter) for _ in range(4)]
+            for t in threads:
+                t.start()
+            start.wait()
+            batcher.close()
+            for t in threads:
+                t.join(5)
+                self.assertFalse(t.is_alive())
+            for future in futures:
+                try:
+                    future.result(timeout=5)
+                except RuntimeError:
+                    pass  # rejected after close: resolved, not hung
+
+    def test_close_does_not_block_on_a_full_queue(self):
+        release = threading.Event()
+
+        def slow(texts):
+            release.wait(5)
+            return np.zeros((len(texts), 2), dtype=np.float32)
+
+        batcher = EmbeddingBatcher(slow, max_batch_size=1, max_wait_ms=0, max_queue_size=1)
+        first = batcher.submit("in flight")
+        queued = batcher.submit("queued")
+        blocked = []
+        waiter = threading.Thread(target=lambda: blocked.append(self._submit_or_error(batcher, "blocked")))
+        waiter.start()
+        closer = threading.Thread(target=batcher.close, kwargs={"timeout": 0.1})
+        closer.start()
+        closer.join(2)
+        self.assertFalse(closer.is_alive())
+        waiter.join(2)
+        self.assertIsInstance(blocked[0], RuntimeError)
+        release.set()
+        first.result(timeout=5)
+        queued.result(timeout=5)
+
+    @staticmethod
+    def _submit_or_error(batcher, text):
+        try:
+            return batcher.submit(text)
+        except RuntimeError as exc:
+            return exc
+
+    def test_rejects_non_positive_batch_size(self):
+        with self.assertRaises(ValueError):
+            EmbeddingBatcher(self.encoder, max_batch_size=0)
+
+
+class TestManagerMicroBatching(unittest.TestCase):
+
+    def test_batched_vectors_match_unbatched(self):
+        plain = EmbeddingManager("mock", provider="mock", mock_dimension=16)
+        batched = EmbeddingManager("mock", provider="mock", mock_dimension=16, micro_batching=True, batch_max_wait_ms=1)
+        self.addCleanup(batched.close)
+        for text in ("alpha", "beta"):
+            np.testing.assert_allclose(batched.embed(text), plain.embed(text), rtol=1e-6)
+        np.testing.assert_allclose(asyncio.run(batched.aembed("gamma")), plain.embed("gamma"), rtol=1e-6)
+        self.assertEqual(batched.batcher_stats()["mock"]["items"], 3)
+
+    def test_memo_hits_bypass_the_batcher(self):
+        manager = EmbeddingManager("mock", provider="mock", micro_batching=True, batch_max_wait_ms=1)
+        self.addCleanup(manager.close)
+        manager.embed("once")
+        manager.embed("once")
+        self.assertEqual(manager.batcher_stats()["mock"]["items"], 1)
+
+    def test_from_config_reads_batching_fields(self):
+        config = LevyConfig(
+            embedding_provider="mock",
+            embedding_micro_batching=True,
+            embedding_batch_max_size=4,
+            embedding_batch_max_wait_ms=0.5,
+        )
+        manager = EmbeddingManager.from_config(config)
+        self.addCleanup(manager.close)
+        manager.embed("x")
+        batcher = manager._batchers["mock"]
+        self.assertEqual(batcher.max_batch_size, 4)
+        self.assertAlmostEqual(batcher.max_wait_seconds, 0.0005)
+        manager.close()
+        self.assertEqual(manager.batcher_stats(), {})
+
+    def test_disabled_by_default(self):
+        manager = EmbeddingManager("mock", provider="mock")
+        manager.embed("x")
+        self.assertEqual(manager.batcher_stats(), {})
+
+
+if __name__ == "__main__":
+    unittest.main()
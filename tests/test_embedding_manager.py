@@ -7,8 +7,12 @@ so no model downloads or network access are required.
 
 import unittest
 from unittest import mock
+
+import numpy as np
+
 from levy.config import LevyConfig
 from levy.embedding_manager import EmbeddingManager, KNOWN_MODEL_NAMES, _resolve
+from levy.embedding_memo import ENTRY_OVERHEAD_BYTES, EmbeddingMemo
 from levy.embeddings import MockEmbeddingClient, OllamaEmbeddingClient
 
 
@@ -19,12 +23,17 @@ class _RecordingMock(MockEmbeddingClient):
         super().__init__(dimension=dimension)
         self.received_texts = []
         self.call_count = 0
+        self.batches = []
 
     def embed(self, text):
         self.received_texts.append(text)
         self.call_count += 1
         return super().embed(text)
 
+    def embed_many(self, texts, batch_size=32):
+        self.batches.append(list(texts))
+        return np.vstack([MockEmbeddingClient.embed(self, text) for text in texts])
+
 
 def _manager_with_injected_mock(model_name, mock_checkpoint, dimension=384):
     """Return a manager with a RecordingMock pre-injected for the given checkpoint."""
@@ -116,7 +125,19 @@ class TestMemoization(unittest.TestCase):
         v1 = manager.embed("hello")
         v2 = manager.embed("hello")
         self.assertEqual(mock.call_count, 1)
-        self.assertEqual(v1, v2)
+        np.testing.assert_array_equal(v1, v2)
+
+    def test_embed_returns_read_only_float32_array(self):
+        """Vectors are native float32 ndarrays; the memoized copy can't be mutated by callers."""
+        manager, _ = _manager_with_injected_mock(
+            "all-MiniLM-L6-v2", "sentence-transformers/all-MiniLM-L6-v2"
+        )
+        vector = manager.embed("hello")
+        self.assertIsInstance(vector, np.ndarray)
+        self.assertEqual(vector.dtype, np.float32)
+        self.assertTrue(vector.flags.c_contiguous)
+        with self.assertRaises(ValueError):
+            vector[0] = 1.0
 
     def test_different_texts_each_computed(self):
         manager, mock = _manager_with_injected_mock(
@@ -151,6 +172,55 @@ class TestMemoization(unittest.TestCase):
         manager.embed("hello")
         self.assertEqual(mock.call_count, 2)
 
+    def test_memo_budget_evicts_least_recently_used(self):
+        cost = 4 * 4 + ENTRY_OVERHEAD_BYTES  # one 4-d float32 vector
+        manager = EmbeddingManager("mock", provider="mock", mock_dimension=4, memo_max_bytes=2 * cost)
+        manager.embed("a")
+        manager.embed("b")
+        manager.embed("a")  # refresh: "b" is now least recently used
+        manager.embed("c")
+        stats = manager.memo_stats()
+        self.assertEqual((stats["entries"], stats["bytes"], stats["evictions"]), (2, 2 * cost, 1))
+        self.assertEqual((stats["hits"], stats["misses"]), (1, 3))
+        manager.embed("a")
+        self.assertEqual(manager.memo_stats()["hits"], 2)
+        manager.embed("b")  # evicted, recomputed
+        self.assertEqual(manager.memo_stats()["misses"], 4)
+
+    def test_memo_from_config_budget(self):
+        manager = EmbeddingManager.from_config(LevyConfig(embedding_provider="mock", embedding_memo_max_bytes=12345))
+        self.assertEqual(manager.memo_stats()["max_bytes"], 12345)
+
+
+class TestEmbeddingMemo(unittest.TestCase):
+
+    def test_unbounded_when_budget_is_none(self):
+        memo = EmbeddingMemo(max_bytes=None)
+        for i in range(100):
+            memo.put(("m", str(i)), np.zeros(8, dtype=np.float32))
+        self.assertEqual(len(memo), 100)
+        self.assertEqual(memo.evictions, 0)
+
+    def test_oversized_vector_is_not_stored(self):
+        memo = EmbeddingMemo(max_bytes=100)
+        memo.put(("m", "big"), np.zeros(1000, dtype=np.float32))
+        self.assertNotIn(("m", "big"), memo)
+        self.assertEqual(memo.nbytes, 0)
+
+    def test_replacing_a_key_does_not_double_count(self):
+        memo = EmbeddingMemo()
+        vector = np.zeros(4, dtype=np.float32)
+        memo.put(("m", "k"), vector)
+        memo.put(("m", "k"), vector)
+        self.assertEqual(memo.nbytes, vector.nbytes + ENTRY_OVERHEAD_BYTES)
+
+    def test_clear_resets_bytes_but_keeps_counters(self):
+        memo = EmbeddingMemo()
+        memo.put(("m", "k"), np.zeros(4, dtype=np.float32))
+        memo.get(("m", "k"))
+        memo.clear()
+        self.assertEqual((len(memo), memo.nbytes, memo.hits), (0, 0, 1))
+
 
 # ---------------------------------------------------------------------------
 # 5.4  Dimension and identity exposure
@@ -188,6 +258,52 @@ class TestDimensionAndIdentity(unittest.TestCase):
         self.assertEqual(manager.get_dimension(), manager._get_mock_client().get_dimension())
 
 
+class TestEmbedMany(unittest.TestCase):
+
+    def test_matches_single_embeds_in_input_order(self):
+        manager, _ = _manager_with_injected_mock("all-MiniLM-L6-v2", "sentence-transformers/all-MiniLM-L6-v2")
+        texts = ["a", "b", "c"]
+        matrix = manager.embed_many(texts)
+        self.assertEqual(matrix.shape, (3, 384))
+        self.assertEqual(matrix.dtype, np.float32)
+        for row, text in zip(matrix, texts):
+            np.testing.assert_array_equal(row, manager.embed(text))
+
+    def test_only_uncached_texts_are_batch_encoded_once(self):
+        manager, mock = _manager_with_injected_mock("all-MiniLM-L6-v2", "sentence-transformers/all-MiniLM-L6-v2")
+        manager.embed("cached")
+        manager.embed_many(["cached", "new", "new", "other"])
+        self.assertEqual(mock.batches, [["new", "other"]])
+        manager.embed_many(["new", "other"])  # backfilled: no further encode
+        self.assertEqual(len(mock.batches), 1)
+        self.assertEqual(mock.call_count, 1)
+
+    def test_prefix_applied_in_batches(self):
+        manager, mock = _manager_with_injected_mock("modernbert", "nomic-ai/modernbert-embed-base", dimension=768)
+        manager.embed_many(["x", "y"])
+        self.assertEqual(mock.batches, [["search_query: x", "search_query: y"]])
+        manager.embed("x")
+        self.assertEqual(mock.call_count, 0)  # served from the memo the batch filled
+
+    def test_empty_input_does_not_touch_the_model(self):
+        manager = EmbeddingManager("mock", provider="mock", mock_dimension=8)
+        with mock.patch.object(manager, "get_dimension") as get_dimension:
+            self.assertEqual(manager.embed_many([]).shape, (0, 0))
+        get_dimension.assert_not_called()
+        self.assertNotIn("mock", manager._clients)
+
+    def test_non_positive_batch_size_is_rejected(self):
+        manager = EmbeddingManager("mock", provider="mock", mock_dimension=8)
+        for batch_size in (0, -1):
+            with self.assertRaisesRegex(ValueError, "batch_size"):
+                manager.embed_many(["x"], batch_size=batch_size)
+
+    def test_client_default_loops_over_embed(self):
+        client = MockEmbeddingClient(dimension=4)
+        matrix = client.embed_many(["p", "q"])
+        np.testing.assert_array_equal(matrix[1], client.embed("q"))
+
+
 # ---------------------------------------------------------------------------
 # 5.5  Symmetric task-prefix handling
 # ---------------------------------------------------------------------------
@@ -209,7 +325,7 @@ class TestPrefixHandling(unittest.TestCase):
         )
         vec_store = manager.embed("what is Python?")
         vec_lookup = manager.embed("what is Python?")
-        self.assertEqual(vec_store, vec_lookup)
+        np.testing.assert_array_equal(vec_store, vec_lookup)
         self.assertEqual(mock.call_count, 1)  # memoized after first call
 
     def test_minilm_receives_raw_text(self):
@@ -275,7 +391,7 @@ class TestOllamaProvider(unittest.TestCase):
     def test_embed_with_uses_injected_client(self):
         manager, fake = self._manager()
         vector = manager.embed_with("qwen3", "hello")
-        self.assertEqual(vector, [0.1] * 5)
+        np.testing.assert_allclose(vector, [0.1] * 5)
         self.assertEqual(fake.received_texts, ["hello"])
 
     def test_embed_with_memoizes_by_text(self):
@@ -321,5 +437,40 @@ class TestSentenceTransformerLazyConstruction(unittest.TestCase):
             FakeCls.assert_called_once()
 
 
+class TestOnnxProvider(unittest.TestCase):
+
+    def test_onnx_client_built_from_registry_spec(self):
+        with mock.patch("levy.embedding_manager.OnnxEmbeddingClient") as FakeCls:
+            FakeCls.return_value = _RecordingMock(dimension=384)
+            manager = EmbeddingManager("all-minilm", provider="onnx", onnx_quantization="avx2")
+            manager.embed("hello")
+            FakeCls.assert_called_once_with(
+                model_name="sentence-transformers/all-MiniLM-L6-v2",
+                trust_remote_code=False,
+                quantization="avx2",
+                prequantized=True,
+                export_dir=None,
+            )
+            self.assertEqual(manager.get_model_identity().checkpoint, "sentence-transformers/all-MiniLM-L6-v2")
+
+    def test_onnx_keeps_prefix_and_separate_memo_key(self):
+        with mock.patch("levy.embedding_manager.OnnxEmbeddingClient") as FakeCls:
+            recorder = FakeCls.return_value = _RecordingMock(dimension=768)
+            manager = EmbeddingManager.from_config(
+                LevyConfig(embedding_provider="onnx", embedding_model="modernbert")
+            )
+            manager.embed("hello")
+            self.assertEqual(recorder.received_texts, ["search_query: hello"])
+            self.assertFalse(FakeCls.call_args.kwargs["prequantized"])
+            key = manager._route("modernbert", "hello")[0]
+            self.assertEqual(key[0], "onnx[fp32]:nomic-ai/modernbert-embed-base")
+
+    def test_unknown_quantization_rejected_before_loading(self):
+        from levy.embeddings import OnnxEmbeddingClient
+
+        with self.assertRaises(ValueError):
+            OnnxEmbeddingClient("sentence-transformers/all-MiniLM-L6-v2", quantization="int4")
+
+
 if __name__ == "__main__":
     unittest.main()
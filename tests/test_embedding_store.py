@@ -0,0 +1,163 @@
+"""
+Tests for SQLiteEmbeddingStore (levy/embedding_store.py) and EmbeddingManager's
+persistent second level. Offline: SQLite files in a temp dir, mock encoders.
+"""
+
+import asyncio
+import os
+import tempfile
+import threading
+import unittest
+
+import numpy as np
+
+from levy.config import LevyConfig
+from levy.embedding_manager import EmbeddingManager
+from levy.embedding_store import SQLiteEmbeddingStore
+from levy.embeddings import MockEmbeddingClient
+
+_MINILM = "sentence-transformers/all-MiniLM-L6-v2"
+
+
+class _RecordingMock(MockEmbeddingClient):
+    """Counts forward passes: single embeds and embed_many batches."""
+
+    def __init__(self):
+        super().__init__(dimension=384)
+        self.received_texts = []
+        self.call_count = 0
+        self.batches = []
+
+    def embed(self, text):
+        self.received_texts.append(text)
+        self.call_count += 1
+        return super().embed(text)
+
+    def embed_many(self, texts, batch_size=32):
+        self.batches.append(list(texts))
+        return np.vstack([MockEmbeddingClient.embed(self, text) for text in texts])
+
+
+class TestSQLiteEmbeddingStore(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.path = os.path.join(self.tmp.name, "sub", "embeddings.sqlite")
+
+    def _store(self):
+        store = SQLiteEmbeddingStore(self.path)
+        self.addCleanup(store.close)
+        return store
+
+    def test_roundtrip_is_float32_and_read_only(self):
+        store = self._store()
+        vector = np.arange(5, dtype=np.float32)
+        store.put(("ckpt", "h1"), vector)
+        loaded = store.get(("ckpt", "h1"))
+        np.testing.assert_array_equal(loaded, vector)
+        self.assertEqual(loaded.dtype, np.float32)
+        self.assertFalse(loaded.flags.writeable)
+        self.assertIsNone(store.get(("ckpt", "missing")))
+        self.assertEqual(store.stats(), {"entries": 1, "hits": 1, "misses": 1})
+
+    def test_get_many_spans_chunks(self):
+        store = self._store()
+        items = [(("ckpt", f"h{i}"), np.full(3, i, dtype=np.float32)) for i in range(1000)]
+        store.put_many(items)
+        found = store.get_many([key for key, _ in items] + [("ckpt", "absent")])
+        self.assertEqual(len(found), 1000)
+        np.testing.assert_array_equal(found[("ckpt", "h999")], [999, 999, 999])
+
+    def test_first_write_wins(self):
+        store = self._store()
+        store.put(("ckpt", "h"), np.zeros(2, dtype=np.float32))
+        store.put(("ckpt", "h"), np.ones(2, dtype=np.float32))
+        np.testing.assert_array_equal(store.get(("ckpt", "h")), [0, 0])
+        self.assertEqual(len(store), 1)
+
+    def test_second_handle_and_other_threads_see_writes(self):
+        writer, reader = self._store(), self._store()
+        writer.put(("ckpt", "shared"), np.ones(4, dtype=np.float32))
+        self.assertIn(("ckpt", "shared"), reader)
+
+        results = []
+        thread = threading.Thread(target=lambda: results.append(reader.get(("ckpt", "shared"))))
+        thread.start()
+        thread.join(5)
+        np.testing.assert_array_equal(results[0], np.ones(4))
+
+
+class TestManagerPersistentStore(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.path = os.path.join(self.tmp.name, "embeddings.sqlite")
+
+    def _manager(self, model="all-MiniLM-L6-v2", checkpoint=_MINILM):
+        manager = EmbeddingManager(model, provider="sentence-transformers", store_path=self.path)
+        self.addCleanup(manager.close)
+        mock = _RecordingMock()
+        manager._clients[checkpoint] = mock
+        return manager, mock
+
+    def test_second_process_needs_no_forward_pass(self):
+        first, first_mock = self._manager()
+        expected = first.embed("persist me")
+        first.embed_many(["batch a", "batch b"])
+        first.close()
+
+        second, second_mock = self._manager()
+        np.testing.assert_array_equal(second.embed("persist me"), expected)
+        self.assertEqual(second.embed_many(["batch a", "batch b", "batch c"]).shape, (3, 384))
+        self.assertEqual(second_mock.call_count, 0)
+        self.assertEqual(second_mock.batches, [["batch c"]])
+        self.assertEqual(second.store_stats()["entries"], 4)
+
+    def test_store_key_includes_prefix(self):
+        manager, mock = self._manager("modernbert", "nomic-ai/modernbert-embed-base")
+        manager.embed("hello")
+        stored = manager._store.get_many([manager._route("modernbert", "hello")[0]])
+        self.assertEqual(len(stored), 1)
+        self.assertEqual(mock.received_texts, ["search_query: hello"])
+
+    def test_clear_memoization_keeps_the_store(self):
+        manager, mock = self._manager()
+        manager.embed("kept")
+        manager.clear_memoization()
+        manager.embed("kept")
+        self.assertEqual(mock.call_count, 1)
+
+    def test_aembed_reads_and_writes_the_store_off_the_event_loop(self):
+        manager, _ = self._manager()
+        store = manager._store
+        threads = []
+
+        def recording(method):
+            def call(*args):
+                threads.append(threading.get_ident())
+                return method(*args)
+            return call
+
+        store.get, store.put = recording(store.get), recording(store.put)
+
+        async def scenario():
+            await manager.aembed("async miss")
+            return threading.get_ident()
+
+        loop_thread = asyncio.run(scenario())
+        self.assertEqual(len(threads), 2)  # one get (miss), one put
+        self.assertNotIn(loop_thread, threads)
+
+    def test_mock_provider_is_never_persisted(self):
+        manager = EmbeddingManager.from_config(
+            LevyConfig(embedding_provider="mock", embedding_store_path=self.path)
+        )
+        manager.embed("x")
+        self.assertIsNone(manager.store_stats())
+        self.assertFalse(os.path.exists(self.path))
+
+
+if __name__ == "__main__":
+    unittest.main()
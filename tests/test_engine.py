@@ -7,16 +7,26 @@ are only constructed here, never asked to `.generate()` (that path makes a
 real HTTP call and is pragma-excluded).
 """
 
+import asyncio
 import builtins
 import importlib
+import threading
+import time
 import unittest
+from concurrent.futures import ThreadPoolExecutor
 from unittest import mock
 
+import numpy as np
+
 import levy.engine as engine_module
+from levy.cache.redis_store import RedisStore
 from levy.cache.store import InMemoryStore
+from levy.cache.tiered_store import TieredStore
 from levy.config import LevyConfig
 from levy.engine import LevyEngine
+from levy.coalescing import InflightRegistry
 from levy.llm_client import LLMClient, OllamaLLMClient, OpenAILLMClient
+from levy.models import LLMResponse
 
 
 class TestProviderSelection(unittest.TestCase):
@@ -69,6 +79,27 @@ class TestRedisStoreFallback(unittest.TestCase):
         self.assertIsInstance(engine.store, InMemoryStore)
 
 
+class TestTieredStoreSelection(unittest.TestCase):
+
+    def test_tiered_wraps_redis_and_engine_close_stops_listener(self):
+        client = mock.MagicMock()
+        client.sscan.return_value = (0, [])
+        config = LevyConfig(cache_store_type="tiered", embedding_provider="mock", tiered_l1_max_size=7)
+        with mock.patch.object(engine_module, "RedisStore", lambda **kwargs: RedisStore(client=client, **kwargs)):
+            engine = LevyEngine(config)
+        self.assertIsInstance(engine.store, TieredStore)
+        self.assertEqual(engine.store.l1_max_size, 7)
+        client.pubsub.return_value.subscribe.assert_called_once()
+        listener = client.pubsub.return_value.run_in_thread.return_value
+        engine.close()
+        listener.stop.assert_called_once()
+
+    def test_tiered_falls_back_to_memory_without_a_redis_server(self):
+        config = LevyConfig(cache_store_type="tiered", embedding_provider="mock", redis_url="redis://127.0.0.1:1/0")
+        engine = LevyEngine(config)  # pub/sub subscribe connects eagerly and is refused
+        self.assertIsInstance(engine.store, InMemoryStore)
+
+
 class TestRedisStoreImportGuard(unittest.TestCase):
 
     def test_module_falls_back_to_none_when_redis_store_import_fails(self):
@@ -89,6 +120,97 @@ class TestRedisStoreImportGuard(unittest.TestCase):
             importlib.reload(engine_module)  # restore normal state for subsequent tests
 
 
+class TestSemanticWarmFromStore(unittest.TestCase):
+
+    def _config(self, **overrides):
+        fields = dict(
+            llm_provider="mock",
+            mock_llm_latency_seconds=0,
+            embedding_provider="mock",
+            vector_index_backend="brute_force",
+        )
+        fields.update(overrides)
+        return LevyConfig(**fields)
+
+    def test_restarted_engine_rebuilds_semantic_index_from_store(self):
+        store = InMemoryStore()
+        first = LevyEngine(self._config(), store=store)
+        for i in range(5):
+            first.generate(f"persisted prompt {i}")
+
+        restarted = LevyEngine(self._config(enable_exact_cache=False, semantic_warm_batch_size=2), store=store)
+        self.assertEqual(restarted.semantic_cache.size(), 5)
+        result = restarted.generate("persisted prompt 3")
+        self.assertEqual(result.source, "semantic_cache")
+
+    def test_warm_skips_entries_from_other_embedding_models(self):
+        store = InMemoryStore()
+        LevyEngine(self._config(), store=store).generate("cached")
+        next(iter(store.entries.values())).metadata["canonical_name"] = "some-other-model"
+        engine = LevyEngine(self._config(), store=store)
+        self.assertEqual(engine.semantic_cache.size(), 0)
+        report = engine.warm_semantic_cache()
+        self.assertEqual((report["scanned"], report["skipped_model"], report["loaded"]), (1, 1, 0))
+
+    def test_warm_can_be_disabled_and_store_errors_do_not_block_startup(self):
+        store = InMemoryStore()
+        LevyEngine(self._config(), store=store).generate("cached")
+        self.assertEqual(LevyEngine(self._config(semantic_warm_from_store=False), store=store).semantic_cache.size(), 0)
+        store.iter_entries_with_embeddings = mock.Mock(side_effect=ConnectionError("redis down"))
+        with self.assertLogs("levy.engine", level="ERROR"):
+            engine = LevyEngine(self._config(), store=store)
+        self.assertEqual(engine.semantic_cache.size(), 0)
+
+
+class TestCacheByteBudget(unittest.TestCase):
+
+    def test_cache_max_bytes_bounds_store_and_semantic_cache(self):
+        config = LevyConfig(
+            llm_provider="mock",
+            mock_llm_latency_seconds=0,
+            embedding_provider="mock",
+            vector_index_backend="brute_force",
+            cache_max_bytes=20_000,
+        )
+        engine = LevyEngine(config)
+        for i in range(50):
+            engine.generate(f"budgeted prompt {i}")
+        stats = engine.get_cache_stats()
+        self.assertLessEqual(stats["store_bytes"], 20_000)
+        self.assertLessEqual(stats["semantic_bytes"], 20_000)
+        self.assertEqual(stats["cache_bytes"], stats["store_bytes"] + stats["semantic_bytes"])
+        self.assertGreaterEqual(stats["peak_cache_bytes"], stats["cache_bytes"])
+        self.assertLess(len(engine.store.entries), 50)
+
+
+class TestExactKeySchema(unittest.TestCase):
+
+    def _engine(self, **overrides):
+        fields = dict(llm_provider="mock", mock_llm_latency_seconds=0, embedding_provider="mock")
+        fields.update(overrides)
+        return LevyEngine(LevyConfig(**fields))
+
+    def test_prompt_variant_is_an_exact_hit_without_embedding(self):
+        engine = self._engine(exact_key_casefold=True)
+        engine.generate("Explain  caching.")
+        with mock.patch.object(engine.embedding_manager, "embed", wraps=engine.embedding_manager.embed) as embed:
+            result = engine.generate("explain caching. ")
+        self.assertEqual(result.source, "exact_cache")
+        embed.assert_not_called()
+
+    def test_generation_kwargs_and_model_change_the_key(self):
+        engine = self._engine(enable_semantic_cache=False)
+        engine.generate("same prompt", temperature=0.0)
+        self.assertEqual(engine.generate("same prompt", temperature=1.0).source, "llm")
+        self.assertEqual(engine.generate("same prompt", temperature=0.0).source, "exact_cache")
+        other_model = LevyEngine(
+            LevyConfig(llm_provider="mock", mock_llm_latency_seconds=0, embedding_provider="mock",
+                       enable_semantic_cache=False, model_name="other"),
+            store=engine.store,
+        )
+        self.assertEqual(other_model.generate("same prompt", temperature=0.0).source, "llm")
+
+
 class TestGenerateErrorHandling(unittest.TestCase):
 
     def test_llm_client_exception_propagates(self):
@@ -108,6 +230,260 @@ class TestGenerateErrorHandling(unittest.TestCase):
             engine.generate("this will miss and call the LLM")
 
 
+class _GatedLLMClient(LLMClient):
+    """Counts calls and blocks every call until `release` is set."""
+
+    def __init__(self, fail: bool = False):
+        self.calls = 0
+        self.started = threading.Event()
+        self.release = threading.Event()
+        self.fail = fail
+        self._lock = threading.Lock()
+
+    def generate(self, request):
+        with self._lock:
+            self.calls += 1
+        self.started.set()
+        self.release.wait(timeout=5)
+        if self.fail:
+            raise RuntimeError("simulated LLM failure")
+        return LLMResponse(text=f"answer to {request.prompt}", model="gated")
+
+
+class TestSingleFlight(unittest.TestCase):
+
+    def _engine(self, **overrides):
+        defaults = dict(
+            llm_provider="mock",
+            embedding_provider="mock",
+            vector_index_backend="brute_force",
+        )
+        defaults.update(overrides)
+        engine = LevyEngine(LevyConfig(**defaults))
+        engine.llm_client = _GatedLLMClient()
+        return engine
+
+    def _burst(self, engine, prompts):
+        """Submit prompts concurrently; release the LLM once every follower has joined."""
+        with ThreadPoolExecutor(max_workers=len(prompts)) as pool:
+            futures = [pool.submit(engine.generate, p) for p in prompts]
+            engine.llm_client.started.wait(timeout=5)
+            time.sleep(0.1)  # let followers reach the in-flight registry
+            engine.llm_client.release.set()
+            return futures
+
+    def test_identical_concurrent_misses_make_one_llm_call(self):
+        engine = self._engine()
+        futures = self._burst(engine, ["same prompt"] * 6)
+        results = [f.result(timeout=5) for f in futures]
+        self.assertEqual(engine.llm_client.calls, 1)
+        self.assertEqual(sorted(r.source for r in results).count("llm"), 1)
+        self.assertTrue(all(r.answer == "answer to same prompt" for r in results))
+        followers = [r for r in results if r.source != "llm"]
+        self.assertTrue(all(r.source == "exact_cache" and r.metadata["coalesced"] for r in followers))
+        self.assertEqual(engine.metrics.coalesced, 5)
+        self.assertEqual(len(engine.inflight), 0)
+
+    def test_leader_failure_propagates_to_followers(self):
+        engine = self._engine()
+        engine.llm_client.fail = True
+        futures = self._burst(engine, ["doomed"] * 3)
+        for f in futures:
+            with self.assertRaises(RuntimeError):
+                f.result(timeout=5)
+        self.assertEqual(engine.llm_client.calls, 1)
+        self.assertEqual(len(engine.inflight), 0)
+
+    def test_coalescing_can_be_disabled(self):
+        engine = self._engine(coalesce_inflight_requests=False)
+        futures = self._burst(engine, ["same prompt"] * 3)
+        [f.result(timeout=5) for f in futures]
+        self.assertEqual(engine.llm_client.calls, 3)
+
+    def _late_joiner(self, engine):
+        """Patch inflight.join so the first caller, having already missed the cache,
+        joins only after a whole earlier flight for the same prompt has finished."""
+        real_join = engine.inflight.join
+        raced = []
+
+        def join(*args, **kwargs):
+            if not raced:
+                raced.append(True)
+                engine.llm_client.release.set()
+                engine.generate("same prompt")  # the previous leader: calls, stores, finishes
+            return real_join(*args, **kwargs)
+
+        engine.inflight.join = join
+
+    def test_new_leader_rechecks_cache_before_calling_llm(self):
+        for semantic in (False, True):
+            with self.subTest(semantic=semantic):
+                engine = self._engine(enable_exact_cache=not semantic)
+                self._late_joiner(engine)
+                result = engine.generate("same prompt")
+                self.assertEqual(engine.llm_client.calls, 1)
+                self.assertEqual(result.source, "semantic_cache" if semantic else "exact_cache")
+                self.assertEqual(result.answer, "answer to same prompt")
+                self.assertEqual(len(engine.inflight), 0)
+
+    def test_semantic_neighbor_coalescing_uses_threshold(self):
+        engine = self._engine(coalesce_semantic_neighbors=True, similarity_threshold=0.0)
+        futures = self._burst(engine, ["first prompt", "another prompt", "third prompt"])
+        results = [f.result(timeout=5) for f in futures]
+        self.assertEqual(engine.llm_client.calls, 1)
+        self.assertEqual(sum(r.source == "semantic_cache" for r in results), 2)
+
+
+class _GatedAsyncLLMClient(LLMClient):
+    """Async counterpart of _GatedLLMClient: every agenerate awaits `release`."""
+
+    def __init__(self):
+        self.calls = 0
+        self.release = None  # asyncio.Event, created inside the running loop
+
+    def generate(self, request):  # pragma: no cover -- async tests only
+        raise AssertionError("sync path used")
+
+    async def agenerate(self, request):
+        self.calls += 1
+        await self.release.wait()
+        return LLMResponse(text=f"answer to {request.prompt}", model="gated")
+
+
+class TestAsyncGenerate(unittest.TestCase):
+
+    def _engine(self, **overrides):
+        defaults = dict(
+            llm_provider="mock",
+            mock_llm_latency_seconds=0,
+            embedding_provider="mock",
+            vector_index_backend="brute_force",
+        )
+        defaults.update(overrides)
+        return LevyEngine(LevyConfig(**defaults))
+
+    def test_agenerate_miss_then_exact_then_semantic_hit(self):
+        engine = self._engine()
+
+        async def scenario():
+            first = await engine.agenerate("hello async")
+            second = await engine.agenerate("hello async")
+            return first, second
+
+        first, second = asyncio.run(scenario())
+        self.assertEqual(first.source, "llm")
+        self.assertEqual(second.source, "exact_cache")
+        self.assertEqual(engine.metrics.total_requests, 2)
+
+        engine = self._engine(enable_exact_cache=False)
+        asyncio.run(engine.agenerate("semantic async"))
+        self.assertEqual(asyncio.run(engine.agenerate("semantic async")).source, "semantic_cache")
+
+    def test_concurrent_identical_agenerate_calls_coalesce(self):
+        engine = self._engine()
+        engine.llm_client = _GatedAsyncLLMClient()
+
+        async def scenario():
+            engine.llm_client.release = asyncio.Event()
+            tasks = [asyncio.create_task(engine.agenerate("burst")) for _ in range(5)]
+            await asyncio.sleep(0.05)
+            engine.llm_client.release.set()
+            return await asyncio.gather(*tasks)
+
+        results = asyncio.run(scenario())
+        self.assertEqual(engine.llm_client.calls, 1)
+        self.assertEqual([r.source for r in results].count("llm"), 1)
+        self.assertEqual(engine.metrics.coalesced, 4)
+
+    def test_new_async_leader_rechecks_cache_before_calling_llm(self):
+        engine = self._engine()
+        client = engine.llm_client
+        real_join = engine.inflight.join
+        raced = []
+
+        def join(*args, **kwargs):
+            if not raced:
+                raced.append(True)
+                engine.generate("late")  # an earlier flight completes before this one joins
+            return real_join(*args, **kwargs)
+
+        engine.inflight.join = join
+        with mock.patch.object(client, "generate", wraps=client.generate) as sync_call, \
+                mock.patch.object(client, "agenerate", wraps=client.agenerate) as async_call:
+            result = asyncio.run(engine.agenerate("late"))
+        self.assertEqual(sync_call.call_count + async_call.call_count, 1)
+        self.assertEqual(result.source, "exact_cache")
+
+    def test_network_store_calls_run_off_the_event_loop(self):
+        class _ThreadRecordingStore:
+            """Duck-typed store (like RedisStore) noting which thread calls it."""
+
+            def __init__(self):
+                self.inner = InMemoryStore()
+                self.threads = []
+
+            def get(self, key):
+                self.threads.append(threading.get_ident())
+                return self.inner.get(key)
+
+            def set(self, key, entry):
+                self.threads.append(threading.get_ident())
+                self.inner.set(key, entry)
+
+            def __getattr__(self, name):
+                return getattr(self.inner, name)
+
+        store = _ThreadRecordingStore()
+        engine = LevyEngine(self._engine().config, store=store)
+
+        async def scenario():
+            first = await engine.agenerate("offloaded")
+            second = await engine.agenerate("offloaded")
+            return threading.get_ident(), first, second
+
+        loop_thread, first, second = asyncio.run(scenario())
+        self.assertEqual((first.source, second.source), ("llm", "exact_cache"))
+        self.assertGreaterEqual(len(store.threads), 3)  # miss, (leader re-check,) set, hit
+        self.assertNotIn(loop_thread, store.threads)
+
+    def test_in_memory_caches_stay_on_the_event_loop(self):
+        engine = self._engine()
+        self.assertFalse(engine._offload_cache_io)
+
+    def test_duck_typed_sync_client_is_offloaded(self):
+        engine = self._engine()
+
+        class _SyncOnly:
+            def generate(self, request):
+                return LLMResponse(text="sync only", model="duck")
+
+        engine.llm_client = _SyncOnly()
+        self.assertEqual(asyncio.run(engine.agenerate("x")).answer, "sync only")
+
+
+class TestInflightRegistry(unittest.TestCase):
+
+    def test_semantic_match_respects_threshold(self):
+        registry = InflightRegistry()
+        a = np.array([1.0, 0.0], dtype=np.float32)
+        b = np.array([0.0, 1.0], dtype=np.float32)  # L2 = sqrt(2) -> sim ~0.414
+        leader, is_leader, _ = registry.join("a", a, threshold=0.5)
+        self.assertTrue(is_leader)
+        _, is_leader, _ = registry.join("b", b, threshold=0.5)
+        self.assertTrue(is_leader)
+        flight, is_leader, sim = registry.join("c", b, threshold=0.4)
+        self.assertFalse(is_leader)
+        self.assertAlmostEqual(sim, 1.0)  # identical to the "b" flight, the best match
+
+    def test_finish_unregisters_and_resolves(self):
+        registry = InflightRegistry()
+        flight, _, _ = registry.join("k")
+        registry.finish(flight, "done")
+        self.assertEqual(flight.future.result(), "done")
+        _, is_leader, _ = registry.join("k")
+        self.assertTrue(is_leader)
+
+
 class TestMetricsSummary(unittest.TestCase):
 
     def test_get_metrics_summary_returns_metrics_string(self):
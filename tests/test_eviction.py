@@ -0,0 +1,175 @@
+"""
+Tests for levy.cache.eviction (LRU, LFU, W-TinyLFU, count-min sketch) and the
+InMemoryStore / LevyConfig wiring of eviction policies.
+"""
+
+import random
+import unittest
+
+from levy.cache.eviction import (
+    CountMinSketch,
+    LFUPolicy,
+    LRUPolicy,
+    WTinyLFUPolicy,
+    make_eviction_policy,
+)
+from levy.cache.sizing import entry_nbytes
+from levy.cache.store import InMemoryStore
+from levy.config import LevyConfig
+from levy.engine import LevyEngine
+from levy.models import CacheEntry
+
+
+def _entry(key):
+    return CacheEntry(key_hash=key, prompt=key, response_text=key.upper())
+
+
+def _replay(store, trace):
+    for key in trace:
+        if store.get(key) is None:
+            store.set(key, _entry(key))
+    return store.stats()
+
+
+class TestLRUPolicy(unittest.TestCase):
+
+    def test_evicts_least_recently_used(self):
+        policy = LRUPolicy(2)
+        self.assertEqual(policy.admit("a"), [])
+        self.assertEqual(policy.admit("b"), [])
+        policy.record_access("a")
+        self.assertEqual(policy.admit("c"), ["b"])
+        policy.remove("a")
+        self.assertEqual(len(policy), 1)
+
+
+class TestLFUPolicy(unittest.TestCase):
+
+    def test_evicts_least_frequent_with_recency_tiebreak(self):
+        policy = LFUPolicy(3)
+        for key in "abc":
+            policy.admit(key)
+        policy.record_access("a")
+        policy.record_access("a")
+        policy.record_access("c")
+        self.assertEqual(policy.admit("d"), ["b"])  # b: 1 use; c: 2; a: 3
+        self.assertEqual(policy.admit("e"), ["d"])  # newcomers start at 1, oldest first
+
+    def test_remove_of_minimum_bucket_is_recovered_on_next_eviction(self):
+        policy = LFUPolicy(2)
+        policy.admit("a")
+        policy.admit("b")
+        policy.record_access("b")
+        policy.remove("a")
+        policy.admit("c")
+        self.assertEqual(policy.admit("d"), ["c"])
+        self.assertEqual(len(policy), 2)
+
+
+class TestCountMinSketch(unittest.TestCase):
+
+    def test_estimates_are_upper_bounds_and_age(self):
+        sketch = CountMinSketch(64)
+        for _ in range(5):
+            sketch.increment("hot")
+        sketch.increment("cold")
+        self.assertGreaterEqual(sketch.frequency("hot"), 5)
+        self.assertGreaterEqual(sketch.frequency("cold"), 1)
+        self.assertLess(sketch.frequency("cold"), sketch.frequency("hot"))
+        for _ in range(30):
+            sketch.increment("hot")
+        self.assertEqual(sketch.frequency("hot"), CountMinSketch.MAX_COUNT)
+        sketch._age()
+        self.assertLessEqual(sketch.frequency("hot"), CountMinSketch.MAX_COUNT // 2)
+
+
+class TestWTinyLFUPolicy(unittest.TestCase):
+
+    def test_one_off_keys_do_not_displace_a_popular_one(self):
+        policy = WTinyLFUPolicy(100)
+        for key in (f"k{i}" for i in range(100)):
+            policy.admit(key)
+        for _ in range(5):
+            policy.record_access("k50")
+        evicted = set()
+        for i in range(500):
+            evicted.update(policy.admit(f"scan{i}"))
+        self.assertNotIn("k50", evicted)
+        self.assertEqual(len(policy), 100)
+
+    def test_tiny_capacities(self):
+        for capacity in (1, 2):
+            policy = WTinyLFUPolicy(capacity)
+            for i in range(10):
+                policy.admit(f"k{i}")
+                policy.record_access(f"k{i}")
+            self.assertLessEqual(len(policy), capacity)
+
+
+class TestInMemoryStorePolicies(unittest.TestCase):
+
+    def test_unknown_policy_raises(self):
+        with self.assertRaises(ValueError):
+            make_eviction_policy("random", 10)
+
+    def test_cold_window_candidate_is_rejected_in_favour_of_hot_entries(self):
+        store = InMemoryStore(max_size=3, policy="w-tinylfu")  # 1-entry window, 2-entry main
+        for key in ("a", "b"):
+            store.set(key, _entry(key))
+        for _ in range(3):
+            store.get("a")
+            store.get("b")
+        store.set("c", _entry("c"))  # fills the window
+        store.set("d", _entry("d"))  # pushes "c" out of the window to compete with "a"/"b"
+        self.assertEqual(sorted(store.entries), ["a", "b", "d"])
+        self.assertEqual((store.stats()["rejections"], store.stats()["evictions"]), (1, 1))
+
+    def test_byte_budget_does_not_evict_for_a_rejected_candidate(self):
+        budget = 3 * entry_nbytes(_entry("a"))  # bytes bind at the same point as the 3-entry cap
+        store = InMemoryStore(max_size=3, policy="w-tinylfu", max_bytes=budget)
+        for key in ("a", "b"):
+            store.set(key, _entry(key))
+        for _ in range(3):
+            store.get("a")
+            store.get("b")
+        store.set("c", _entry("c"))
+        store.set("d", _entry("d"))  # "c" is rejected; its slot alone makes room for "d"
+        self.assertEqual(sorted(store.entries), ["a", "b", "d"])
+        self.assertEqual((store.stats()["rejections"], store.stats()["evictions"]), (1, 1))
+        self.assertLessEqual(store.nbytes, budget)
+
+    def test_frequency_policies_beat_lru_on_a_skewed_trace_with_scans(self):
+        rng = random.Random(7)
+        hot = [f"faq{i}" for i in range(40)]
+        trace = []
+        for i in range(6000):
+            trace.append(rng.choice(hot) if rng.random() < 0.6 else f"oneoff{i}")
+        rates = {
+            policy: _replay(InMemoryStore(max_size=50, policy=policy), trace)["hit_rate"]
+            for policy in ("lru", "lfu", "w-tinylfu")
+        }
+        self.assertGreater(rates["lfu"], rates["lru"])
+        self.assertGreater(rates["w-tinylfu"], rates["lru"])
+
+    def test_stats_and_delete_keep_policy_in_sync(self):
+        store = InMemoryStore(max_size=2, policy="lfu")
+        stats = _replay(store, ["a", "a", "b"])
+        self.assertEqual((stats["policy"], stats["hits"], stats["misses"]), ("lfu", 1, 2))
+        store.delete("a")
+        self.assertEqual(len(store.policy), 1)
+        store.clear()
+        self.assertEqual(len(store.policy), 0)
+
+    def test_engine_selects_policy_from_config(self):
+        config = LevyConfig(llm_provider="mock", mock_llm_latency_seconds=0, embedding_provider="mock",
+                            cache_eviction_policy="w-tinylfu", enable_semantic_cache=False)
+        engine = LevyEngine(config)
+        engine.generate("hello")
+        engine.generate("hello")
+        store_stats = engine.get_cache_stats()["store"]
+        self.assertEqual(store_stats["policy"], "w-tinylfu")
+        self.assertEqual(store_stats["hits"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
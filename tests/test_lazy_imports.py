@@ -0,0 +1,57 @@
+"""
+Import-time regression tests: importing levy (and the engine, the dataset and
+experiment modules behind the CLIs) must not load provider SDKs, Faiss or
+sentence-transformers. Each check runs in a fresh interpreter, since this test
+process has already imported everything.
+"""
+
+import json
+import subprocess
+import sys
+import unittest
+from pathlib import Path
+
+import levy
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+HEAVY = ["anthropic", "httpx", "redis", "faiss", "sentence_transformers", "torch", "fastapi", "dotenv"]
+
+
+def _loaded_after(statement: str):
+    code = f"import sys, json\n{statement}\nprint(json.dumps(sorted({{m.split('.')[0] for m in sys.modules}})))"
+    proc = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, cwd=REPO_ROOT, check=True)
+    return set(json.loads(proc.stdout))
+
+
+class TestLazyImports(unittest.TestCase):
+
+    def test_import_levy_loads_nothing_heavy(self):
+        loaded = _loaded_after("import levy")
+        self.assertEqual(loaded & set(HEAVY), set())
+        self.assertNotIn("numpy", loaded)
+
+    def test_engine_and_cli_modules_defer_sdks(self):
+        loaded = _loaded_after(
+            "import levy.engine, levy.api.pool, levy.dataset.io, levy.experiment.runner"
+        )
+        self.assertEqual(loaded & set(HEAVY), set())
+
+    def test_sdks_load_on_first_use(self):
+        loaded = _loaded_after(
+            "from levy.llm_client import AnthropicLLMClient\n"
+            "AnthropicLLMClient(api_key='sk-test')"
+        )
+        self.assertIn("anthropic", loaded)
+
+    def test_top_level_names_resolve_lazily(self):
+        from levy.engine import LevyEngine
+
+        self.assertIs(levy.LevyEngine, LevyEngine)
+        self.assertIn("LevyConfig", dir(levy))
+        with self.assertRaises(AttributeError):
+            levy.NotAThing
+
+
+if __name__ == "__main__":
+    unittest.main()
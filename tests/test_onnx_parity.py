@@ -0,0 +1,55 @@
+"""
+Parity of the ONNX Runtime embedding backend with the PyTorch one (LEV-1 models).
+
+Needs real checkpoints and `sentence-transformers[onnx]`, so it is skipped in the
+offline suite. Run it on an embedding node with network access or a warm HF cache:
+    python -m pytest tests/test_onnx_parity.py
+"""
+
+import importlib.util
+import unittest
+
+import numpy as np
+
+from levy.embedding_manager import EmbeddingManager
+
+_HAVE_ONNX = all(
+    importlib.util.find_spec(name) is not None for name in ("sentence_transformers", "onnxruntime", "optimum")
+)
+
+_TEXTS = [
+    "How do I reset my password?",
+    "def fibonacci(n): return n if n < 2 else fibonacci(n - 1) + fibonacci(n - 2)",
+    "What's the weather like in Liverpool today?",
+    "Explain the difference between a list and a tuple in Python.",
+]
+
+
+def _cosines(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    return np.sum(a * b, axis=1) / (np.linalg.norm(a, axis=1) * np.linalg.norm(b, axis=1))
+
+
+@unittest.skipUnless(_HAVE_ONNX, "requires sentence-transformers[onnx] and model checkpoints")
+class TestOnnxParity(unittest.TestCase):
+
+    def _assert_parity(self, model: str, quantization, min_cosine: float) -> None:
+        torch_vectors = EmbeddingManager(model, provider="sentence-transformers").embed_many(_TEXTS)
+        onnx_vectors = EmbeddingManager(model, provider="onnx", onnx_quantization=quantization).embed_many(_TEXTS)
+        self.assertEqual(onnx_vectors.shape, torch_vectors.shape)
+        self.assertGreaterEqual(float(_cosines(torch_vectors, onnx_vectors).min()), min_cosine)
+
+    def test_minilm_fp32(self):
+        self._assert_parity("all-MiniLM-L6-v2", None, 0.9999)
+
+    def test_minilm_int8(self):
+        self._assert_parity("all-MiniLM-L6-v2", "avx2", 0.98)
+
+    def test_modernbert_fp32(self):
+        self._assert_parity("modernbert", None, 0.9999)
+
+    def test_modernbert_int8(self):
+        self._assert_parity("modernbert", "avx2", 0.97)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,15 +1,26 @@
 """
 Tests for levy.llm_client and levy.embeddings: abstract-base contracts,
-constructor plumbing, and offline-testable branches. Network-touching
-bodies (OpenAI/Ollama LLM calls, Ollama/sentence-transformers embedding
-calls) are excluded from coverage via inline pragmas and are not exercised
-here -- see CLAUDE.md known-gaps note and the add-test-infrastructure design.
+constructor plumbing, and offline-testable branches. The Ollama clients'
+HTTP paths run against an `httpx.MockTransport` injected into their pooled
+client; OpenAI and sentence-transformers calls are excluded from coverage via
+inline pragmas -- see CLAUDE.md known-gaps note and the add-test-infrastructure design.
 """
 
+import asyncio
+import json
+import random
+import threading
+import time
 import unittest
+from unittest import mock
 
-from levy.embeddings import EmbeddingClient, OllamaEmbeddingClient
+import httpx
+import numpy as np
+
+from levy.config import LevyConfig
+from levy.embeddings import EmbeddingClient, MockEmbeddingClient, OllamaEmbeddingClient
 from levy.llm_client import LLMClient, MockLLMClient, OllamaLLMClient, OpenAILLMClient
+from levy.http_pool import HTTPPoolSettings, PooledHTTPClient
 from levy.models import LLMRequest
 
 
@@ -84,6 +95,47 @@ class TestEmbeddingClientAbstract(unittest.TestCase):
         self.assertIsNone(client.get_dimension())
 
 
+class TestMockEmbeddingClient(unittest.TestCase):
+
+    def test_vectors_are_deterministic_float32_unit_norm(self):
+        first, second = MockEmbeddingClient(dimension=64), MockEmbeddingClient(dimension=64)
+        vector = first.embed("hello")
+        self.assertEqual((vector.dtype, vector.shape), (np.float32, (64,)))
+        self.assertAlmostEqual(float(np.linalg.norm(vector)), 1.0, places=5)
+        np.testing.assert_array_equal(vector, second.embed("hello"))
+        self.assertFalse(np.array_equal(vector, first.embed("hello!")))
+
+    def test_batch_matches_single_embeds(self):
+        client = MockEmbeddingClient(dimension=32)
+        matrix = client.embed_many(["a", "b", "c"])
+        for row, text in zip(matrix, "abc"):
+            np.testing.assert_array_equal(row, client.embed(text))
+
+    def test_global_random_state_untouched(self):
+        random.seed(1234)
+        expected = random.random()
+        random.seed(1234)
+        MockEmbeddingClient().embed("anything")
+        self.assertEqual(random.random(), expected)
+
+    def test_concurrent_callers_get_consistent_vectors(self):
+        client = MockEmbeddingClient(dimension=128)
+        expected = {f"text-{i}": client.embed(f"text-{i}") for i in range(20)}
+        mismatches = []
+
+        def worker():
+            for text, vector in expected.items():
+                if not np.array_equal(client.embed(text), vector):
+                    mismatches.append(text)
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join(10)
+        self.assertEqual(mismatches, [])
+
+
 # ---------------------------------------------------------------------------
 # OllamaEmbeddingClient (constructor + already-known-dimension branch only --
 # embed()/get_dimension()-when-unknown make real HTTP calls and are pragma-excluded)
@@ -103,5 +155,155 @@ class TestOllamaEmbeddingClient(unittest.TestCase):
         self.assertEqual(client.get_dimension(), 42)
 
 
+# ---------------------------------------------------------------------------
+# Pooled HTTP connections (levy/http_pool.py), driven through httpx.MockTransport
+# ---------------------------------------------------------------------------
+
+def _ollama_chat_handler(seen):
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen.append(request)
+        return httpx.Response(200, json={"message": {"content": "pong"}, "eval_count": 2, "prompt_eval_count": 1})
+    return handler
+
+
+class TestHTTPPoolSettings(unittest.TestCase):
+
+    def test_from_config_reads_http_fields(self):
+        config = LevyConfig(
+            http_max_connections=7,
+            http_max_keepalive_connections=3,
+            http_keepalive_expiry_seconds=5.0,
+            http2=True,
+        )
+        settings = HTTPPoolSettings.from_config(config, timeout_seconds=12.0)
+        self.assertEqual(settings, HTTPPoolSettings(12.0, 7, 3, 5.0, True))
+
+    def test_clients_are_built_lazily_with_limits(self):
+        pool = PooledHTTPClient(HTTPPoolSettings(max_connections=9, max_keepalive_connections=4))
+        self.assertIsNone(pool._sync)
+        client = pool.sync
+        self.assertIs(pool.sync, client)
+        self.assertEqual(client._transport._pool._max_connections, 9)
+        self.assertEqual(client._transport._pool._max_keepalive_connections, 4)
+        pool.close()
+        self.assertTrue(client.is_closed)
+        self.assertIsNone(pool._sync)
+
+    def test_concurrent_first_use_builds_one_client(self):
+        pool = PooledHTTPClient()
+        real_client = httpx.Client
+        built = []
+
+        def slow_client(**kwargs):
+            time.sleep(0.05)  # widen the window between the None check and the assignment
+            client = real_client(**kwargs)
+            built.append(client)
+            return client
+
+        barrier = threading.Barrier(8)
+        seen = []
+
+        def worker():
+            barrier.wait()
+            seen.append(pool.sync)
+
+        with mock.patch.object(httpx, "Client", side_effect=slow_client):
+            threads = [threading.Thread(target=worker) for _ in range(8)]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+        self.assertEqual(len(built), 1)
+        self.assertTrue(all(client is built[0] for client in seen))
+        pool.close()
+        self.assertTrue(built[0].is_closed)
+
+
+class TestPooledProviderClients(unittest.TestCase):
+
+    def test_ollama_generate_reuses_one_client(self):
+        seen = []
+        client = OllamaLLMClient(base_url="http://ollama.test", model="qwen3")
+        client.http.transport = httpx.MockTransport(_ollama_chat_handler(seen))
+        with client:
+            first = client.generate(LLMRequest(prompt="ping"))
+            http_client = client.http.sync
+            client.generate(LLMRequest(prompt="ping again"))
+            self.assertIs(client.http.sync, http_client)
+        self.assertEqual(first.text, "pong")
+        self.assertEqual(first.token_usage, 3)
+        self.assertEqual(len(seen), 2)
+        self.assertTrue(http_client.is_closed)
+
+    def test_ollama_agenerate_reuses_one_async_client(self):
+        seen = []
+        client = OllamaLLMClient(base_url="http://ollama.test", model="qwen3")
+        client.http.transport = httpx.MockTransport(_ollama_chat_handler(seen))
+
+        async def scenario():
+            async with client:
+                await client.agenerate(LLMRequest(prompt="a"))
+                async_client = client.http.async_
+                await client.agenerate(LLMRequest(prompt="b"))
+                self.assertIs(client.http.async_, async_client)
+            return async_client
+
+        async_client = asyncio.run(scenario())
+        self.assertEqual(len(seen), 2)
+        self.assertTrue(async_client.is_closed)
+
+    def test_ollama_embedding_client_uses_pool(self):
+        def handler(request: httpx.Request) -> httpx.Response:
+            return httpx.Response(200, json={"embeddings": [[0.1, 0.2, 0.3]]})
+
+        client = OllamaEmbeddingClient(base_url="http://ollama.test", http_settings=HTTPPoolSettings(timeout_seconds=5.0))
+        client.http.transport = httpx.MockTransport(handler)
+        self.assertEqual(client.embed("x").shape, (3,))
+        self.assertEqual(client.get_dimension(), 3)
+        self.assertEqual(client.http.sync.timeout.connect, 5.0)
+        client.close()
+        self.assertIsNone(client.http._sync)
+
+    def test_ollama_embed_many_posts_array_input_per_batch(self):
+        bodies = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            body = json.loads(request.content)
+            bodies.append(body)
+            self.assertEqual(request.url.path, "/api/embed")
+            return httpx.Response(200, json={"embeddings": [[float(len(t)), 0.0] for t in body["input"]]})
+
+        client = OllamaEmbeddingClient(base_url="http://ollama.test", model="nomic-embed-text")
+        client.http.transport = httpx.MockTransport(handler)
+        matrix = client.embed_many(["a", "bb", "ccc"], batch_size=2)
+        self.assertEqual([b["input"] for b in bodies], [["a", "bb"], ["ccc"]])
+        self.assertEqual(matrix.shape, (3, 2))
+        self.assertEqual(matrix[:, 0].tolist(), [1.0, 2.0, 3.0])
+        self.assertEqual(client.get_dimension(), 2)
+
+    def test_ollama_embed_many_rejects_non_positive_batch_size(self):
+        client = OllamaEmbeddingClient(base_url="http://ollama.test")
+        client.http.transport = httpx.MockTransport(lambda request: self.fail("no request expected"))
+        for batch_size in (0, -2):
+            with self.assertRaisesRegex(ValueError, "batch_size"):
+                client.embed_many(["a"], batch_size=batch_size)
+
+    def test_ollama_embed_and_embed_many_agree(self):
+        paths = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            paths.append(request.url.path)
+            body = json.loads(request.content)
+            texts = body["input"] if isinstance(body["input"], list) else [body["input"]]
+            return httpx.Response(200, json={"embeddings": [[float(len(t)), 1.0] for t in texts]})
+
+        client = OllamaEmbeddingClient(base_url="http://ollama.test", model="nomic-embed-text")
+        client.http.transport = httpx.MockTransport(handler)
+        single = client.embed("hello")
+        batched = client.embed_many(["hello"])
+        self.assertEqual(paths, ["/api/embed", "/api/embed"])
+        np.testing.assert_array_equal(single, batched[0])
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,300 @@
+"""
+Tests for the cross-process SharedVectorIndex and SharedSemanticCache.
+
+Two instances opened on one directory stand in for two uvicorn workers; one
+test runs the writer in a real subprocess.
+"""
+
+import os
+import subprocess
+import sys
+import tempfile
+import textwrap
+import time
+import unittest
+from contextlib import contextmanager
+from unittest import mock
+
+import numpy as np
+
+from levy.cache.semantic_cache import SemanticCache
+from levy.cache.shared_index import _DIM, SharedVectorIndex
+from levy.cache.shared_semantic_cache import SharedSemanticCache
+from levy.cache.vector_index import BruteForceVectorIndex, _l2_normalize
+from levy.config import LevyConfig
+from levy.engine import LevyEngine
+from levy.models import CacheEntry, LLMRequest
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class _HashEmbedder:
+    """Deterministic per-prompt unit vectors (identical prompts embed identically)."""
+
+    dim = 16
+
+    def embed(self, text: str) -> np.ndarray:
+        rng = np.random.default_rng(abs(hash(text)) % (2 ** 32))
+        return _l2_normalize(rng.standard_normal(self.dim).astype(np.float32))
+
+    def get_dimension(self) -> int:
+        return self.dim
+
+
+class TestSharedVectorIndex(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        self.directory = self._tmp.name
+        self.writer = SharedVectorIndex(self.directory, initial_capacity=4)
+        self.reader = SharedVectorIndex(self.directory, initial_capacity=4)
+        self.addCleanup(self.writer.close)
+        self.addCleanup(self.reader.close)
+
+    def test_reader_sees_rows_appended_by_another_instance(self):
+        vectors = _l2_normalize(np.random.default_rng(0).standard_normal((3, 8)).astype(np.float32))
+        self.writer.add_many(vectors, self.writer.allocate_ids(3))
+        self.assertEqual(self.reader.size(), 3)
+        ids, dists = self.reader.search(vectors[1], k=1)
+        self.assertEqual(ids, [1])
+        self.assertAlmostEqual(dists[0], 0.0, places=5)
+
+    def test_matches_brute_force_across_growth_and_removals(self):
+        rng = np.random.default_rng(1)
+        vectors = _l2_normalize(rng.standard_normal((50, 8)).astype(np.float32))
+        reference = BruteForceVectorIndex()
+        for i, vec in enumerate(vectors):  # one at a time: several compactions past capacity 4
+            self.writer.add(vec, i)
+            reference.add(vec, i)
+        for i in range(0, 50, 3):
+            self.assertTrue(self.writer.remove(i))
+            reference.remove(i)
+        self.assertFalse(self.reader.remove(0))
+        self.assertEqual(self.reader.size(), reference.size())
+        queries = _l2_normalize(rng.standard_normal((5, 8)).astype(np.float32))
+        ids, dists = self.reader.search_many(queries, k=4)
+        ref_ids, ref_dists = reference.search_many(queries, k=4)
+        self.assertEqual(ids, ref_ids)
+        np.testing.assert_allclose(dists, ref_dists, rtol=1e-5, atol=1e-6)
+
+    def test_reset_is_seen_by_every_instance_and_ids_stay_unique(self):
+        self.writer.add_many(np.eye(2, dtype=np.float32), self.writer.allocate_ids(2))
+        self.reader.reset()
+        self.assertEqual(self.writer.size(), 0)
+        self.assertEqual(self.writer.search(np.ones(2, dtype=np.float32)), ([], []))
+        self.assertEqual(self.writer.allocate_ids(1), [2])
+
+    def test_remove_many_tombstones_a_batch_and_tracks_other_instances(self):
+        vectors = np.eye(10, dtype=np.float32)
+        self.writer.add_many(vectors, list(range(10)))  # past capacity 4: one compaction
+        self.assertEqual(self.reader.remove_many([1, 2]), 2)
+        # The writer's id -> row map still lists 1 and 2; it must notice they are gone.
+        self.assertEqual(self.writer.remove_many([1, 2, 3, 99]), 1)
+        self.writer.add(vectors[1], 10)  # appended after the map was built
+        self.assertTrue(self.writer.remove(10))
+        self.assertEqual(self.reader.size(), 7)
+        ids, _ = self.reader.search(vectors[5], k=10)
+        self.assertEqual(sorted(ids), [0, 4, 5, 6, 7, 8, 9])
+
+    def test_first_write_publishes_dimension_inside_the_seqlock(self):
+        publishing = self.writer._publishing
+        dims_on_entry = []
+
+        @contextmanager
+        def spy():
+            dims_on_entry.append(int(self.writer._header[_DIM]))
+            with publishing() as header:
+                yield header
+
+        with mock.patch.object(self.writer, "_publishing", spy):
+            self.writer.add(np.ones(6, dtype=np.float32), 0)
+        self.assertEqual(dims_on_entry[0], 0)  # not written before the first seqlock section
+        self.assertEqual(int(self.reader._header[_DIM]), 6)
+        self.assertEqual(self.reader.search(np.ones(6, dtype=np.float32), k=1)[0], [0])
+
+    def test_dimension_mismatch_raises(self):
+        self.writer.add(np.ones(4, dtype=np.float32), 0)
+        with self.assertRaises(ValueError):
+            self.reader.add(np.ones(5, dtype=np.float32), 1)
+
+    def test_snapshots_are_documented_no_ops(self):
+        self.writer.add(np.ones(4, dtype=np.float32), 0)
+        self.assertFalse(self.writer.supports_snapshots)
+        with tempfile.TemporaryDirectory() as elsewhere:
+            self.writer.save(elsewhere)
+            self.assertEqual(os.listdir(elsewhere), [])
+            self.reader.load(elsewhere)
+        self.assertEqual(self.reader.size(), 1)
+
+    def test_writes_from_another_process_are_visible(self):
+        script = textwrap.dedent(
+            f"""
+            import sys
+            sys.path.insert(0, {REPO_ROOT!r})
+            import numpy as np
+            from levy.cache.shared_index import SharedVectorIndex
+            index = SharedVectorIndex({self.directory!r}, initial_capacity=4)
+            for i in range(20):
+                index.add(np.eye(20, dtype=np.float32)[i], index.allocate_ids(1)[0])
+            """
+        )
+        subprocess.run([sys.executable, "-c", script], check=True, timeout=60)
+        self.assertEqual(self.reader.size(), 20)
+        ids, _ = self.reader.search(np.eye(20, dtype=np.float32)[7], k=1)
+        self.assertEqual(ids, [7])
+
+    def test_writer_dying_mid_update_does_not_hang_readers(self):
+        script = textwrap.dedent(
+            f"""
+            import os, sys
+            sys.path.insert(0, {REPO_ROOT!r})
+            import numpy as np
+            from levy.cache.shared_index import SharedVectorIndex
+            index = SharedVectorIndex({self.directory!r}, initial_capacity=4)
+            index.add_many(np.eye(3, dtype=np.float32), [0, 1, 2])
+            with index.writer_lock(), index._publishing() as header:
+                index._ids[1] = -1
+                os._exit(1)  # dies with seq odd and live not yet decremented
+            """
+        )
+        self.assertEqual(subprocess.run([sys.executable, "-c", script], timeout=60).returncode, 1)
+        with self.assertLogs("levy.cache.shared_index", level="WARNING"):
+            ids, _ = self.reader.search(np.eye(3, dtype=np.float32)[2], k=3)
+        self.assertEqual(sorted(ids), [0, 2])
+        self.assertEqual(self.reader.size(), 2)
+        self.writer.add(np.eye(3, dtype=np.float32)[1], 3)  # the next writer is not confused by parity
+        self.assertEqual(self.reader.search(np.eye(3, dtype=np.float32)[1], k=1)[0], [3])
+
+
+class TestSharedSemanticCache(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        self.embedder = _HashEmbedder()
+
+    def _cache(self, **kwargs):
+        cache = SharedSemanticCache(self._tmp.name, embedding_client=self.embedder, threshold=0.9, **kwargs)
+        self.addCleanup(cache.close)
+        return cache
+
+    def test_entry_stored_by_one_worker_hits_in_another(self):
+        worker_a, worker_b = self._cache(), self._cache()
+        worker_a.set(LLMRequest(prompt="what is levy?"), "a semantic cache", metadata={"model": "m"})
+        entry = worker_b.get(LLMRequest(prompt="what is levy?"))
+        self.assertEqual(entry.response_text, "a semantic cache")
+        self.assertEqual(entry.metadata["model"], "m")
+        self.assertAlmostEqual(entry.metadata["last_similarity_score"], 1.0, places=5)
+        self.assertIsNone(worker_b.get(LLMRequest(prompt="something unrelated")))
+
+    def test_max_size_evicts_least_recently_used_across_workers(self):
+        worker_a, worker_b = self._cache(max_size=2), self._cache(max_size=2)
+        worker_a.set(LLMRequest(prompt="first"), "1")
+        worker_b.set(LLMRequest(prompt="second"), "2")
+        self.assertIsNotNone(worker_b.get(LLMRequest(prompt="first")))  # "second" is now LRU
+        worker_a.set(LLMRequest(prompt="third"), "3")
+        self.assertEqual(worker_b.size(), 2)
+        self.assertIsNone(worker_b.get(LLMRequest(prompt="second")))
+        self.assertEqual(worker_b.get(LLMRequest(prompt="first")).response_text, "1")
+        self.assertEqual(worker_b.get(LLMRequest(prompt="third")).response_text, "3")
+        self.assertEqual(worker_a.evictions, 1)
+
+    def test_hits_record_access_count_and_recency_for_every_worker(self):
+        worker_a, worker_b = self._cache(), self._cache()
+        worker_a.set(LLMRequest(prompt="hot"), "r")
+        before = worker_a._connection().execute("SELECT last_used FROM entries").fetchone()[0]
+        self.assertEqual(worker_a.get(LLMRequest(prompt="hot")).access_count, 1)
+        self.assertEqual(worker_b.get(LLMRequest(prompt="hot")).access_count, 2)
+        access_count, last_used = worker_a._connection().execute(
+            "SELECT access_count, last_used FROM entries"
+        ).fetchone()
+        self.assertEqual(access_count, 2)
+        self.assertGreaterEqual(last_used, before)
+
+    def test_snapshot_calls_are_no_ops_through_either_cache_type(self):
+        cache = self._cache()
+        cache.set(LLMRequest(prompt="kept"), "r")
+        wrapped = SemanticCache(self.embedder, threshold=0.9, vector_index=SharedVectorIndex(self._tmp.name))
+        with tempfile.TemporaryDirectory() as snapshot_dir:
+            for semantic_cache in (cache, wrapped):
+                self.assertFalse(semantic_cache.supports_snapshots)
+                semantic_cache.save(snapshot_dir)
+                self.assertEqual(os.listdir(snapshot_dir), [])
+            self.assertEqual(cache.load(snapshot_dir), 1)
+        self.assertEqual(cache.get(LLMRequest(prompt="kept")).response_text, "r")
+
+    def test_max_bytes_is_rejected(self):
+        with self.assertRaises(ValueError):
+            self._cache(max_bytes=1_000_000)
+
+    def test_expired_entries_miss_and_purge(self):
+        cache = self._cache(ttl_seconds=60)
+        cache.set(LLMRequest(prompt="stale"), "old")
+        cache.set(LLMRequest(prompt="fresh"), "new")
+        cache._connection().execute("UPDATE entries SET expires_at = ? WHERE prompt = 'stale'", (time.time() - 1,))
+        cache._connection().commit()
+        self.assertIsNone(cache.get(LLMRequest(prompt="stale")))
+        self.assertEqual(cache.size(), 1)
+        self.assertEqual(cache.purge_expired(), 0)
+
+    def test_bulk_load_skips_prompts_any_worker_already_cached(self):
+        worker_a, worker_b = self._cache(), self._cache()
+        worker_a.set(LLMRequest(prompt="p0"), "r0")
+        entries = [
+            CacheEntry(key_hash="", prompt=f"p{i}", response_text=f"r{i}", embedding=self.embedder.embed(f"p{i}"))
+            for i in range(4)
+        ]
+        entries.append(CacheEntry(key_hash="", prompt="no vector", response_text="r"))
+        self.assertEqual(worker_b.bulk_load(entries + entries, batch_size=2), 3)
+        self.assertEqual(worker_a.size(), 4)
+        self.assertEqual(worker_a.get(LLMRequest(prompt="p3")).response_text, "r3")
+
+    def test_reset_clears_every_worker(self):
+        worker_a, worker_b = self._cache(), self._cache()
+        worker_a.set(LLMRequest(prompt="q"), "r")
+        self.assertGreater(worker_b.nbytes, 0)
+        worker_b.reset()
+        self.assertEqual(worker_a.size(), 0)
+        self.assertIsNone(worker_a.get(LLMRequest(prompt="q")))
+
+
+class TestEngineSharedSemanticCache(unittest.TestCase):
+
+    def test_engines_with_the_same_shared_dir_share_semantic_hits(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            config = LevyConfig(
+                llm_provider="mock",
+                mock_llm_latency_seconds=0,
+                embedding_provider="mock",
+                enable_exact_cache=False,
+                semantic_shared_dir=tmp,
+            )
+            first, second = LevyEngine(config), LevyEngine(config)
+            self.assertIsInstance(first.semantic_cache, SharedSemanticCache)
+            self.assertEqual(first.generate("shared prompt").source, "llm")
+            self.assertEqual(second.generate("shared prompt").source, "semantic_cache")
+            first.close()
+            second.close()
+
+    def test_cache_max_bytes_with_a_shared_dir_bounds_only_the_exact_store(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            config = LevyConfig(
+                llm_provider="mock",
+                mock_llm_latency_seconds=0,
+                embedding_provider="mock",
+                semantic_shared_dir=tmp,
+                cache_max_bytes=1_000_000,
+            )
+            with self.assertLogs("levy.engine", level="WARNING") as logs:
+                engine = LevyEngine(config)
+            self.assertIn("cache_max_bytes", logs.output[0])
+            self.assertIsInstance(engine.semantic_cache, SharedSemanticCache)
+            self.assertIsNone(engine.semantic_cache.max_bytes)
+            self.assertEqual(engine.store.max_bytes, 1_000_000)
+            self.assertEqual(engine.generate("budgeted prompt").source, "llm")
+            engine.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
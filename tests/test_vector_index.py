@@ -8,6 +8,8 @@ and engine end-to-end with mock embeddings.
 """
 
 import math
+import os
+import tempfile
 import unittest
 import unittest.mock
 
@@ -98,6 +100,39 @@ class TestBruteForceVectorIndex(unittest.TestCase):
         self.assertIsInstance(dists[0], float)
         self.assertFalse(math.isnan(dists[0]))
 
+    def test_growth_past_initial_capacity_preserves_rows(self):
+        """Amortised doubling must keep every previously added (vector, id) pair."""
+        idx = self._make()
+        rng = np.random.default_rng(0)
+        n = BruteForceVectorIndex._INITIAL_CAPACITY * 3 + 5
+        vecs = rng.standard_normal((n, 8)).astype(np.float32)
+        for i, v in enumerate(vecs):
+            idx.add(v.tolist(), entry_id=1000 + i)
+        self.assertEqual(idx.size(), n)
+        for i in (0, n // 2, n - 1):
+            ids, dists = idx.search(vecs[i].tolist(), k=1)
+            self.assertEqual(ids[0], 1000 + i)
+            self.assertAlmostEqual(dists[0], 0.0, places=3)
+
+    def test_top_k_sorted_and_matches_exhaustive_l2(self):
+        idx = self._make()
+        rng = np.random.default_rng(1)
+        vecs = rng.standard_normal((50, 6)).astype(np.float32)
+        for i, v in enumerate(vecs):
+            idx.add(v.tolist(), entry_id=i)
+        q = rng.standard_normal(6).astype(np.float32)
+        ids, dists = idx.search(q.tolist(), k=5)
+        expected = np.argsort(np.linalg.norm(vecs - q, axis=1))[:5]
+        self.assertEqual(ids, [int(i) for i in expected])
+        self.assertEqual(dists, sorted(dists))
+
+    def test_k_larger_than_size_returns_all(self):
+        idx = self._make()
+        idx.add(_unit_vec(4, 0), entry_id=0)
+        idx.add(_unit_vec(4, 90), entry_id=1)
+        ids, dists = idx.search(_unit_vec(4, 10), k=10)
+        self.assertEqual(ids, [0, 1])
+
     def test_l2_normalize_zero_guard(self):
         zero = np.zeros(4, dtype=np.float32)
         result = _l2_normalize(zero)
@@ -109,6 +144,150 @@ class TestBruteForceVectorIndex(unittest.TestCase):
         self.assertAlmostEqual(float(np.linalg.norm(normed)), 1.0, places=6)
 
 
+# ---------------------------------------------------------------------------
+# 6.1b  Batched add_many / search_many (both backends)
+# ---------------------------------------------------------------------------
+
+class _BatchedApiMixin:
+    """Shared batched-API assertions; subclasses provide `_make()`."""
+
+    def _fixture(self, n=40, dim=8, seed=3):
+        rng = np.random.default_rng(seed)
+        vecs = rng.standard_normal((n, dim)).astype(np.float32)
+        return vecs / np.linalg.norm(vecs, axis=1, keepdims=True)
+
+    def test_add_many_then_search_many_matches_single_search(self):
+        vecs = self._fixture()
+        batched = self._make()
+        batched.add_many(vecs, list(range(100, 100 + len(vecs))))
+        single = self._make()
+        for i, v in enumerate(vecs):
+            single.add(v.tolist(), entry_id=100 + i)
+        self.assertEqual(batched.size(), len(vecs))
+
+        queries = vecs[:5] + 0.01
+        ids, dists = batched.search_many(queries, k=3)
+        self.assertEqual(len(ids), 5)
+        for row, q in enumerate(queries):
+            s_ids, s_dists = single.search(q.tolist(), k=3)
+            self.assertEqual(ids[row], s_ids)
+            for a, b in zip(dists[row], s_dists):
+                self.assertAlmostEqual(a, b, places=4)
+
+    def test_search_many_on_empty_index_returns_empty_rows(self):
+        ids, dists = self._make().search_many(np.zeros((3, 4), dtype=np.float32), k=1)
+        self.assertEqual(ids, [[], [], []])
+        self.assertEqual(dists, [[], [], []])
+
+    def test_add_many_rejects_mismatched_ids(self):
+        with self.assertRaises(ValueError):
+            self._make().add_many(self._fixture(n=3), [0, 1])
+
+    def test_removed_id_is_never_returned(self):
+        vecs = self._fixture(n=20)
+        idx = self._make()
+        idx.add_many(vecs, list(range(20)))
+        self.assertTrue(idx.remove(3))
+        self.assertFalse(idx.remove(3))
+        self.assertFalse(idx.remove(12345))
+        self.assertEqual(idx.size(), 19)
+        ids, _ = idx.search(vecs[3], k=19)
+        self.assertNotIn(3, ids)
+        self.assertEqual(sorted(ids), [i for i in range(20) if i != 3])
+
+    def test_remove_everything_then_search_is_empty(self):
+        vecs = self._fixture(n=6)
+        idx = self._make()
+        idx.add_many(vecs, list(range(6)))
+        for i in range(6):
+            idx.remove(i)
+        self.assertEqual(idx.size(), 0)
+        self.assertEqual(idx.search(vecs[0], k=1), ([], []))
+        idx.add(vecs[0], entry_id=0)  # re-used id after removal
+        self.assertEqual(idx.search(vecs[0], k=1)[0], [0])
+
+
+    def test_save_load_roundtrip(self):
+        vecs = self._fixture(n=30)
+        idx = self._make()
+        idx.add_many(vecs, list(range(30)))
+        idx.remove(7)
+        with tempfile.TemporaryDirectory() as tmp:
+            idx.save(tmp)
+            restored = self._make()
+            restored.load(tmp)
+        self.assertEqual(restored.size(), 29)
+        self.assertEqual(restored.search(vecs[12], k=1)[0], [12])
+        self.assertNotIn(7, restored.search(vecs[7], k=29)[0])
+        restored.add(vecs[7], entry_id=7)  # still writable after load
+        self.assertEqual(restored.search(vecs[7], k=1)[0], [7])
+
+    def test_save_load_empty_index(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            self._make().save(tmp)
+            restored = self._make()
+            restored.load(tmp)
+        self.assertEqual(restored.size(), 0)
+
+
+class TestBruteForceBatchedApi(_BatchedApiMixin, unittest.TestCase):
+
+    def _make(self):
+        return BruteForceVectorIndex()
+
+    def test_swap_remove_keeps_moved_row_addressable(self):
+        vecs = self._fixture(n=5)
+        idx = self._make()
+        idx.add_many(vecs, [10, 11, 12, 13, 14])
+        idx.remove(11)  # row of id 14 moves into the freed slot
+        self.assertTrue(idx.remove(14))
+        self.assertEqual(idx.search(vecs[12 - 10], k=1)[0], [12])
+        self.assertEqual(idx.size(), 3)
+
+    def test_re_adding_an_id_replaces_its_vector(self):
+        vecs = self._fixture(n=4)
+        idx = self._make()
+        idx.add_many(vecs[:2], [0, 1])
+        idx.add(vecs[2], 0)
+        idx.add_many(vecs[3:4].repeat(2, axis=0), [1, 1])  # repeated within a batch too
+        self.assertEqual(idx.size(), 2)
+        self.assertEqual(idx.search(vecs[2], k=1)[0], [0])
+        self.assertEqual(idx.search(vecs[0], k=10)[0].count(0), 1)  # old row not left behind
+        self.assertTrue(idx.remove(0))
+        self.assertTrue(idx.remove(1))
+        self.assertEqual(idx.search(vecs[0], k=10), ([], []))
+
+    def test_k_covering_every_row_matches_exact_distances(self):
+        vecs = self._fixture(n=20)
+        idx = self._make()
+        idx.add_many(vecs, list(range(20)))
+        ids, dists = idx.search_many(vecs[:3], k=50)
+        for q, (row_ids, row_dists) in enumerate(zip(ids, dists)):
+            exact = np.linalg.norm(vecs - vecs[q], axis=1)
+            self.assertEqual(row_ids[0], q)
+            self.assertEqual(row_dists[0], 0.0)  # the nearest row is re-measured exactly
+            np.testing.assert_allclose(row_dists, exact[row_ids], atol=1e-3)
+            self.assertEqual(row_dists, sorted(row_dists))
+
+
+@unittest.skipUnless(FAISS_AVAILABLE, "faiss-cpu not installed — skipping Faiss batched-API tests")
+class TestFaissBatchedApi(_BatchedApiMixin, unittest.TestCase):
+
+    def _make(self):
+        return FaissHNSWVectorIndex(m=16, ef_construction=100, ef_search=64)
+
+    def test_tombstones_are_compacted_out_of_the_graph(self):
+        vecs = self._fixture(n=20)
+        idx = self._make()
+        idx.add_many(vecs, list(range(20)))
+        for i in range(6):  # > 25% of 20 stored vectors triggers a rebuild
+            idx.remove(i)
+        self.assertEqual(idx._tombstones, set())
+        self.assertEqual(idx._index.ntotal, 14)
+        ids, _ = idx.search(vecs[10], k=1)
+        self.assertEqual(ids, [10])
+
+
 # ---------------------------------------------------------------------------
 # 6.2  Similarity transform + threshold decisions
 # ---------------------------------------------------------------------------
@@ -422,6 +601,210 @@ class TestSemanticCacheEdgeCases(unittest.TestCase):
         self.assertEqual(sc._entries, {})
 
 
+# ---------------------------------------------------------------------------
+# 6.6b  Bounded SemanticCache (LRU size cap + TTL)
+# ---------------------------------------------------------------------------
+
+class _TextKeyedClient:
+    """Distinct orthogonal one-hot vector per prompt, so every prompt only matches itself."""
+
+    def __init__(self, prompts, dim=8):
+        self._vecs = {p: np.eye(dim, dtype=np.float32)[i] for i, p in enumerate(prompts)}
+
+    def embed(self, text):
+        return self._vecs[text]
+
+    def get_dimension(self):
+        return len(next(iter(self._vecs.values())))
+
+
+class TestBoundedSemanticCache(unittest.TestCase):
+
+    def _sc(self, **kwargs):
+        client = _TextKeyedClient(["a", "b", "c", "d"])
+        return SemanticCache(embedding_client=client, threshold=0.9, backend="brute_force", **kwargs)
+
+    def test_max_size_evicts_least_recently_used(self):
+        sc = self._sc(max_size=2)
+        sc.set(LLMRequest(prompt="a"), "A")
+        sc.set(LLMRequest(prompt="b"), "B")
+        self.assertIsNotNone(sc.get(LLMRequest(prompt="a")))  # "b" is now LRU
+        sc.set(LLMRequest(prompt="c"), "C")
+        self.assertEqual(sc.size(), 2)
+        self.assertEqual(sc.evictions, 1)
+        self.assertIsNone(sc.get(LLMRequest(prompt="b")))
+        self.assertEqual(sc.get(LLMRequest(prompt="a")).response_text, "A")
+        self.assertEqual(sc.get(LLMRequest(prompt="c")).response_text, "C")
+
+    def test_expired_entry_is_a_miss_and_removed_from_index(self):
+        sc = self._sc(ttl_seconds=60)
+        sc.set(LLMRequest(prompt="a"), "A")
+        entry = next(iter(sc._entries.values()))
+        self.assertIsNotNone(entry.expires_at)
+        entry.expires_at = 0  # force expiry
+        self.assertIsNone(sc.get(LLMRequest(prompt="a")))
+        self.assertEqual(sc.size(), 0)
+        self.assertEqual(len(sc._entries), 0)
+
+    def test_expired_nearest_neighbour_does_not_hide_a_live_near_duplicate(self):
+        sc = self._sc(ttl_seconds=60)
+        vecs = sc.embedding_client._vecs
+        sc.set(LLMRequest(prompt="a"), "stale A")
+        sc.set(LLMRequest(prompt="a, reworded"), "live A", embedding=vecs["a"] + 0.05 * vecs["b"])
+        sc._entries[0].expires_at = 0
+        hit = sc.get(LLMRequest(prompt="a"))
+        self.assertEqual(hit.response_text, "live A")
+        self.assertEqual(sc.size(), 1)  # the expired neighbour was removed on the way
+
+    def test_purge_expired_drops_only_expired(self):
+        sc = self._sc(ttl_seconds=60)
+        for p in ("a", "b", "c"):
+            sc.set(LLMRequest(prompt=p), p.upper())
+        sc._entries[1].expires_at = 0
+        self.assertEqual(sc.purge_expired(), 1)
+        self.assertEqual(sc.size(), 2)
+        self.assertIsNone(sc.get(LLMRequest(prompt="b")))
+
+    def test_unbounded_by_default(self):
+        sc = self._sc()
+        for p in ("a", "b", "c", "d"):
+            sc.set(LLMRequest(prompt=p), p.upper())
+        self.assertEqual(sc.size(), 4)
+        self.assertIsNone(next(iter(sc._entries.values())).expires_at)
+
+    def test_snapshot_roundtrip_preserves_entries_and_lru_order(self):
+        sc = self._sc(max_size=3)
+        sc.set(LLMRequest(prompt="a"), "A", metadata={"canonical_name": "m"})
+        sc.set(LLMRequest(prompt="b"), "B")
+        sc.get(LLMRequest(prompt="a"))  # LRU order: b, a
+        with tempfile.TemporaryDirectory() as tmp:
+            sc.save(tmp)
+            self.assertTrue(os.path.exists(os.path.join(tmp, SemanticCache.ENTRIES_FILE)))
+            restored = self._sc(max_size=3)
+            self.assertEqual(restored.load(tmp), 2)
+        self.assertEqual([e.prompt for e in restored._entries.values()], ["b", "a"])
+        hit = restored.get(LLMRequest(prompt="a"))
+        self.assertEqual(hit.response_text, "A")
+        self.assertEqual(hit.metadata["canonical_name"], "m")
+        restored.set(LLMRequest(prompt="c"), "C")  # ids continue after the snapshot's
+        self.assertEqual(sorted(restored._entries), [0, 1, 2])
+
+    def test_snapshot_load_charges_what_set_charged(self):
+        sc = self._sc()
+        sc.set(LLMRequest(prompt="a"), "A" * 500, metadata={"canonical_name": "m"})
+        sc.set(LLMRequest(prompt="b"), "B")
+        with tempfile.TemporaryDirectory() as tmp:
+            sc.save(tmp)
+            restored = self._sc()
+            restored.load(tmp)
+        self.assertEqual(restored.nbytes, sc.nbytes)
+        self.assertEqual(restored._sizes, sc._sizes)
+        for entry_id, entry in sc._entries.items():
+            np.testing.assert_array_equal(restored._entries[entry_id].embedding, entry.embedding)
+
+    def test_load_rejects_embeddings_that_do_not_match_entries(self):
+        sc = self._sc()
+        sc.set(LLMRequest(prompt="a"), "A")
+        with tempfile.TemporaryDirectory() as tmp:
+            sc.save(tmp)
+            np.save(os.path.join(tmp, SemanticCache.EMBEDDINGS_FILE), np.empty((0, 0), dtype=np.float32))
+            with self.assertRaises(ValueError):
+                self._sc().load(tmp)
+
+    def test_load_drops_expired_entries(self):
+        sc = self._sc(ttl_seconds=60)
+        sc.set(LLMRequest(prompt="a"), "A")
+        sc.set(LLMRequest(prompt="b"), "B")
+        sc._entries[0].expires_at = 0
+        with tempfile.TemporaryDirectory() as tmp:
+            sc.save(tmp)
+            restored = self._sc(ttl_seconds=60)
+            self.assertEqual(restored.load(tmp), 1)
+        self.assertEqual(restored.size(), 1)
+        self.assertIsNone(restored.get(LLMRequest(prompt="a")))
+
+    def test_load_rejects_snapshot_from_other_backend(self):
+        sc = self._sc()
+        sc.set(LLMRequest(prompt="a"), "A")
+        with tempfile.TemporaryDirectory() as tmp:
+            sc.save(tmp)
+            other = SemanticCache(embedding_client=sc.embedding_client, vector_index=_EmptySearchIndex())
+            with self.assertRaises(ValueError):
+                other.load(tmp)
+
+    def test_bulk_load_batches_and_skips_unusable_entries(self):
+        sc = self._sc(ttl_seconds=60)
+        sc.set(LLMRequest(prompt="a"), "live A")
+        vecs = sc.embedding_client._vecs
+        entries = [
+            CacheEntry(key_hash="x", prompt="a", response_text="dup", embedding=vecs["a"] * 3),
+            CacheEntry(key_hash="x", prompt="b", response_text="B", embedding=vecs["b"] * 3),
+            CacheEntry(key_hash="x", prompt="c", response_text="C", embedding=vecs["c"], created_at=0),
+            CacheEntry(key_hash="x", prompt="d", response_text="D"),
+        ]
+        batches = []
+        with unittest.mock.patch.object(sc._index, "add_many", wraps=sc._index.add_many) as add_many:
+            self.assertEqual(sc.bulk_load(entries, batch_size=1, on_batch=batches.append), 1)
+        self.assertEqual(add_many.call_count, 1)
+        self.assertEqual(batches, [1])
+        self.assertEqual(sc.get(LLMRequest(prompt="a")).response_text, "live A")
+        hit = sc.get(LLMRequest(prompt="b"))
+        self.assertEqual(hit.response_text, "B")
+        self.assertAlmostEqual(float(np.linalg.norm(hit.embedding)), 1.0, places=6)
+        self.assertIsNone(sc.get(LLMRequest(prompt="c")))  # created_at=0 + ttl is long gone
+
+    def test_bulk_load_stops_at_max_size_without_evicting(self):
+        sc = self._sc(max_size=2)
+        sc.set(LLMRequest(prompt="a"), "A")
+        vecs = sc.embedding_client._vecs
+        entries = [CacheEntry(key_hash=p, prompt=p, response_text=p.upper(), embedding=vecs[p]) for p in "bcd"]
+        self.assertEqual(sc.bulk_load(entries), 1)
+        self.assertEqual(sc.size(), 2)
+        self.assertEqual(sc.evictions, 0)
+        self.assertIsNotNone(sc.get(LLMRequest(prompt="a")))
+
+    def test_max_bytes_evicts_lru_and_tracks_peak(self):
+        sc = self._sc()
+        sc.set(LLMRequest(prompt="a"), "A" * 3000)
+        per_entry = sc.nbytes
+        budgeted = self._sc(max_bytes=int(per_entry * 2.5))
+        for p in ("a", "b", "c"):
+            budgeted.set(LLMRequest(prompt=p), p.upper() * 3000)
+        self.assertEqual([e.prompt for e in budgeted._entries.values()], ["b", "c"])
+        self.assertEqual(budgeted.evictions, 1)
+        self.assertLessEqual(budgeted.nbytes, budgeted.max_bytes)
+        budgeted.reset()
+        self.assertEqual(budgeted.nbytes, 0)
+        self.assertGreaterEqual(budgeted.peak_nbytes, 2 * per_entry)
+
+    def test_bulk_load_and_snapshot_load_respect_max_bytes(self):
+        sc = self._sc()
+        for p in "abcd":
+            sc.set(LLMRequest(prompt=p), p.upper() * 3000)
+        budget = int(sc.nbytes / 4 * 2.5)
+        loaded = self._sc(max_bytes=budget)
+        self.assertEqual(loaded.bulk_load(list(sc._entries.values())), 2)
+        with tempfile.TemporaryDirectory() as tmp:
+            sc.save(tmp)
+            restored = self._sc(max_bytes=budget)
+            self.assertEqual(restored.load(tmp), 2)
+        self.assertLessEqual(restored.nbytes, budget)
+
+    def test_engine_wires_cache_max_size_into_semantic_cache(self):
+        config = LevyConfig(
+            enable_exact_cache=False,
+            llm_provider="mock",
+            mock_llm_latency_seconds=0,
+            embedding_provider="mock",
+            vector_index_backend="brute_force",
+            cache_max_size=3,
+        )
+        engine = LevyEngine(config)
+        for i in range(5):
+            engine.generate(f"prompt {i}")
+        self.assertEqual(engine.semantic_cache.size(), 3)
+
+
 # ---------------------------------------------------------------------------
 # 6.7  make_vector_index factory + FaissHNSWVectorIndex edge cases
 # ---------------------------------------------------------------------------